@@ -0,0 +1,69 @@
+"""配置文件快照读取基准测试
+
+在临时目录中准备主配置文件和 50 个插件配置文件(轮流复制现有插件的 config.toml)，
+对比每次都解析TOML与从二进制快照读取时，读取全部配置文件的耗时
+
+运行方式(在项目根目录):
+    python -m benchmarks.bench_config_snapshot
+"""
+import glob
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from src.ConfigManager import ConfigManager
+
+PLUGIN_COUNT = 50
+ROUNDS = 20
+
+
+def prepare(root):
+    """复制主配置文件和插件配置文件，返回全部配置文件路径"""
+    files = [os.path.join(root, "config.toml")]
+    shutil.copyfile("config.toml", files[0])
+
+    sources = sorted(glob.glob(os.path.join("src", "Plugin", "*", "config.toml")))
+    for i in range(PLUGIN_COUNT):
+        plugin_dir = os.path.join(root, "plugins", f"Plugin{i}")
+        os.makedirs(plugin_dir)
+        files.append(os.path.join(plugin_dir, "config.toml"))
+        shutil.copyfile(sources[i % len(sources)], files[-1])
+    return files
+
+
+def load_all(files, snapshot):
+    """读取全部配置文件，返回耗时(毫秒)"""
+    start = time.perf_counter()
+    for config_file in files:
+        ConfigManager(config_file, snapshot=snapshot)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        files = prepare(root)
+
+        toml_times = [load_all(files, snapshot=False) for _ in range(ROUNDS)]
+        # 第一次读取时生成快照
+        first = load_all(files, snapshot=True)
+        snapshot_times = [load_all(files, snapshot=True) for _ in range(ROUNDS)]
+
+        # 只修改 mtime 不修改内容，快照按内容哈希仍然有效
+        for config_file in files:
+            os.utime(config_file)
+        touched = load_all(files, snapshot=True)
+
+        toml_median = statistics.median(toml_times)
+        snapshot_median = statistics.median(snapshot_times)
+        print(f"配置文件数量: {len(files)} (主配置 + {PLUGIN_COUNT} 个插件配置)")
+        print(f"解析TOML: {toml_median:.2f}ms (中位数，{ROUNDS} 轮)")
+        print(f"生成快照的首次读取: {first:.2f}ms")
+        print(f"从快照读取: {snapshot_median:.2f}ms (中位数，{ROUNDS} 轮)")
+        print(f"mtime 变化、内容未变时读取: {touched:.2f}ms")
+        print(f"加速比: {toml_median / snapshot_median:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""事件钩子与每帧轮询的开销对比
+
+同样响应鼠标单击的 N 个插件，分别实现为每帧轮询状态的持续性插件和订阅 on_click 的事件型插件，
+模拟 60 帧/秒运行 10 秒、期间只发生 5 次单击，比较两种方式花在插件上的总时间
+
+运行方式(在项目根目录):
+    python -m benchmarks.bench_event_hooks
+"""
+import time
+
+from src.Plugin.PluginBase import EventPlugin, LastingPlugin
+from src.PluginManager import PluginManager
+
+FRAMES = 600
+CLICK_FRAMES = {100, 200, 300, 400, 500}
+
+
+class ClickState:
+    """被轮询的单击状态"""
+    clicks = 0
+
+
+class PollingClickPlugin(LastingPlugin):
+    """每帧检查单击次数是否变化的持续性插件"""
+
+    def initialize(self) -> bool:
+        self.seen = 0
+        return True
+
+    def update(self, parent, dt: float = 0.0) -> None:
+        if ClickState.clicks != self.seen:
+            self.seen = ClickState.clicks
+
+
+class EventClickPlugin(EventPlugin):
+    """只在单击时被调用的事件型插件"""
+
+    def initialize(self) -> bool:
+        self.seen = 0
+        return True
+
+    def on_click(self, parent, button, x: int, y: int) -> None:
+        self.seen += 1
+
+
+def build_manager(plugin_class, plugin_type, count):
+    """构造包含 count 个合成插件的插件管理器"""
+    plugins = []
+    manager = PluginManager(plugins)
+    for i in range(count):
+        plugin_info = {
+            'plugin_name': f"Click{i}",
+            'plugin_path': "",
+            'plugin_type': plugin_type,
+            'enabled': True,
+        }
+        plugins.append(plugin_info)
+        # 直接注入实例，跳过模块加载
+        plugin_instance = plugin_class(plugin_info, {})
+        plugin_instance.initialize()
+        manager.plugin_instances[plugin_info['plugin_name']] = plugin_instance
+        manager.events.subscribe_plugin(plugin_info['plugin_name'], plugin_instance)
+    manager.invalidate_index()
+    return manager
+
+
+def run(manager):
+    """模拟运行 FRAMES 帧，返回耗时(毫秒)"""
+    ClickState.clicks = 0
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        if frame in CLICK_FRAMES:
+            ClickState.clicks += 1
+            manager.events.publish('on_click', None, None, 0, 0)
+        manager.execute_lasting_plugins(None)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print(f"{'插件数':>8} {'轮询(ms)':>12} {'事件(ms)':>12}")
+    for count in (10, 100):
+        polling = min(run(build_manager(PollingClickPlugin, 'lasting', count)) for _ in range(3))
+        events = min(run(build_manager(EventClickPlugin, 'event', count)) for _ in range(3))
+        print(f"{count:>8} {polling:>12.2f} {events:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""渲染帧间隔稳定性基准测试
+
+无需显示器(使用 offscreen 平台)，分别用整数毫秒的 QTimer(原实现)和 FrameScheduler 以 60fps 运行一段时间，
+每帧模拟几毫秒随机的渲染耗时，统计实际达到的帧率、帧间隔的标准差和分位数
+
+运行方式(在项目根目录):
+    python -m benchmarks.bench_frame_pacing
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QTimer
+
+from src.MyDeskPetCore.FrameScheduler import FrameScheduler
+
+FPS = 60
+DURATION = 3.0
+
+
+def run(app, timer, interval):
+    """运行 DURATION 秒，返回每帧的间隔(毫秒)"""
+    stamps = []
+    rng = random.Random(0)
+
+    def on_frame():
+        stamps.append(time.perf_counter())
+        # 模拟 2~6ms 的渲染耗时
+        end = time.perf_counter() + rng.uniform(0.002, 0.006)
+        while time.perf_counter() < end:
+            pass
+        if stamps[-1] - stamps[0] >= DURATION:
+            timer.stop()
+            app.quit()
+
+    timer.timeout.connect(on_frame)
+    timer.start(interval)
+    app.exec()
+    return [(b - a) * 1000 for a, b in zip(stamps, stamps[1:])]
+
+
+def report(name, intervals):
+    """打印帧间隔统计"""
+    ordered = sorted(intervals)
+    mean = statistics.mean(intervals)
+    print(f"{name}: 帧率 {1000 / mean:.2f}fps，平均间隔 {mean:.3f}ms，"
+          f"标准差 {statistics.pstdev(intervals):.3f}ms，"
+          f"P1/P99 {ordered[len(ordered) // 100]:.2f}/{ordered[len(ordered) * 99 // 100]:.2f}ms")
+
+
+def main():
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    print(f"目标: {FPS}fps，间隔 {1000 / FPS:.3f}ms")
+
+    report("QTimer(整数毫秒)", run(app, QTimer(app), 1000 // FPS))
+    scheduler = FrameScheduler(app)
+    report("FrameScheduler", run(app, scheduler, 1000 / FPS))
+    print(f"FrameScheduler 丢弃的帧: {scheduler.skipped}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""初始化型插件并行启动基准测试
+
+构造一组带依赖关系的合成初始化型插件: 一个修改窗口属性的GUI线程插件，
+以及若干模拟文件扫描、缓存预热的非GUI插件，对比串行执行与按依赖关系并行执行的启动耗时，
+并打印并行执行时的启动时间线
+
+运行方式(在项目根目录):
+    python -m benchmarks.bench_init_parallel
+"""
+import time
+
+from src.Plugin.PluginBase import InitPlugin
+from src.PluginManager import PluginManager
+
+# 插件名称 -> (耗时(秒), 依赖, 是否在GUI线程执行)
+SYNTHETIC_PLUGINS = {
+    'WindowFlags': (0.010, [], True),
+    'ScanResources': (0.060, [], False),
+    'WarmEmojiCache': (0.040, ['ScanResources'], False),
+    'WarmMotionCache': (0.050, ['ScanResources'], False),
+    'PrecomputeLayout': (0.030, [], False),
+    'BuildIndex': (0.020, ['WarmEmojiCache', 'WarmMotionCache'], False),
+    'ApplyTheme': (0.005, ['PrecomputeLayout'], True),
+}
+
+
+class SyntheticInitPlugin(InitPlugin):
+    """用 sleep 模拟I/O耗时的初始化型插件"""
+
+    def on_init(self, parent=None) -> None:
+        time.sleep(self.plugin_config['plugin']['cost'])
+
+
+def build_manager(parallel):
+    """构造包含合成初始化型插件的插件管理器，parallel 为 False 时所有插件都在GUI线程中串行执行"""
+    plugins = []
+    manager = PluginManager(plugins)
+    for name, (cost, depends_on, gui_thread) in SYNTHETIC_PLUGINS.items():
+        plugin_info = {
+            'plugin_name': name,
+            'plugin_path': "",
+            'plugin_type': 'init',
+            'enabled': True,
+        }
+        plugins.append(plugin_info)
+        plugin_config = {'plugin': {
+            'cost': cost,
+            'depends_on': depends_on,
+            'gui_thread': gui_thread or not parallel,
+        }}
+        # 直接注入实例，跳过模块加载
+        manager.plugin_instances[name] = SyntheticInitPlugin(plugin_info, plugin_config)
+    manager.invalidate_index()
+    return manager
+
+
+def main():
+    results = {}
+    for parallel in (False, True):
+        manager = build_manager(parallel)
+        start = time.perf_counter()
+        manager.execute_init_plugins(None)
+        results[parallel] = time.perf_counter() - start
+        if parallel:
+            print(manager.format_init_timeline())
+
+    print(f"串行启动: {results[False] * 1000:.1f}ms")
+    print(f"并行启动: {results[True] * 1000:.1f}ms")
+    print(f"加速比: {results[False] / results[True]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
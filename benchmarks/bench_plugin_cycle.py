@@ -0,0 +1,87 @@
+"""插件启用/禁用循环的内存回收测试
+
+在临时目录中生成一个持有 1MB 数据的持续性插件，反复启用、运行若干帧、禁用，
+用弱引用检查插件模块和实例是否被释放，并用 tracemalloc 观察内存是否随循环次数增长
+
+运行方式(在项目根目录):
+    python -m benchmarks.bench_plugin_cycle
+"""
+import os
+import tempfile
+import tracemalloc
+
+from src.PluginManager import PluginManager
+
+PLUGIN_SOURCE = '''
+from src.Plugin.PluginBase import LastingPlugin
+
+
+class CyclePlugin(LastingPlugin):
+    def initialize(self) -> bool:
+        self.payload = bytearray(1024 * 1024)
+        return True
+
+    def update(self, parent, dt: float = 0.0) -> None:
+        self.payload[0] = (self.payload[0] + 1) % 256
+
+    def cleanup(self) -> None:
+        self.payload = None
+'''
+
+PLUGIN_CONFIG = '''
+[plugin]
+plugin_name = "CyclePlugin"
+plugin_type = "lasting"
+'''
+
+
+def create_plugin(root):
+    """在 root 下生成测试插件，返回插件信息"""
+    plugin_path = os.path.join(root, "CyclePlugin")
+    os.makedirs(plugin_path)
+    with open(os.path.join(plugin_path, "CyclePlugin.py"), "w", encoding="utf-8") as f:
+        f.write(PLUGIN_SOURCE)
+    with open(os.path.join(plugin_path, "config.toml"), "w", encoding="utf-8") as f:
+        f.write(PLUGIN_CONFIG)
+    return {
+        'plugin_name': "CyclePlugin",
+        'plugin_path': plugin_path,
+        'plugin_type': 'lasting',
+        'enabled': True,
+    }
+
+
+def main():
+    cycles = 200
+    with tempfile.TemporaryDirectory() as root:
+        plugin_info = create_plugin(root)
+        manager = PluginManager([plugin_info])
+
+        # 预热一次，排除首次导入产生的常驻分配
+        manager.execute_lasting_plugins(None)
+        manager.set_plugin_enabled("CyclePlugin", False)
+        manager.set_plugin_enabled("CyclePlugin", True)
+
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        leaked = 0
+        peak_active = 0
+        for _ in range(cycles):
+            manager.set_plugin_enabled("CyclePlugin", True)
+            for _ in range(3):
+                manager.execute_lasting_plugins(None)
+            peak_active = max(peak_active, tracemalloc.get_traced_memory()[0] - baseline)
+            if not manager.unload_plugin("CyclePlugin"):
+                leaked += 1
+        manager.find_plugin_info("CyclePlugin")['enabled'] = False
+        final = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+
+    print(f"循环次数: {cycles}")
+    print(f"启用时内存增量峰值: {peak_active / 1024:.1f} KiB")
+    print(f"全部禁用后内存增量: {final / 1024:.1f} KiB")
+    print(f"未被释放的循环次数: {leaked}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""持续性插件每帧调度开销基准测试
+
+对比旧的逐项检查调度方式与按类型预建索引的调度方式，
+分别使用 10/100/1000 个合成的持续性插件
+
+运行方式(在项目根目录):
+    python -m benchmarks.bench_plugin_dispatch
+"""
+import timeit
+
+from src.Plugin.PluginBase import LastingPlugin
+from src.PluginManager import PluginManager
+
+
+class SyntheticLastingPlugin(LastingPlugin):
+    """什么也不做的持续性插件，用于测量纯调度开销"""
+
+    def update(self, parent, dt: float = 0.0) -> None:
+        pass
+
+
+def legacy_execute_lasting_plugins(manager, parent):
+    """旧版 execute_lasting_plugins 的调度逻辑，作为对照组"""
+    for plugin_info in manager.plugins:
+        plugin_name = plugin_info['plugin_name']
+        if not plugin_info.get('enabled', True) or plugin_info.get('plugin_type') != 'lasting':
+            continue
+
+        plugin_instance = manager.get_plugin_instance(plugin_info)
+        if not plugin_instance:
+            continue
+
+        if plugin_name in manager.plugin_types and manager.plugin_types[plugin_name] == 'lasting':
+            plugin_instance.update(parent)
+        elif isinstance(plugin_instance, LastingPlugin):
+            manager.plugin_types[plugin_name] = 'lasting'
+            plugin_instance.update(parent)
+        else:
+            manager.plugin_types[plugin_name] = 'unknown'
+
+
+def build_manager(count):
+    """构造包含 count 个合成持续性插件的插件管理器"""
+    plugins = []
+    manager = PluginManager(plugins)
+    for i in range(count):
+        plugin_info = {
+            'plugin_name': f"Synthetic{i}",
+            'plugin_path': "",
+            'plugin_type': 'lasting',
+            'enabled': True,
+        }
+        plugins.append(plugin_info)
+        # 直接注入实例，跳过模块加载
+        manager.plugin_instances[plugin_info['plugin_name']] = SyntheticLastingPlugin(plugin_info, {})
+        manager.plugin_types[plugin_info['plugin_name']] = 'lasting'
+    manager.invalidate_index()
+    return manager
+
+
+def main():
+    frames = 2000
+    print(f"{'插件数':>8} {'旧调度(us/帧)':>16} {'索引调度(us/帧)':>18} {'加速比':>8}")
+    for count in (10, 100, 1000):
+        manager = build_manager(count)
+        manager.execute_lasting_plugins(None)
+
+        legacy = min(timeit.repeat(lambda: legacy_execute_lasting_plugins(manager, None),
+                                   number=frames, repeat=5)) / frames * 1e6
+        indexed = min(timeit.repeat(lambda: manager.execute_lasting_plugins(None),
+                                    number=frames, repeat=5)) / frames * 1e6
+        print(f"{count:>8} {legacy:>16.2f} {indexed:>18.2f} {legacy / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
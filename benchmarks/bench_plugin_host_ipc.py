@@ -0,0 +1,100 @@
+"""进程外插件宿主IPC往返延迟基准测试
+
+测量空请求(ping)、菜单函数调用以及批量持续性插件调用的往返延迟，
+并验证宿主进程崩溃后会自动重启
+
+运行方式(在项目根目录):
+    python -m benchmarks.bench_plugin_host_ipc
+"""
+import os
+import statistics
+import tempfile
+import time
+
+from src.PluginManager import PluginManager
+
+PLUGIN_SOURCE = '''
+from src.Plugin.PluginBase import LastingPlugin, MenuPlugin
+
+
+class SyntheticPlugin(LastingPlugin):
+    def update(self, parent, dt=0.0):
+        return [("Drag", 1, 2)]
+
+    def echo(self, parent, parameter):
+        return parameter
+'''
+
+PLUGIN_CONFIG = '''
+[plugin]
+plugin_name = "{name}"
+plugin_type = "lasting"
+out_of_process = true
+host = "bench"
+'''
+
+
+def create_plugin(directory, name):
+    """在临时目录中创建一个进程外运行的合成插件"""
+    plugin_path = os.path.join(directory, name)
+    os.makedirs(plugin_path)
+    with open(os.path.join(plugin_path, f"{name}.py"), "w", encoding="utf-8") as f:
+        f.write(PLUGIN_SOURCE)
+    with open(os.path.join(plugin_path, "config.toml"), "w", encoding="utf-8") as f:
+        f.write(PLUGIN_CONFIG.format(name=name))
+    return {'plugin_name': name, 'plugin_path': plugin_path, 'plugin_type': 'lasting', 'enabled': True}
+
+
+def report(title, samples):
+    """打印延迟统计(微秒)"""
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{title:<24} mean {statistics.mean(samples) * 1e6:8.1f}us"
+          f"  p50 {statistics.median(samples) * 1e6:8.1f}us  p99 {p99 * 1e6:8.1f}us")
+
+
+def main():
+    rounds = 2000
+    with tempfile.TemporaryDirectory() as directory:
+        plugins = [create_plugin(directory, f"Synthetic{i}") for i in range(10)]
+        manager = PluginManager(plugins)
+        manager.rebuild_index()
+        host = manager.get_plugin_host("bench")
+
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            host.request('ping', None, None)
+            samples.append(time.perf_counter() - start)
+        report("ping", samples)
+
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            host.call("Synthetic0", "echo", "hello")
+            samples.append(time.perf_counter() - start)
+        report("call", samples)
+
+        # 10个持续性插件合并为一条批量请求，测量发送到取回结果的时间
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            manager.execute_lasting_plugins(None)
+            results = []
+            while not results:
+                results = host.poll_tick_results()
+            samples.append(time.perf_counter() - start)
+        report("tick (10 插件/批)", samples)
+
+        # 模拟宿主进程崩溃，下一次调用时应自动重启并重新加载插件
+        host.process.kill()
+        host.process.wait()
+        start = time.perf_counter()
+        result = host.call("Synthetic0", "echo", "restarted")
+        print(f"崩溃后重启并调用: {result!r}, 耗时 {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""离屏渲染基准测试
+
+无需显示器和显卡(使用 offscreen 平台和 Mesa llvmpipe 软件渲染)，在 QOffscreenSurface 上创建 OpenGL 上下文，
+用帧缓冲区代替窗口，通过 Live2dModel.initialize 加载自带的模型，在多种窗口大小和渲染分辨率比例下
+驱动 update/draw 各 N 帧，以 JSON 输出帧率、各阶段的平均和 P95 耗时以及进程的峰值内存，便于跟踪性能回归
+
+每帧的各阶段与 paintGL 一致: model(update_model)、lipsync、transform、draw(含降低分辨率时的放大复制)，
+另外 finish 为等待软件渲染实际完成(glFinish)的时间
+
+运行方式(在项目根目录):
+    LIBGL_ALWAYS_SOFTWARE=1 python -m benchmarks.bench_render_offscreen
+    LIBGL_ALWAYS_SOFTWARE=1 python -m benchmarks.bench_render_offscreen --frames 300 --sizes 400x400 800x800 \
+        --scales 1 0.5 --output render.json
+
+部分 PySide6 的 offscreen 平台插件只能借助 X 服务器创建 OpenGL 上下文，创建失败时用 xvfb-run 运行:
+    LIBGL_ALWAYS_SOFTWARE=1 xvfb-run -a python -m benchmarks.bench_render_offscreen
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QGuiApplication, QOffscreenSurface, QOpenGLContext
+from PySide6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+
+from src.MyDeskPetCore.Live2d import Live2dModel
+from src.MyDeskPetCore.RenderTarget import RenderTarget
+
+MODEL_PATH = "resources/Live2dModel/Firefly-desktop/Firefly.model3.json"
+PHASES = ('model', 'lipsync', 'transform', 'draw', 'finish')
+# 每种配置开始计时前先绘制的帧数，排除纹理上传、着色器编译等一次性开销
+WARMUP_FRAMES = 10
+GL_RENDERER = 0x1F01
+GL_VERSION = 0x1F02
+
+
+def parse_size(text):
+    """解析形如 400x400 的窗口大小"""
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"窗口大小的格式应为 宽x高: {text}")
+    return width, height
+
+
+def percentile(values, percent):
+    """返回已排序数据的分位数"""
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+def run(context, live2d, size, render_scale, frames):
+    """以指定的窗口大小和渲染分辨率比例绘制，返回该配置的统计结果
+
+    参数:
+        context (QOpenGLContext): 当前的OpenGL上下文
+        live2d (Live2dModel): 已加载的模型
+        size (Tuple[int, int]): 窗口大小
+        render_scale (float): 渲染分辨率比例
+        frames (int): 计时的帧数
+    返回值:
+        dict: 帧率、各阶段耗时(毫秒)等统计结果
+    """
+    functions = context.functions()
+    fmt = QOpenGLFramebufferObjectFormat()
+    fmt.setAttachment(QOpenGLFramebufferObject.Attachment.CombinedDepthStencil)
+    window_fbo = QOpenGLFramebufferObject(*size, fmt)
+
+    target = None
+    display_size = size
+    if render_scale < 1:
+        target = RenderTarget(render_scale)
+        display_size = target.resize(*size)
+    live2d.resize(*display_size)
+
+    perf_counter = time.perf_counter
+    background = [0, 0, 0, 0]
+    samples = {name: [] for name in PHASES}
+    totals = []
+    last = 0.0
+    for frame in range(WARMUP_FRAMES + frames):
+        window_fbo.bind()
+        functions.glViewport(0, 0, *size)
+        start = perf_counter()
+        live2d.update_model(start - last if last else 1 / 60)
+        last = start
+        model_end = perf_counter()
+        live2d.update_lipsync()
+        lipsync_end = perf_counter()
+        live2d.update_transform(1.0)
+        transform_end = perf_counter()
+        live2d.draw_if_changed(background, force=True, target=target, blit_target=window_fbo)
+        draw_end = perf_counter()
+        functions.glFinish()
+        end = perf_counter()
+        if frame < WARMUP_FRAMES:
+            continue
+        for name, value in zip(PHASES, (model_end - start, lipsync_end - model_end, transform_end - lipsync_end,
+                                        draw_end - transform_end, end - draw_end)):
+            samples[name].append(value * 1000)
+        totals.append((end - start) * 1000)
+
+    if target is not None:
+        target.dispose()
+    window_fbo.release()
+
+    ordered = sorted(totals)
+    return {
+        'size': list(size),
+        'render_scale': render_scale,
+        'render_size': list(display_size),
+        'frames': frames,
+        'fps': 1000 / statistics.mean(totals),
+        'frame_ms': {'mean': statistics.mean(totals), 'p50': percentile(ordered, 50),
+                     'p95': percentile(ordered, 95), 'max': ordered[-1]},
+        'phases_ms': {name: {'mean': statistics.mean(values), 'p95': percentile(sorted(values), 95)}
+                      for name, values in samples.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live2D 模型离屏渲染基准测试")
+    parser.add_argument("--frames", type=int, default=120, help="每种配置计时的帧数")
+    parser.add_argument("--sizes", type=parse_size, nargs="+", default=[(400, 400), (800, 800)],
+                        help="窗口大小，如 400x400")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5], help="渲染分辨率比例")
+    parser.add_argument("--model", default=MODEL_PATH, help="模型文件路径")
+    parser.add_argument("--output", help="结果写入的JSON文件，默认输出到标准输出")
+    args = parser.parse_args()
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    surface = QOffscreenSurface()
+    surface.create()
+    context = QOpenGLContext()
+    if not context.create() or not context.makeCurrent(surface):
+        print("无法创建OpenGL上下文，请确认已安装 Mesa(libgl1-mesa-dri)，或使用 xvfb-run 运行", file=sys.stderr)
+        sys.exit(1)
+
+    functions = context.functions()
+    # Live2dModel.initialize 在当前绑定的帧缓冲区中初始化，先绑定一个与第一个窗口大小相同的帧缓冲区
+    init_fbo = QOpenGLFramebufferObject(*args.sizes[0])
+    init_fbo.bind()
+    live2d = Live2dModel()
+    start = time.perf_counter()
+    if live2d.initialize(args.model, args.sizes[0]) is False or live2d.model is None:
+        print(f"模型加载失败: {args.model}", file=sys.stderr)
+        sys.exit(1)
+    load_ms = (time.perf_counter() - start) * 1000
+    init_fbo.release()
+
+    runs = [run(context, live2d, size, render_scale, args.frames)
+            for size in args.sizes for render_scale in args.scales]
+
+    result = {
+        'renderer': functions.glGetString(GL_RENDERER),
+        'gl_version': functions.glGetString(GL_VERSION),
+        'platform': app.platformName(),
+        'python': platform.python_version(),
+        'model': args.model,
+        'model_load_ms': load_ms,
+        # Linux 上 ru_maxrss 的单位为KB
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'runs': runs,
+    }
+    live2d.dispose()
+    context.doneCurrent()
+
+    text = json.dumps(result, indent=1, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""渲染分辨率比例(model.render_scale)基准测试
+
+无需显示器和显卡(使用 offscreen 平台和 Mesa llvmpipe 软件渲染)，在离屏上下文中加载自带的模型，
+用一个与窗口同样大小的帧缓冲区代替窗口，分别以不同的渲染分辨率比例绘制，统计每帧绘制(含放大复制)的平均耗时
+
+运行方式(在项目根目录):
+    LIBGL_ALWAYS_SOFTWARE=1 python -m benchmarks.bench_render_scale
+
+部分 PySide6 的 offscreen 平台插件只能借助 X 服务器创建 OpenGL 上下文，创建失败时用 xvfb-run 运行:
+    LIBGL_ALWAYS_SOFTWARE=1 xvfb-run -a python -m benchmarks.bench_render_scale
+"""
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QGuiApplication, QOffscreenSurface, QOpenGLContext
+from PySide6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+
+from src.MyDeskPetCore.Live2d import Live2dModel
+from src.MyDeskPetCore.RenderTarget import RenderTarget
+
+MODEL_PATH = "resources/Live2dModel/Firefly-desktop/Firefly.model3.json"
+WINDOW_SIZE = (800, 800)
+SCALES = (1.0, 0.75, 0.5)
+FRAMES = 120
+BACKGROUND = [0, 0, 0, 0]
+
+
+def run(context, live2d, window_fbo, render_scale):
+    """以指定的渲染分辨率比例绘制 FRAMES 帧，返回每帧的耗时(毫秒)"""
+    functions = context.functions()
+    target = None
+    width, height = WINDOW_SIZE
+    if render_scale < 1:
+        target = RenderTarget(render_scale)
+        width, height = target.resize(*WINDOW_SIZE)
+    live2d.resize(width, height)
+
+    times = []
+    for _ in range(FRAMES + 10):
+        window_fbo.bind()
+        functions.glViewport(0, 0, *WINDOW_SIZE)
+        start = time.perf_counter()
+        live2d.update(1.0, 1 / 60)
+        live2d.draw_if_changed(BACKGROUND, force=True, target=target, blit_target=window_fbo)
+        # 等待软件渲染实际完成后再计时
+        functions.glFinish()
+        times.append((time.perf_counter() - start) * 1000)
+    # 前几帧包含纹理上传等一次性开销，不计入统计
+    return times[10:]
+
+
+def main():
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    surface = QOffscreenSurface()
+    surface.create()
+    context = QOpenGLContext()
+    if not context.create() or not context.makeCurrent(surface):
+        print("无法创建OpenGL上下文，请确认已安装 Mesa(libgl1-mesa-dri)")
+        return
+
+    fmt = QOpenGLFramebufferObjectFormat()
+    fmt.setAttachment(QOpenGLFramebufferObject.Attachment.CombinedDepthStencil)
+    window_fbo = QOpenGLFramebufferObject(*WINDOW_SIZE, fmt)
+    window_fbo.bind()
+
+    live2d = Live2dModel()
+    live2d.initialize(MODEL_PATH, WINDOW_SIZE)
+    print(f"窗口 {WINDOW_SIZE[0]}x{WINDOW_SIZE[1]}，每个比例 {FRAMES} 帧，"
+          f"渲染器 {context.functions().glGetString(0x1F01)}")
+
+    baseline = None
+    for render_scale in SCALES:
+        times = run(context, live2d, window_fbo, render_scale)
+        mean = statistics.mean(times)
+        baseline = baseline or mean
+        print(f"render_scale {render_scale:.2f}: 平均 {mean:.2f}ms，中位数 {statistics.median(times):.2f}ms，"
+              f"相对 1.0 为 {mean / baseline:.2f} 倍")
+
+    live2d.dispose()
+    context.doneCurrent()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""托盘菜单创建耗时基准测试
+
+对比启动时立即加载全部菜单型插件(旧方式)与按插件清单创建占位菜单、延迟加载插件模块(新方式)
+的菜单创建耗时。每种方式都在独立的子进程中运行，以便测量冷启动时的导入开销
+
+运行方式(在项目根目录):
+    python -m benchmarks.bench_startup_menu
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+import types
+
+
+def measure(eager):
+    """在当前进程中创建托盘菜单并返回耗时统计"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QWidget
+
+    from src.ConfigManager import ConfigManager
+    from src.MyDeskPetCore.Menu import ContextMenuEvent
+    from src.PluginManager import PluginManager
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    class FakePet(QWidget):
+        """只提供托盘菜单所需属性的桌宠窗口"""
+
+        def __init__(self):
+            super().__init__()
+            self.plugins = ConfigManager("config.toml").config.get("plugins", [])
+            self.plugin_manager = PluginManager(self.plugins)
+            # 模型加载完成后托盘菜单才创建延迟加载的插件菜单
+            self.live2d = types.SimpleNamespace(model=object())
+
+        def quit(self):
+            pass
+
+    pet = FakePet()
+    start = time.perf_counter()
+    tray = ContextMenuEvent(pet)
+    if eager:
+        # 旧方式: 启动时加载所有菜单型插件并创建自定义菜单
+        for plugin_info in pet.plugins:
+            if plugin_info['plugin_type'] == 'menu' and plugin_info['enabled']:
+                pet.plugin_manager.get_plugin_instance(plugin_info)
+        tray.load_deferred_menus()
+    elapsed = time.perf_counter() - start
+    loaded = len(pet.plugin_manager.loaded_plugins)
+    tray.sysTray.hide()
+    app.processEvents()
+    return {'elapsed_ms': elapsed * 1000, 'loaded_plugins': loaded}
+
+
+def main():
+    if len(sys.argv) > 1:
+        print(json.dumps(measure(sys.argv[1] == "eager")))
+        return
+
+    for mode, title in (("eager", "启动时全部加载"), ("lazy", "按需加载")):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup_menu", mode],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{title:<10} 菜单创建 {result['elapsed_ms']:8.1f}ms  已加载插件模块 {result['loaded_plugins']:2d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
+import atexit
+import copy
+import hashlib
+import marshal
 import os.path
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Type
 
 import tomli
 import tomli_w
 
+from .ConfigSchema import ConfigSection
+
 # 定义泛型类型变量用于类型提示
 T = TypeError('T')
 
@@ -10,24 +20,85 @@ T = TypeError('T')
 class ConfigManager:
     """配置管理器类，用于处理TOML格式配置文件的加载和保存
 
+    写入时先写入同目录下的临时文件并 fsync，再重命名替换原文件，写入中途崩溃不会损坏配置文件。
+    启用延迟写入后，save 只记录当前配置的快照，短时间内的多次保存合并为一次，
+    由后台线程完成写入，调用 flush 可等待写入完成。后台写入失败时记录在 write_error 中并通知写入失败监听器；
+    用户在界面中主动保存时以 save(wait=True) 立即写入，写入失败时直接抛出异常。
+
+    通过 shared 获取的实例在进程内按路径共享，并按文件的 mtime/size 判断是否需要重新读取，
+    只读的使用者通过 view 获取不可修改的视图，修改配置统一通过共享实例的 config 和 save 完成。
+
+    每次保存或重新读取后，与上一次的配置逐键比较，把变化的配置键(如 window.x、plugins[0].enabled)
+    及其新值通知给变化监听器，被删除的配置键的新值为None
+
+    指定配置模型(见 ConfigSchema)后，读取和保存时按模型校验并转换配置，校验结果保存在 settings 中，
+    频繁执行的代码通过 settings 的属性访问配置
+
+    启用快照后，每次解析或写入配置文件时在旁边保存一份 marshal 格式的二进制快照(<配置文件>.snap)，
+    下次读取时文件的 mtime/size 一致、或内容哈希一致就直接从快照读取，不再解析TOML
+
     属性:
         config_file (str): 配置文件路径
         config (dict): 当前配置数据
-        backup_config (dict): 配置数据备份
+        backup_config (dict): 最近一次成功读取或保存的配置的深拷贝，保存失败时用于回滚
+        schema (Optional[type]): 配置模型，ConfigSection 的子类
+        settings (Optional[ConfigSection]): 按配置模型校验后的配置，未指定配置模型时为None
+        write_behind (bool): 是否启用延迟写入
+        write_delay (float): 延迟写入时合并保存请求的时间窗口(秒)
+        write_count (int): 实际写入磁盘的次数
+        write_error (Optional[str]): 最近一次后台写入失败的原因，之后写入成功时清除
+        snapshot (bool): 是否使用二进制快照加速读取
     """
 
-    def __init__(self, config_file: str, create_if_not_exists: bool = False) -> None:
+    # 快照文件的扩展名、文件头和格式版本，格式或 marshal 版本变化时旧快照整体失效
+    SNAPSHOT_SUFFIX = ".snap"
+    SNAPSHOT_MAGIC = b"DPCFG"
+    SNAPSHOT_VERSION = 1
+
+    # 进程内共享的实例: 规范化后的路径 -> 配置管理器
+    _shared: Dict[str, "ConfigManager"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, config_file: str, create_if_not_exists: bool = False,
+                 write_behind: bool = False, write_delay: float = 0.2,
+                 schema: Optional[Type[ConfigSection]] = None, snapshot: bool = True) -> None:
         """初始化配置管理器
 
         参数:
             config_file (str): 配置文件路径
             create_if_not_exists (bool): 如果配置文件不存在是否创建
+            write_behind (bool): 是否启用延迟写入
+            write_delay (float): 延迟写入时合并保存请求的时间窗口(秒)
+            schema (Optional[Type[ConfigSection]]): 配置模型，为None时不校验配置
+            snapshot (bool): 是否使用二进制快照加速读取
         返回值:
             None
         """
         self.config_file = config_file
         self.config = {}
         self.backup_config = {}
+        self.schema = schema
+        self.settings = None
+        self.write_behind = write_behind
+        self.write_delay = write_delay
+        self.write_count = 0
+        self.write_error: Optional[str] = None
+        self.snapshot = snapshot
+
+        # 延迟写入状态，由 _condition 保护
+        self._condition = threading.Condition()
+        self._pending = None
+        self._first_request = 0.0
+        self._deadline = 0.0
+        self._writing = False
+        self._writer = None
+        # 最近一次读取或写入时文件的 (mtime_ns, size)，由 _condition 保护，以及缓存的只读视图
+        self._stamp = None
+        self._view = None
+        # 上一次读取或保存时的配置，用于计算变化的配置键
+        self._baseline = None
+        self._change_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._write_error_listeners: List[Callable[[str], None]] = []
         # 如果配置文件存在则加载，否则创建目录并初始化配置文件
         if os.path.exists(config_file):
             self.load()
@@ -46,35 +117,415 @@ class ConfigManager:
         返回值:
             None
         异常:
-            ValueError: TOML格式解析失败时抛出
+            ValueError: TOML格式解析失败或不符合配置模型时抛出，此时保留当前配置
             IOError: 文件读取失败时抛出
         """
         try:
-            with open(self.config_file, "rb") as f:
-                # 解析TOML格式配置文件
-                self.config = tomli.load(f)
-                # 创建配置备份用于异常恢复
-                self.backup_config = self.config.copy()
+            config, stamp = self._read()
         except tomli.TOMLDecodeError as e:
             raise ValueError(f"配置文件格式错误: {e}")
         except Exception as e:
             raise IOError(f"无法读取配置文件: {e}")
 
-    def save(self):
+        settings = self._validate(config)
+        self.config = config
+        self.settings = settings
+        # 创建配置备份用于异常恢复，嵌套的表和数组也一并复制
+        self.backup_config = self._copy(config)
+        with self._condition:
+            self._stamp = stamp
+        self._view = None
+        self._update_baseline(self._copy(config))
+
+    def _read(self):
+        """读取配置文件，快照有效时直接使用快照中的配置
+
+        返回值:
+            tuple: (配置数据, 文件的 (mtime_ns, size))
+        """
+        cached = self._load_snapshot() if self.snapshot else None
+        if cached is not None:
+            stat = os.stat(self.config_file)
+            if (stat.st_mtime_ns, stat.st_size) == cached[0]:
+                return cached[2], cached[0]
+
+        with open(self.config_file, "rb") as f:
+            stat = os.fstat(f.fileno())
+            content = f.read()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        digest = hashlib.sha1(content).hexdigest()
+        if cached is not None and cached[1] == digest:
+            # 文件被touch或复制过但内容没有变化
+            config = cached[2]
+        else:
+            # 解析TOML格式配置文件
+            config = tomli.loads(content.decode("utf-8"))
+        if self.snapshot:
+            self._write_snapshot(stamp, digest, config)
+        return config, stamp
+
+    def _load_snapshot(self):
+        """读取快照，快照不存在、损坏或版本不符时返回None
+
+        返回值:
+            Optional[tuple]: ((mtime_ns, size), sha1, 配置数据)
+        """
+        header = self.SNAPSHOT_MAGIC + bytes((self.SNAPSHOT_VERSION, marshal.version))
+        try:
+            with open(self.config_file + self.SNAPSHOT_SUFFIX, "rb") as f:
+                data = f.read()
+            if not data.startswith(header):
+                return None
+            mtime_ns, size, digest, config = marshal.loads(data[len(header):])
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(config, dict):
+            return None
+        return (mtime_ns, size), digest, config
+
+    def _write_snapshot(self, stamp, digest: str, config: Dict[str, Any]) -> None:
+        """写入快照，配置中含有 marshal 不支持的值(如日期)或写入失败时删除旧快照"""
+        header = self.SNAPSHOT_MAGIC + bytes((self.SNAPSHOT_VERSION, marshal.version))
+        snapshot_file = self.config_file + self.SNAPSHOT_SUFFIX
+        try:
+            data = header + marshal.dumps((stamp[0], stamp[1], digest, config))
+            temp_file = f"{snapshot_file}.tmp"
+            with open(temp_file, "wb") as f:
+                f.write(data)
+            os.replace(temp_file, snapshot_file)
+        except (OSError, ValueError):
+            try:
+                os.remove(snapshot_file)
+            except OSError:
+                pass
+
+    def save(self, wait: bool = False):
         """将内存中的配置数据写入磁盘文件
 
+        启用延迟写入时只记录配置快照并立即返回，写入在后台线程中完成，
+        写入失败时记录在 write_error 中并通知写入失败监听器
+
         参数:
-            无
+            wait (bool): 启用延迟写入时是否仍然立即写入并等待完成，用户在界面中主动保存时使用，
+                以便写入失败时能直接提示用户
         返回值:
             None
         异常:
+            ValueError: 配置不符合配置模型时抛出，并自动恢复备份配置
             IOError: 文件写入失败时抛出，并自动恢复备份配置
         """
+        self._view = None
+        try:
+            settings = self._validate(self.config)
+        except ValueError:
+            self.rollback()
+            raise
+
+        if self.write_behind and not wait:
+            self.settings = settings
+            snapshot = self._schedule_write()
+            self.backup_config = self._copy(snapshot)
+            self._update_baseline(snapshot)
+            return
+
         try:
-            with open(self.config_file, "wb") as f:
-                # 将当前配置写入文件
-                tomli_w.dump(self.config, f)
+            if self.write_behind:
+                self._write_now(self.config)
+            else:
+                self._write_atomic(self.config)
         except Exception as e:
             # 写入失败时恢复备份配置
-            self.config = self.backup_config
+            self.rollback()
             raise IOError(f"无法保存配置文件: {e}")
+        self.settings = settings
+        snapshot = self._copy(self.config)
+        self.backup_config = self._copy(snapshot)
+        self._update_baseline(snapshot)
+
+    def save_settings(self, settings: ConfigSection, wait: bool = False) -> None:
+        """用配置模型替换当前配置并保存
+
+        参数:
+            settings (ConfigSection): 配置模型实例，通常是修改过的 settings.copy()
+            wait (bool): 启用延迟写入时是否仍然立即写入并等待完成
+        异常:
+            ValueError: 配置不符合配置模型时抛出
+            IOError: 文件写入失败时抛出
+        """
+        data = settings.to_dict()
+        if self.schema is not None:
+            # 修改配置模型的属性时没有经过类型转换，写入前再按配置模型转换一次
+            data = self.schema.from_dict(data).to_dict()
+        self.config = data
+        self.save(wait)
+
+    def rollback(self) -> None:
+        """把当前配置恢复为最近一次成功读取或保存的配置"""
+        self.config = self._copy(self.backup_config)
+        self.settings = self._validate(self.config) if self.schema is not None else None
+        self._view = None
+
+    @staticmethod
+    def _copy(config: Dict[str, Any]) -> Dict[str, Any]:
+        """深拷贝配置数据，通过 marshal 序列化复制比 copy.deepcopy 快数倍，含有 marshal 不支持的值时退回 deepcopy"""
+        try:
+            return marshal.loads(marshal.dumps(config))
+        except ValueError:
+            return copy.deepcopy(config)
+
+    def _validate(self, config: Dict[str, Any]) -> Optional[ConfigSection]:
+        """按配置模型校验配置，未指定配置模型时返回None"""
+        if self.schema is None:
+            return None
+        return self.schema.from_dict(config)
+
+    def flush(self, timeout: float = None) -> bool:
+        """立即写入尚未写入的配置并等待写入完成
+
+        参数:
+            timeout (float): 最长等待时间(秒)，为None时一直等待
+        返回值:
+            bool: 是否已全部写入
+        """
+        with self._condition:
+            self._deadline = 0.0
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def _schedule_write(self):
+        """记录当前配置的快照，在时间窗口结束后由后台线程写入
+
+        时间窗口内再次保存会替换快照并重新计时，连续保存最多推迟 5 个时间窗口
+
+        返回值:
+            dict: 配置快照
+        """
+        snapshot = self._copy(self.config)
+        now = time.monotonic()
+        with self._condition:
+            if self._pending is None:
+                self._first_request = now
+            self._pending = snapshot
+            self._deadline = min(now + self.write_delay, self._first_request + self.write_delay * 5)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="ConfigWriter", daemon=True)
+                self._writer.start()
+                # 程序退出前写入尚未写入的配置
+                atexit.register(self.flush)
+            self._condition.notify_all()
+        return snapshot
+
+    def _write_loop(self):
+        """后台写入线程，等待时间窗口结束后写入最新的配置快照"""
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                while True:
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                data, self._pending = self._pending, None
+                self._writing = True
+
+            try:
+                self._write_atomic(data)
+            except Exception as e:
+                error = f"无法保存配置文件 {self.config_file}: {e}"
+                print(error)
+            else:
+                error = None
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+            self._report_write_error(error)
+
+    def _write_now(self, data):
+        """在当前线程中立即写入配置，取代尚未写入的延迟写入，写入失败时抛出异常"""
+        with self._condition:
+            # 等待后台线程写完正在写入的配置，尚未写入的快照已过时，不再写入
+            self._condition.wait_for(lambda: not self._writing)
+            self._pending = None
+            self._writing = True
+        try:
+            self._write_atomic(data)
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+        self._report_write_error(None)
+
+    def _report_write_error(self, error: Optional[str]) -> None:
+        """记录写入结果，写入失败时通知写入失败监听器"""
+        self.write_error = error
+        if error is None:
+            return
+        for listener in self._write_error_listeners:
+            try:
+                listener(error)
+            except Exception as e:
+                print(f"配置写入失败处理出错: {e}")
+
+    def add_write_error_listener(self, listener: Callable[[str], None]) -> None:
+        """添加后台写入失败监听器
+
+        监听器在后台写入线程中调用，需要更新界面时应通过Qt信号转到GUI线程
+
+        参数:
+            listener (Callable[[str], None]): 监听器，参数为错误信息
+        """
+        self._write_error_listeners.append(listener)
+
+    def _write_atomic(self, data):
+        """把配置写入临时文件并 fsync，然后重命名替换配置文件"""
+        content = tomli_w.dumps(data).encode("utf-8")
+        temp_file = f"{self.config_file}.tmp"
+        with open(temp_file, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.config_file)
+        stat = os.stat(self.config_file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        # 写入可能在后台线程中进行，与 refresh 中的比较互斥
+        with self._condition:
+            self._stamp = stamp
+            self.write_count += 1
+        if self.snapshot:
+            self._write_snapshot(stamp, hashlib.sha1(content).hexdigest(), data)
+
+    def add_change_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """添加配置变化监听器，保存或重新读取后有配置键变化时调用
+
+        参数:
+            listener (Callable[[Dict[str, Any]], None]): 监听器，参数为 {配置键: 新值}
+        """
+        self._change_listeners.append(listener)
+
+    def _update_baseline(self, snapshot: Dict[str, Any]) -> None:
+        """记录新的配置快照，与上一次的快照比较并通知变化监听器"""
+        baseline, self._baseline = self._baseline, snapshot
+        if baseline is None or not self._change_listeners:
+            return
+        changes = self.diff(baseline, snapshot)
+        if not changes:
+            return
+        for listener in self._change_listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                print(f"配置变化处理失败: {e}")
+
+    @classmethod
+    def diff(cls, old: Any, new: Any, prefix: str = "") -> Dict[str, Any]:
+        """逐键比较两份配置
+
+        表按键递归比较，长度相同的数组按下标递归比较，长度不同的数组整体视为变化
+
+        参数:
+            old (Any): 旧配置
+            new (Any): 新配置
+            prefix (str): 配置键前缀
+        返回值:
+            Dict[str, Any]: {配置键: 新值}，配置键形如 window.x、plugins[0].enabled，被删除的键新值为None
+        """
+        if isinstance(old, dict) and isinstance(new, dict):
+            changes = {}
+            for key in list(new) + [key for key in old if key not in new]:
+                path = f"{prefix}.{key}" if prefix else key
+                if key not in new:
+                    changes[path] = None
+                elif key not in old:
+                    changes[path] = new[key]
+                else:
+                    changes.update(cls.diff(old[key], new[key], path))
+            return changes
+        if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+            changes = {}
+            for index, (old_item, new_item) in enumerate(zip(old, new)):
+                changes.update(cls.diff(old_item, new_item, f"{prefix}[{index}]"))
+            return changes
+        if old != new:
+            return {prefix: new}
+        return {}
+
+    @classmethod
+    def shared(cls, config_file: str, create_if_not_exists: bool = False,
+               write_behind: Optional[bool] = None,
+               schema: Optional[Type[ConfigSection]] = None) -> "ConfigManager":
+        """获取进程内共享的配置管理器
+
+        同一路径始终返回同一个实例，文件在外部被修改后(mtime 或 size 变化)会自动重新读取
+
+        参数:
+            config_file (str): 配置文件路径
+            create_if_not_exists (bool): 如果配置文件不存在是否创建
+            write_behind (Optional[bool]): 是否启用延迟写入，为None时保持实例原有的设置
+            schema (Optional[Type[ConfigSection]]): 配置模型，为None时保持实例原有的设置
+        返回值:
+            ConfigManager: 共享的配置管理器
+        异常:
+            FileNotFoundError: 配置文件不存在且不创建时抛出
+        """
+        key = os.path.normcase(os.path.abspath(config_file))
+        with cls._shared_lock:
+            instance = cls._shared.get(key)
+            if instance is None:
+                instance = cls._shared[key] = cls(config_file, create_if_not_exists,
+                                                  write_behind=bool(write_behind), schema=schema)
+                return instance
+
+        if write_behind is not None:
+            instance.write_behind = write_behind
+        if schema is not None and instance.schema is not schema:
+            instance.settings = schema.from_dict(instance.config)
+            instance.schema = schema
+        instance.refresh()
+        return instance
+
+    def refresh(self) -> bool:
+        """文件在外部被修改后重新读取，有尚未写入的保存时不重新读取
+
+        返回值:
+            bool: 是否重新读取了配置文件
+        """
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return False
+        with self._condition:
+            if (stat.st_mtime_ns, stat.st_size) == self._stamp:
+                return False
+            if self._pending is not None or self._writing:
+                return False
+        self.load()
+        return True
+
+    def view(self) -> Any:
+        """获取配置的只读视图
+
+        视图中的表为 MappingProxyType，数组为 tuple，在下一次读取或保存前重复调用直接返回缓存的视图
+
+        返回值:
+            Mapping[str, Any]: 只读的配置视图
+        """
+        if self._view is None:
+            self._view = self.freeze(self.config)
+        return self._view
+
+    @classmethod
+    def freeze(cls, value: Any) -> Any:
+        """递归地把配置数据转换为不可修改的结构，表转换为 MappingProxyType，数组转换为 tuple
+
+        参数:
+            value (Any): 配置数据
+        返回值:
+            Any: 不可修改的配置数据
+        """
+        if isinstance(value, dict):
+            return MappingProxyType({key: cls.freeze(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return tuple(cls.freeze(item) for item in value)
+        return value
@@ -0,0 +1,277 @@
+import copy
+import dataclasses
+import typing
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+class ConfigSection:
+    """配置节基类
+
+    子类是带 __slots__ 的数据类，读取时对每个字段做类型转换和校验，缺少的字段使用默认值，
+    未在数据类中声明的配置键原样保存在 extra 中，写回时不会丢失
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], prefix: str = "") -> "ConfigSection":
+        """从配置数据创建配置节
+
+        参数:
+            data (Optional[Dict[str, Any]]): 配置数据，为None时全部使用默认值
+            prefix (str): 配置键前缀，用于错误信息
+        返回值:
+            ConfigSection: 配置节
+        异常:
+            ValueError: 缺少必需的配置项或配置项的值无法转换时抛出
+        """
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
+            raise ValueError(f"配置项 {prefix or '/'} 必须是表")
+
+        values = {}
+        for item in dataclasses.fields(cls):
+            if item.name == 'extra':
+                continue
+            key = f"{prefix}.{item.name}" if prefix else item.name
+            if item.name in data:
+                values[item.name] = _coerce(data[item.name], item.type, key)
+            elif item.default is dataclasses.MISSING and item.default_factory is dataclasses.MISSING:
+                raise ValueError(f"缺少配置项 {key}")
+        values['extra'] = {key: copy.deepcopy(value) for key, value in data.items()
+                           if key not in cls.__dataclass_fields__}
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可以写入TOML的配置数据，值为None的可选字段不写入
+
+        返回值:
+            Dict[str, Any]: 配置数据，再次传给 from_dict 得到相等的配置节
+        """
+        data = {}
+        for item in dataclasses.fields(self):
+            if item.name == 'extra':
+                continue
+            value = getattr(self, item.name)
+            if value is not None:
+                data[item.name] = _serialize(value)
+        data.update(copy.deepcopy(self.extra))
+        return data
+
+    def copy(self) -> "ConfigSection":
+        """深拷贝配置节，用于修改前保存快照以便回滚"""
+        return copy.deepcopy(self)
+
+
+@dataclass(slots=True)
+class WindowConfig(ConfigSection):
+    """窗口设置
+
+    属性:
+        x (int): 窗口位置X坐标
+        y (int): 窗口位置Y坐标
+        width (int): 窗口宽度
+        height (int): 窗口高度
+        background_color (List[int]): 背景颜色 [R, G, B, A]，取值 0~255
+    """
+    x: int = 600
+    y: int = 400
+    width: int = 400
+    height: int = 400
+    background_color: List[int] = field(default_factory=lambda: [0, 0, 0, 0])
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if len(self.background_color) != 4 or not all(0 <= value <= 255 for value in self.background_color):
+            raise ValueError(f"配置项 window.background_color 必须是4个 0~255 的整数: {self.background_color}")
+
+
+@dataclass(slots=True)
+class ModelConfig(ConfigSection):
+    """模型设置
+
+    属性:
+        model_path (str): Live2D模型文件路径
+        scale (float): 缩放比例
+        render_scale (float): 渲染分辨率相对窗口的比例，取值 0.25~1，小于1时降低分辨率渲染后放大显示
+    """
+    model_path: str = "resources/Live2dModel/Firefly-desktop/Firefly.model3.json"
+    scale: float = 0.75
+    render_scale: float = 1.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not 0.25 <= self.render_scale <= 1:
+            raise ValueError(f"配置项 model.render_scale 必须在 0.25~1 之间: {self.render_scale}")
+
+
+@dataclass(slots=True)
+class AnimationConfig(ConfigSection):
+    """动画设置
+
+    属性:
+        frame_rate_ms (int): 帧率(fps)
+        idle_frame_rate (int): 空闲时的帧率(fps)，为0时空闲期间暂停渲染
+        idle_delay_s (float): 没有动画、输入和插件更新多长时间后进入空闲状态(秒)
+    """
+    frame_rate_ms: int = 60
+    idle_frame_rate: int = 10
+    idle_delay_s: float = 5.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.frame_rate_ms <= 0:
+            raise ValueError(f"配置项 animation.frame_rate_ms 必须大于0: {self.frame_rate_ms}")
+        if self.idle_frame_rate < 0:
+            raise ValueError(f"配置项 animation.idle_frame_rate 不能小于0: {self.idle_frame_rate}")
+
+
+@dataclass(slots=True)
+class PluginManagerConfig(ConfigSection):
+    """插件管理器设置，各项含义见 config_example.toml
+
+    属性:
+        profiler (bool): 是否在启动时启用插件耗时分析
+        hot_reload (bool): 是否启用插件热重载
+        frame_budget_ms (float): 持续性插件单次调用的耗时预算(毫秒)
+        failure_threshold (int): 触发熔断的连续失败或超时次数
+        backoff_s (float): 第一次熔断的时间(秒)
+        max_backoff_s (float): 最长熔断时间(秒)
+        idle_timeout_s (float): 发布 on_idle 事件前等待的时间(秒)
+    """
+    profiler: bool = False
+    hot_reload: bool = False
+    frame_budget_ms: float = 8.0
+    failure_threshold: int = 3
+    backoff_s: float = 1.0
+    max_backoff_s: float = 60.0
+    idle_timeout_s: float = 60.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class PluginRecord(ConfigSection):
+    """插件列表中的一条插件记录
+
+    属性:
+        plugin_name (str): 插件名称
+        plugin_path (str): 插件目录
+        plugin_type (str): 插件类型，menu/lasting/init/event
+        enabled (bool): 是否启用
+        plugin_chinese_name (Optional[str]): 插件中文名称
+        icon (Optional[str]): 插件图标
+        function_name (Optional[str]): 插件函数名称
+    """
+    plugin_name: str
+    plugin_path: str
+    plugin_type: str = "menu"
+    enabled: bool = True
+    plugin_chinese_name: Optional[str] = None
+    icon: Optional[str] = None
+    function_name: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class AppConfig(ConfigSection):
+    """桌宠配置文件(config.toml)的类型化模型
+
+    读取配置文件时统一校验一次，之后在渲染循环等频繁执行的代码中通过属性访问配置，
+    不再逐层查找嵌套的字典
+
+    属性:
+        window (WindowConfig): 窗口设置
+        model (ModelConfig): 模型设置
+        animation (AnimationConfig): 动画设置
+        plugin_manager (PluginManagerConfig): 插件管理器设置
+        plugins (List[PluginRecord]): 插件列表
+    """
+    window: WindowConfig = field(default_factory=WindowConfig)
+    model: ModelConfig = field(default_factory=ModelConfig)
+    animation: AnimationConfig = field(default_factory=AnimationConfig)
+    plugin_manager: PluginManagerConfig = field(default_factory=PluginManagerConfig)
+    plugins: List[PluginRecord] = field(default_factory=list)
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def find_plugin(self, plugin_name: str) -> Optional[PluginRecord]:
+        """按名称查找插件记录，找不到时返回None"""
+        for plugin in self.plugins:
+            if plugin.plugin_name == plugin_name:
+                return plugin
+        return None
+
+
+def _coerce(value: Any, annotation: Any, key: str) -> Any:
+    """按字段的类型注解转换配置项的值
+
+    参数:
+        value (Any): 配置项的值
+        annotation (Any): 字段的类型注解
+        key (str): 配置键，用于错误信息
+    返回值:
+        Any: 转换后的值
+    异常:
+        ValueError: 无法转换时抛出
+    """
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        # Optional[X]
+        if value is None:
+            return None
+        annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+        return _coerce(value, annotation, key)
+
+    if origin is list:
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"配置项 {key} 必须是数组: {value!r}")
+        item_type = typing.get_args(annotation)[0]
+        return [_coerce(item, item_type, f"{key}[{index}]") for index, item in enumerate(value)]
+    if origin is dict:
+        if not isinstance(value, dict):
+            raise ValueError(f"配置项 {key} 必须是表: {value!r}")
+        return copy.deepcopy(value)
+
+    if isinstance(annotation, type) and issubclass(annotation, ConfigSection):
+        return annotation.from_dict(value, key)
+
+    try:
+        if annotation is bool:
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+                return value.strip().lower() == 'true'
+            if isinstance(value, int) and value in (0, 1):
+                return bool(value)
+        elif annotation is int:
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            if isinstance(value, str):
+                return int(value.strip())
+        elif annotation is float:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return float(value)
+            if isinstance(value, str):
+                return float(value.strip())
+        elif annotation is str:
+            if isinstance(value, str):
+                return value
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return str(value)
+    except ValueError:
+        pass
+    raise ValueError(f"配置项 {key} 的值 {value!r} 无法转换为 {getattr(annotation, '__name__', annotation)}")
+
+
+def _serialize(value: Any) -> Any:
+    """把字段的值转换为可以写入TOML的数据"""
+    if isinstance(value, ConfigSection):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_serialize(item) for item in value]
+    if isinstance(value, dict):
+        return copy.deepcopy(value)
+    return value
@@ -0,0 +1,47 @@
+import os
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer
+
+
+class ConfigWatcher(QObject):
+    """配置文件监视器
+
+    使用 QFileSystemWatcher 监视配置文件及其所在目录，文件变化后等待一段时间合并连续的修改，
+    然后调用配置管理器的 refresh 重新读取；配置管理器自己写入文件时 mtime/size 与记录一致，不会重复读取
+
+    属性:
+        config_manager (ConfigManager): 配置管理器
+    """
+
+    def __init__(self, config_manager, debounce_ms: int = 200, parent=None) -> None:
+        """初始化配置文件监视器
+
+        参数:
+            config_manager (ConfigManager): 配置管理器
+            debounce_ms (int): 合并连续修改的等待时间(毫秒)
+            parent (QObject): 父对象
+        """
+        super().__init__(parent)
+        self.config_manager = config_manager
+        self.config_file = os.path.abspath(config_manager.config_file)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._refresh)
+
+        # 同时监视所在目录: 以重命名方式替换的文件会从监视列表中消失
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.addPath(os.path.dirname(self.config_file))
+        self._watcher.addPath(self.config_file)
+        self._watcher.fileChanged.connect(lambda _: self._timer.start())
+        self._watcher.directoryChanged.connect(lambda _: self._timer.start())
+
+    def _refresh(self) -> None:
+        """重新读取发生变化的配置文件，文件格式错误时保留当前配置"""
+        if self.config_file not in self._watcher.files() and os.path.exists(self.config_file):
+            self._watcher.addPath(self.config_file)
+        try:
+            self.config_manager.refresh()
+        except (ValueError, IOError) as e:
+            print(f"配置文件重新加载失败，继续使用当前配置: {e}")
@@ -0,0 +1,125 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .PluginSupervisor import PluginSupervisor
+from src.Plugin.PluginBase import PluginBase
+
+
+class EventBus:
+    """插件事件总线
+
+    宠物窗口在事件发生时发布事件，插件只订阅自己需要的事件，没有事件时不做任何工作，
+    不必再作为持续性插件每帧轮询。插件实例创建后会自动订阅它重写了的钩子方法(见 HOOKS)
+
+    事件及回调参数:
+        on_mouse_move(parent, x, y): 鼠标在宠物窗口上移动，x/y 为屏幕坐标
+        on_click(parent, button, x, y): 在宠物窗口上单击(按下后未拖动即松开)
+        on_drag_end(parent, x, y): 拖动宠物窗口结束，x/y 为窗口的新位置
+        on_visibility_changed(parent, visible): 宠物窗口显示或隐藏
+        on_motion_finished(parent): 模型动作播放完成
+        on_idle(parent, idle_seconds): 用户一段时间没有与宠物交互
+        on_config_changed(parent, changes): 配置发生变化，changes 为 {配置键: 新值}
+
+    属性:
+        supervisor (Optional[PluginSupervisor]): 插件监督器，回调出错或超时会计入插件的熔断器
+    """
+
+    HOOKS = ('on_mouse_move', 'on_click', 'on_drag_end', 'on_visibility_changed',
+             'on_motion_finished', 'on_idle', 'on_config_changed')
+
+    def __init__(self, supervisor: Optional[PluginSupervisor] = None) -> None:
+        """初始化事件总线
+
+        参数:
+            supervisor (Optional[PluginSupervisor]): 插件监督器，为None时回调的异常会直接抛出
+        """
+        self.supervisor = supervisor
+        # 事件名称 -> ((插件名称, 回调), ...)，发布时直接遍历元组
+        self._subscribers: Dict[str, Tuple[Tuple[str, Callable], ...]] = {}
+        self._listeners: List[Callable[[], None]] = []
+
+    def subscribe(self, event: str, plugin_name: str, callback: Callable) -> None:
+        """订阅事件
+
+        参数:
+            event (str): 事件名称，必须是 HOOKS 之一
+            plugin_name (str): 订阅者(插件)名称
+            callback (Callable): 回调函数
+        异常:
+            ValueError: 事件名称未知时抛出
+        """
+        if event not in self.HOOKS:
+            raise ValueError(f"未知的事件: {event}")
+        self._subscribers[event] = self._subscribers.get(event, ()) + ((plugin_name, callback),)
+        self._notify_listeners()
+
+    def subscribe_plugin(self, plugin_name: str, plugin_instance: Any) -> List[str]:
+        """为插件实例订阅它重写了的所有钩子方法
+
+        参数:
+            plugin_name (str): 插件名称
+            plugin_instance (Any): 插件实例
+        返回值:
+            List[str]: 订阅的事件名称
+        """
+        events = []
+        for event in self.HOOKS:
+            if getattr(type(plugin_instance), event, None) is not getattr(PluginBase, event):
+                events.append(event)
+                self._subscribers[event] = (self._subscribers.get(event, ())
+                                            + ((plugin_name, getattr(plugin_instance, event)),))
+        if events:
+            self._notify_listeners()
+        return events
+
+    def unsubscribe(self, plugin_name: str) -> None:
+        """取消插件的所有订阅
+
+        参数:
+            plugin_name (str): 插件名称
+        """
+        changed = False
+        for event, subscribers in list(self._subscribers.items()):
+            kept = tuple(item for item in subscribers if item[0] != plugin_name)
+            if len(kept) != len(subscribers):
+                changed = True
+                if kept:
+                    self._subscribers[event] = kept
+                else:
+                    del self._subscribers[event]
+        if changed:
+            self._notify_listeners()
+
+    def has_subscribers(self, event: str) -> bool:
+        """事件是否有订阅者，发布者可以据此跳过计算事件参数的工作"""
+        return event in self._subscribers
+
+    def publish(self, event: str, *args) -> None:
+        """发布事件，依次调用所有订阅者
+
+        参数:
+            event (str): 事件名称
+            *args: 传递给回调的参数
+        """
+        subscribers = self._subscribers.get(event)
+        if not subscribers:
+            return
+
+        supervisor = self.supervisor
+        for plugin_name, callback in subscribers:
+            if supervisor is None:
+                callback(*args)
+            else:
+                supervisor.call(plugin_name, callback, *args)
+
+    def add_subscription_listener(self, listener: Callable[[], None]) -> None:
+        """添加订阅变化的监听器，订阅或取消订阅后调用
+
+        参数:
+            listener (Callable[[], None]): 监听器
+        """
+        self._listeners.append(listener)
+
+    def _notify_listeners(self) -> None:
+        """通知所有监听器订阅发生变化"""
+        for listener in self._listeners:
+            listener()
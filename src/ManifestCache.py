@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from .ConfigManager import ConfigManager
+
+
+class ManifestCache:
+    """插件清单持久化缓存
+
+    缓存每个插件解析后的 config.toml、插件类名、是否实现自定义菜单、插件类型和 main_page 信息，
+    启动时无需重新解析TOML，也无需用 inspect 扫描插件模块。
+    每个被缓存的文件都记录 mtime/size/sha1，mtime 和 size 不变时直接使用缓存，
+    变化时比较文件哈希，哈希也不同时才重新解析，缓存随之自动失效
+
+    属性:
+        cache_file (str): 缓存文件路径
+        entries (dict): 插件目录 -> 缓存条目
+    """
+
+    # 缓存格式版本，格式变化时旧缓存整体失效
+    VERSION = 1
+
+    def __init__(self, cache_file: str) -> None:
+        """初始化插件清单缓存，缓存文件不存在或损坏时从空缓存开始
+
+        参数:
+            cache_file (str): 缓存文件路径
+        """
+        self.cache_file = cache_file
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.entries = data.get('plugins', {})
+        except (OSError, ValueError):
+            pass
+
+    def get_config(self, plugin_path: str) -> Mapping[str, Any]:
+        """获取插件配置的只读视图，缓存有效时不解析TOML
+
+        参数:
+            plugin_path (str): 插件目录
+        返回值:
+            Mapping[str, Any]: 插件配置的只读视图(见 ConfigManager.view)
+        异常:
+            FileNotFoundError: 配置文件不存在时抛出
+        """
+        config_path = os.path.join(plugin_path, "config.toml")
+        entry = self.entries.get(self._key(plugin_path))
+        if entry is not None and self._validate(config_path, entry.get('config_stamp')):
+            plugin_config = entry['config']
+            if not isinstance(plugin_config, MappingProxyType):
+                # 从缓存文件读取的配置同样转换为只读视图
+                plugin_config = entry['config'] = ConfigManager.freeze(plugin_config)
+            return plugin_config
+
+        plugin_config = ConfigManager.shared(config_path).view()
+        manifest = plugin_config.get('plugin', {})
+        self.entries[self._key(plugin_path)] = {
+            'config_stamp': self._stamp(config_path),
+            'config': plugin_config,
+            'plugin_type': manifest.get('plugin_type'),
+            'main_page': manifest.get('main_page'),
+            'main_page_class_name': manifest.get('main_page_class_name'),
+        }
+        self._dirty = True
+        return plugin_config
+
+    def get_class_name(self, plugin_path: str, module_file: str) -> Optional[str]:
+        """获取缓存的插件类名
+
+        参数:
+            plugin_path (str): 插件目录
+            module_file (str): 插件模块文件路径
+        返回值:
+            Optional[str]: 插件类名，缓存无效时返回None
+        """
+        entry = self.entries.get(self._key(plugin_path))
+        if entry is None or 'class_name' not in entry:
+            return None
+        if not self._validate(module_file, entry.get('module_stamp')):
+            return None
+        return entry['class_name']
+
+    def set_class_name(self, plugin_path: str, module_file: str, class_name: str) -> None:
+        """记录插件类名
+
+        参数:
+            plugin_path (str): 插件目录
+            module_file (str): 插件模块文件路径
+            class_name (str): 插件类名
+        """
+        entry = self.entries.get(self._key(plugin_path))
+        if entry is None:
+            return
+        entry['class_name'] = class_name
+        entry['module_stamp'] = self._stamp(module_file)
+        self._dirty = True
+
+    def get_custom_menu(self, plugin_path: str, module_file: str) -> Optional[bool]:
+        """获取缓存的插件模块是否实现了 create_custom_menu
+
+        参数:
+            plugin_path (str): 插件目录
+            module_file (str): 插件模块文件路径
+        返回值:
+            Optional[bool]: 是否实现了 create_custom_menu，缓存无效时返回None
+        """
+        entry = self.entries.get(self._key(plugin_path))
+        if entry is None or 'custom_menu' not in entry:
+            return None
+        if not self._validate(module_file, entry.get('custom_menu_stamp')):
+            return None
+        return entry['custom_menu']
+
+    def set_custom_menu(self, plugin_path: str, module_file: str, custom_menu: bool) -> None:
+        """记录插件模块是否实现了 create_custom_menu
+
+        参数:
+            plugin_path (str): 插件目录
+            module_file (str): 插件模块文件路径
+            custom_menu (bool): 是否实现了 create_custom_menu
+        """
+        entry = self.entries.get(self._key(plugin_path))
+        if entry is None:
+            return
+        entry['custom_menu'] = custom_menu
+        entry['custom_menu_stamp'] = self._stamp(module_file)
+        self._dirty = True
+
+    def save(self) -> None:
+        """缓存有变化时写入磁盘，写入失败不影响程序运行"""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_file = f"{self.cache_file}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                # 只读视图中的表按普通的表写入
+                json.dump({'version': self.VERSION, 'plugins': self.entries}, f, ensure_ascii=False, default=dict)
+            os.replace(temp_file, self.cache_file)
+            self._dirty = False
+        except (OSError, TypeError, ValueError) as e:
+            print(f"插件清单缓存保存失败: {e}")
+
+    @staticmethod
+    def _key(plugin_path: str) -> str:
+        """缓存条目的键: 规范化后的插件目录"""
+        return os.path.normcase(os.path.abspath(plugin_path))
+
+    @staticmethod
+    def _stamp(file_path: str) -> Dict[str, Any]:
+        """计算文件的 mtime/size/sha1 标记"""
+        stat = os.stat(file_path)
+        with open(file_path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': digest}
+
+    def _validate(self, file_path: str, stamp: Optional[Dict[str, Any]]) -> bool:
+        """检查文件是否与缓存标记一致
+
+        mtime 和 size 一致时视为未变化；否则比较文件哈希，哈希一致时更新标记并视为未变化
+        """
+        if not stamp:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if stat.st_mtime_ns == stamp['mtime_ns'] and stat.st_size == stamp['size']:
+            return True
+
+        current = self._stamp(file_path)
+        if current['sha1'] != stamp['sha1']:
+            return False
+        stamp.update(current)
+        self._dirty = True
+        return True
@@ -0,0 +1,112 @@
+import time
+from typing import Set
+
+from PySide6.QtWidgets import QWidget
+
+from .FrameScheduler import FrameScheduler
+
+
+class FrameGovernor:
+    """渲染帧率调节器
+
+    每帧结束时由宠物窗口报告本帧是否有活动(动作或唇形同步正在播放、持续性插件应用了新的结果)，
+    输入事件通过 wake 报告。持续一段时间没有任何活动后把渲染定时器降到空闲帧率(或完全暂停)，
+    任何活动出现时立即恢复正常帧率并请求重绘，不必等待下一个空闲帧
+
+    窗口被隐藏、最小化或不再可见时挂起渲染，定时器完全停止，挂起期间活动不会重新启动定时器
+
+    属性:
+        widget (QWidget): 被调节的窗口，恢复时调用其 update 立即重绘
+        timer (FrameScheduler): 驱动重绘的帧调度器
+        frame_interval_ms (float): 正常帧间隔(毫秒)
+        idle_interval_ms (float): 空闲帧间隔(毫秒)，为0时空闲期间暂停渲染
+        idle_delay (float): 没有活动多长时间后进入空闲状态(秒)
+        idle (bool): 当前是否处于空闲状态
+        idle_count (int): 进入空闲状态的次数
+        suspended (Set[str]): 挂起渲染的原因，为空时正常渲染
+    """
+
+    def __init__(self, widget: QWidget, timer: FrameScheduler, frame_interval_ms: float,
+                 idle_interval_ms: float = 100, idle_delay: float = 5.0) -> None:
+        """初始化渲染帧率调节器
+
+        参数:
+            widget (QWidget): 被调节的窗口
+            timer (FrameScheduler): 驱动重绘的帧调度器，需已按正常帧间隔启动
+            frame_interval_ms (float): 正常帧间隔(毫秒)
+            idle_interval_ms (float): 空闲帧间隔(毫秒)，为0时空闲期间暂停渲染
+            idle_delay (float): 没有活动多长时间后进入空闲状态(秒)
+        """
+        self.widget = widget
+        self.timer = timer
+        self.frame_interval_ms = frame_interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.idle_delay = idle_delay
+        self.idle = False
+        self.idle_count = 0
+        self.suspended: Set[str] = set()
+        self._last_activity = time.monotonic()
+
+    def wake(self) -> None:
+        """报告一次活动(输入事件、配置变化等)，空闲时立即恢复正常帧率"""
+        self._last_activity = time.monotonic()
+        if self.idle and not self.suspended:
+            self.idle = False
+            self.timer.start(self.frame_interval_ms)
+            self.widget.update()
+
+    def tick(self, active: bool) -> None:
+        """每帧结束时调用，报告本帧是否有活动
+
+        参数:
+            active (bool): 本帧是否有动画或插件更新
+        """
+        if self.suspended:
+            return
+        if active:
+            self.wake()
+        elif not self.idle and time.monotonic() - self._last_activity >= self.idle_delay:
+            self.idle = True
+            self.idle_count += 1
+            if self.idle_interval_ms > 0:
+                self.timer.start(self.idle_interval_ms)
+            else:
+                self.timer.stop()
+
+    def configure(self, frame_interval_ms: float, idle_interval_ms: float, idle_delay: float) -> None:
+        """修改帧间隔和空闲条件，并按当前状态重新设置定时器
+
+        参数:
+            frame_interval_ms (float): 正常帧间隔(毫秒)
+            idle_interval_ms (float): 空闲帧间隔(毫秒)，为0时空闲期间暂停渲染
+            idle_delay (float): 没有活动多长时间后进入空闲状态(秒)
+        """
+        self.frame_interval_ms = frame_interval_ms
+        self.idle_interval_ms = idle_interval_ms
+        self.idle_delay = idle_delay
+        # 配置变化本身就是一次活动，恢复正常帧率后再重新计时
+        self.idle = True
+        self.wake()
+
+    def suspend(self, reason: str) -> None:
+        """挂起渲染，停止定时器
+
+        参数:
+            reason (str): 挂起的原因，如 hidden/minimized/unexposed，全部原因解除后才恢复
+        """
+        if not self.suspended:
+            self.timer.stop()
+        self.suspended.add(reason)
+
+    def resume(self, reason: str) -> None:
+        """解除一个挂起原因，全部解除后以正常帧率恢复渲染并立即重绘
+
+        参数:
+            reason (str): 挂起的原因
+        """
+        if reason not in self.suspended:
+            return
+        self.suspended.discard(reason)
+        if not self.suspended:
+            self.idle = True
+            self.wake()
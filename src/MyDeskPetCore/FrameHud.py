@@ -0,0 +1,83 @@
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QColor, QFont, QPainter, QPen, QPolygonF
+from PySide6.QtWidgets import QWidget
+
+from .FrameTimeline import FrameTimeline
+
+
+class FrameHud:
+    """性能浮层
+
+    在宠物窗口左上角用 QPainter 绘制帧率、帧耗时曲线和最慢一帧的各阶段耗时，
+    需要在 paintGL 绘制完模型之后调用 paint
+
+    属性:
+        frame_budget_ms (float): 一帧的时间预算(毫秒)，曲线中画出预算线，曲线的纵轴为预算的两倍
+        graph_frames (int): 曲线显示的最近帧数
+    """
+
+    WIDTH = 200
+    GRAPH_HEIGHT = 40
+    LINE_HEIGHT = 14
+
+    def __init__(self, frame_budget_ms: float, graph_frames: int = 120) -> None:
+        """初始化性能浮层
+
+        参数:
+            frame_budget_ms (float): 一帧的时间预算(毫秒)
+            graph_frames (int): 曲线显示的最近帧数
+        """
+        self.frame_budget_ms = frame_budget_ms
+        self.graph_frames = graph_frames
+        self._font = QFont("monospace", 8)
+        self._font.setStyleHint(QFont.StyleHint.Monospace)
+
+    def paint(self, widget: QWidget, timeline: FrameTimeline, skipped_frames: int = 0) -> None:
+        """在窗口上绘制性能浮层
+
+        参数:
+            widget (QWidget): 宠物窗口
+            timeline (FrameTimeline): 帧耗时记录
+            skipped_frames (int): 因模型状态没有变化而跳过绘制的累计帧数
+        """
+        totals = timeline.totals(self.graph_frames)
+        worst = timeline.worst()
+        # 浮层使用等宽字体对齐，文字只用ASCII字符
+        lines = [f"FPS {timeline.fps():5.1f}   frame {totals[-1] if totals else 0:5.2f}ms",
+                 f"skipped draws {skipped_frames}"]
+        if worst is not None:
+            lines.append(f"worst {sum(worst[2]) * 1000:.2f}ms:")
+            lines.extend(f"  {name:<9} {value * 1000:6.2f}ms"
+                         for name, value in zip(FrameTimeline.PHASES, worst[2]))
+
+        height = self.GRAPH_HEIGHT + self.LINE_HEIGHT * len(lines) + 12
+        painter = QPainter(widget)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setFont(self._font)
+            painter.fillRect(QRectF(4, 4, self.WIDTH, height), QColor(0, 0, 0, 160))
+
+            painter.setPen(QColor(255, 255, 255))
+            for i, line in enumerate(lines):
+                painter.drawText(QPointF(10, 4 + self.LINE_HEIGHT * (i + 1)), line)
+
+            self._paint_graph(painter, totals, QRectF(10, height - self.GRAPH_HEIGHT - 2,
+                                                      self.WIDTH - 12, self.GRAPH_HEIGHT))
+        finally:
+            painter.end()
+
+    def _paint_graph(self, painter: QPainter, totals, rect: QRectF) -> None:
+        """绘制帧耗时曲线和预算线，超出纵轴范围的帧画在顶端"""
+        scale = rect.height() / (self.frame_budget_ms * 2)
+        budget_y = rect.bottom() - self.frame_budget_ms * scale
+        painter.setPen(QPen(QColor(255, 200, 0, 180), 1, Qt.PenStyle.DashLine))
+        painter.drawLine(QPointF(rect.left(), budget_y), QPointF(rect.right(), budget_y))
+        if len(totals) < 2:
+            return
+
+        step = rect.width() / (self.graph_frames - 1)
+        offset = rect.left() + (self.graph_frames - len(totals)) * step
+        points = QPolygonF([QPointF(offset + i * step, max(rect.bottom() - value * scale, rect.top()))
+                            for i, value in enumerate(totals)])
+        painter.setPen(QPen(QColor(80, 220, 120), 1))
+        painter.drawPolyline(points)
@@ -0,0 +1,104 @@
+import time
+
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+
+
+class FrameScheduler(QObject):
+    """按截止时间调度的渲染定时器
+
+    QTimer 的间隔只能是整数毫秒且默认精度较粗，60fps 时实际按 16ms 触发(约62.5fps)并有抖动。
+    帧调度器按浮点数的帧间隔累加截止时间，每帧用 PreciseTimer 等待最接近截止时间的整数毫秒，
+    单帧的触发时刻与截止时间相差不超过约半毫秒(另加事件循环的延迟)，误差不会累积，长期平均帧率与设置一致。
+    等待期间不阻塞GUI线程
+
+    追赶与跳帧规则:
+        晚于截止时间但不足一帧时，下一帧仍按原节奏的截止时间触发(间隔缩短，追回进度)；
+        落后超过一帧时丢弃错过的帧，从下一个未错过的截止时间继续，不会连续补发多帧
+
+    接口与 QTimer 保持一致(start/stop/isActive/interval/timeout)，可以直接替换 QTimer
+
+    属性:
+        frames (int): 已触发的帧数
+        skipped (int): 因落后超过一帧而丢弃的帧数
+    """
+
+    timeout = Signal()
+
+    # 定时器触发时，距截止时间不足该值(秒)则直接触发一帧，否则重新启动定时器继续等待
+    EARLY_TOLERANCE = 0.001
+
+    def __init__(self, parent=None) -> None:
+        """初始化帧调度器
+
+        参数:
+            parent (QObject): 父对象
+        """
+        super().__init__(parent)
+        self.frames = 0
+        self.skipped = 0
+        self._interval = 0.0
+        self._deadline = 0.0
+        self._active = False
+        # 每次 start 递增，用于发现 timeout 的处理函数中重新开始了调度
+        self._generation = 0
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def start(self, interval_ms: float) -> None:
+        """按帧间隔开始调度，已经在调度时从当前时刻重新开始
+
+        参数:
+            interval_ms (float): 帧间隔(毫秒)，可以是小数，例如 1000 / 60
+        """
+        self._interval = max(interval_ms, 0.0) / 1000
+        self._deadline = time.perf_counter() + self._interval
+        self._active = True
+        self._generation += 1
+        self._arm()
+
+    def stop(self) -> None:
+        """停止调度"""
+        self._active = False
+        self._timer.stop()
+
+    def isActive(self) -> bool:
+        """是否正在调度"""
+        return self._active
+
+    def interval(self) -> float:
+        """当前帧间隔(毫秒)"""
+        return self._interval * 1000
+
+    def _arm(self) -> None:
+        """等待到最接近下一个截止时间的整数毫秒"""
+        delay = self._deadline - time.perf_counter()
+        self._timer.start(max(round(delay * 1000), 0))
+
+    def _on_timeout(self) -> None:
+        """等待到截止时间后触发一帧，并计算下一个截止时间"""
+        if not self._active:
+            return
+        now = time.perf_counter()
+        if self._deadline - now >= self.EARLY_TOLERANCE:
+            # 定时器提前过多(例如系统定时器精度不足)，继续等待
+            self._arm()
+            return
+        generation = self._generation
+        self.frames += 1
+        self.timeout.emit()
+        # timeout 的处理函数中可能停止或重新开始了调度
+        if not self._active or generation != self._generation:
+            return
+
+        self._deadline += self._interval
+        if self._deadline <= now:
+            # 落后超过一帧，丢弃错过的帧并保持原有的节奏
+            missed = int((now - self._deadline) / self._interval) + 1 if self._interval else 0
+            self.skipped += missed
+            self._deadline += missed * self._interval
+            if self._deadline <= now:
+                self._deadline = now
+        self._arm()
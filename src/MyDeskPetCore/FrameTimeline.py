@@ -0,0 +1,115 @@
+import csv
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 一帧的记录: (帧开始时刻(秒), 距上一帧的间隔(秒), 各阶段耗时(秒))
+FrameRecord = Tuple[float, float, Tuple[float, ...]]
+
+
+class FrameTimeline:
+    """渲染帧耗时记录
+
+    每帧记录 paintGL 中各阶段的耗时，保存在定长环形缓冲区中，写满后覆盖最旧的帧，
+    用于性能浮层显示和导出 JSON/CSV 进行分析
+
+    属性:
+        capacity (int): 保留的最近帧数
+        count (int): 累计记录的帧数
+    """
+
+    # 阶段名称: 持续性插件、模型更新、唇形同步、位置和缩放、绘制模型、绘制性能浮层
+    PHASES = ('plugins', 'model', 'lipsync', 'transform', 'draw', 'hud')
+
+    __slots__ = ('capacity', 'count', '_frames', '_index')
+
+    def __init__(self, capacity: int = 600) -> None:
+        """初始化帧耗时记录
+
+        参数:
+            capacity (int): 保留的最近帧数
+        """
+        self.capacity = capacity
+        self.count = 0
+        self._frames: List[Optional[FrameRecord]] = [None] * capacity
+        self._index = 0
+
+    def record(self, stamp: float, dt: float, phases: Sequence[float]) -> None:
+        """记录一帧
+
+        参数:
+            stamp (float): 帧开始时刻(time.perf_counter)
+            dt (float): 距上一帧的间隔(秒)
+            phases (Sequence[float]): 按 PHASES 顺序排列的各阶段耗时(秒)
+        """
+        self._frames[self._index] = (stamp, dt, tuple(phases))
+        self._index = (self._index + 1) % self.capacity
+        self.count += 1
+
+    def frames(self) -> List[FrameRecord]:
+        """按时间顺序返回缓冲区中的帧"""
+        if self.count < self.capacity:
+            return self._frames[:self._index]
+        return self._frames[self._index:] + self._frames[:self._index]
+
+    def totals(self, last: Optional[int] = None) -> List[float]:
+        """按时间顺序返回最近各帧的总耗时(毫秒)
+
+        参数:
+            last (Optional[int]): 只返回最近的帧数，为None时返回全部
+        """
+        frames = self.frames()
+        if last is not None:
+            frames = frames[-last:]
+        return [sum(phases) * 1000 for _, _, phases in frames]
+
+    def fps(self, last: int = 60) -> float:
+        """根据最近帧的间隔计算实际帧率，没有足够数据时返回0"""
+        intervals = [dt for _, dt, _ in self.frames()[-last:] if dt > 0]
+        if not intervals:
+            return 0.0
+        return len(intervals) / sum(intervals)
+
+    def worst(self) -> Optional[FrameRecord]:
+        """返回缓冲区中总耗时最长的帧，没有数据时返回None"""
+        frames = self.frames()
+        if not frames:
+            return None
+        return max(frames, key=lambda frame: sum(frame[2]))
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """转换为便于导出的行，时间单位为毫秒，time 为相对第一帧的时刻"""
+        frames = self.frames()
+        if not frames:
+            return []
+        origin = frames[0][0]
+        rows = []
+        for stamp, dt, phases in frames:
+            row = {'time': (stamp - origin) * 1000, 'dt': dt * 1000, 'total': sum(phases) * 1000}
+            row.update({name: value * 1000 for name, value in zip(self.PHASES, phases)})
+            rows.append(row)
+        return rows
+
+    def export_json(self, path: str) -> None:
+        """导出为 JSON 文件
+
+        参数:
+            path (str): 文件路径
+        异常:
+            OSError: 文件写入失败时抛出
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'phases': list(self.PHASES), 'unit': 'ms', 'frames': self.to_rows()}, f, indent=1)
+
+    def export_csv(self, path: str) -> None:
+        """导出为 CSV 文件
+
+        参数:
+            path (str): 文件路径
+        异常:
+            OSError: 文件写入失败时抛出
+        """
+        fields = ['time', 'dt', 'total', *self.PHASES]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.to_rows())
@@ -14,37 +14,273 @@ class Live2dModel:
         # 唇形同步相关
         self.wavHandler = WavHandler()
         self.lipSyncN = 2.5
+        # 上一次检查时动作是否已播放完成，用于检测动作完成的时刻
+        self.motion_finished = True
+        # 模型的 Update 是否接受时间间隔参数，首次更新时检测
+        self.update_accepts_dt = None
+        # 上一次绘制时的模型状态指纹，状态没有变化时跳过绘制，为None时下一帧必须绘制
+        self.fingerprint = None
+        self.scale = None
+        self.size = None
+        # 读取参数值的方式，首次计算指纹时检测，不支持读取参数时为False，此时每帧都绘制
+        self.param_reader = None
+        # 因模型状态没有变化而跳过绘制的帧数和实际绘制的帧数
+        self.skipped_frames = 0
+        self.drawn_frames = 0
         live2d.init()
 
+    def gl_init(self):
+        """初始化Live2D的OpenGL资源，需要在OpenGL上下文中调用
+
+        返回值:
+            bool: 是否初始化成功
+        """
+        if live2d.LIVE2D_VERSION != 3:
+            log.Error("不支持的live2d模型")
+            return False
+        live2d.glInit()
+        return True
+
     def initialize(self, model_path, display_size):
+        """初始化OpenGL资源并在当前线程中加载模型，需要在OpenGL上下文中调用"""
         try:
-            if live2d.LIVE2D_VERSION == 3:
-                live2d.glInit()
-                self.model = live2d.LAppModel()
-                self.model.LoadModelJson(model_path)
-                # 设置模型大小
-                self.model.Resize(*display_size)
-            else:
-                log.Error("不支持的live2d模型")
-
+            if not self.gl_init():
+                return False
         except Exception as e:
             log.Error(f"初始化模型失败: {e}")
             return False
+        return self.attach_model(None, model_path, display_size)
+
+    @staticmethod
+    def create_model(model_path):
+        """读取模型文件但不创建渲染器，可以在后台线程中调用
+
+        需要 LAppModel.LoadModelJson 支持 create_renderer 参数并提供 CreateRenderer。
+        目前提供 live2d.v3 的 live2d-py 版本都不支持: 0.5.x 的 LAppModel 没有 CreateRenderer，
+        0.8.x 的 LoadModelJson 不接受 create_renderer 参数(1.0 起才有该参数，但已不再提供 live2d.v3)，
+        因此实际总是返回None，由 attach_model 在渲染线程中加载整个模型，后台线程只预读文件
+
+        参数:
+            model_path (str): 模型文件路径
+        返回值:
+            尚未创建渲染器的模型，不支持或加载失败时返回None
+        """
+        if not hasattr(live2d.LAppModel, 'CreateRenderer'):
+            return None
+        model = live2d.LAppModel()
+        try:
+            model.LoadModelJson(model_path, create_renderer=False)
+        except TypeError:
+            return None
+        except Exception as e:
+            log.Error(f"加载模型失败: {e}")
+            return None
+        return model
+
+    def attach_model(self, model, model_path, display_size):
+        """创建模型的渲染器并使用该模型，需要在OpenGL上下文中调用
+
+        新模型加载失败时保留当前模型；加载成功后立即释放被替换的旧模型的OpenGL资源，
+        不等到旧模型对象被回收时(那时可能不在OpenGL上下文中)才释放
+
+        参数:
+            model: create_model 返回的模型，为None时在当前线程中加载整个模型
+            model_path (str): 模型文件路径
+            display_size (Tuple[int, int]): 显示区域大小
+        返回值:
+            bool: 是否加载成功
+        """
+        try:
+            if model is None:
+                model = live2d.LAppModel()
+                model.LoadModelJson(model_path)
+            else:
+                model.CreateRenderer()
+            # 设置模型大小
+            model.Resize(*display_size)
+        except Exception as e:
+            log.Error(f"加载模型失败: {e}")
+            if model is not None:
+                self.release_model(model)
+            return False
+        old_model, self.model = self.model, model
+        if old_model is not None and old_model is not model:
+            self.release_model(old_model)
+        # 在OpenGL上下文中丢弃旧模型的最后一个引用
+        del old_model
+        self.motion_finished = True
+        self.size = tuple(display_size)
+        self.param_reader = None
+        self.invalidate()
+        return True
+
+    @staticmethod
+    def release_model(model):
+        """释放模型的渲染器(着色器、纹理等OpenGL资源)，需要在OpenGL上下文中调用
+
+        live2d-py 不提供 DestroyRenderer 时，渲染器在模型对象被回收时释放
+        """
+        destroy_renderer = getattr(model, 'DestroyRenderer', None)
+        if destroy_renderer is None:
+            return
+        try:
+            destroy_renderer()
+        except Exception as e:
+            log.Error(f"释放模型失败: {e}")
+
+    def load_model(self, model_path, display_size):
+        """在运行时更换模型，需要在OpenGL上下文中调用
 
-    def update(self, scale):
-        self.model.Update()
+        新模型加载失败时保留当前模型
+        """
+        return self.attach_model(None, model_path, display_size)
+
+    def resize(self, width, height):
+        """调整模型的显示区域大小，需要在OpenGL上下文中调用"""
+        if self.model is not None:
+            self.model.Resize(width, height)
+        # 窗口大小变化后帧缓冲区会重新创建，原有内容不再有效
+        self.size = (width, height)
+        self.invalidate()
+
+    def invalidate(self):
+        """丢弃状态指纹，下一帧无论模型状态是否变化都重新绘制"""
+        self.fingerprint = None
+
+    def update(self, scale, dt=None):
+        """更新模型状态，依次执行 update_model、update_lipsync 和 update_transform
+
+        参数:
+            scale (float): 缩放比例
+            dt (float): 距上一帧的真实间隔(秒)，live2d-py 的 Update 不接受时间参数时由其内部计时
+        """
+        self.update_model(dt)
+        self.update_lipsync()
+        self.update_transform(scale)
+
+    def update_model(self, dt=None):
+        """更新模型的动作、物理等状态
 
-        # 更新唇形同步
+        参数:
+            dt (float): 距上一帧的真实间隔(秒)
+        """
+        if dt is not None and self.update_accepts_dt is not False:
+            if self.update_accepts_dt is None:
+                try:
+                    self.model.Update(dt)
+                    self.update_accepts_dt = True
+                except TypeError:
+                    self.update_accepts_dt = False
+                    self.model.Update()
+            else:
+                self.model.Update(dt)
+        else:
+            self.model.Update()
+
+    def update_lipsync(self):
+        """更新唇形同步"""
         if self.wavHandler.Update():
             self.model.AddParameterValue(
                 StandardParams.ParamMouthOpenY, self.wavHandler.GetRms() * self.lipSyncN
             )
 
-        # 更新模型位置和缩放
+    def update_transform(self, scale):
+        """更新模型位置和缩放"""
         self.model.SetOffset(0, 0)
         self.model.SetScale(scale)
+        self.scale = scale
+
+    def is_animating(self):
+        """动作或唇形同步是否正在播放，帧率调节器据此判断是否需要以正常帧率渲染
+
+        带有 Idle 动作组的模型会自动循环播放待机动作，此时始终视为正在播放
+        """
+        if self.model is None:
+            return False
+        wav = self.wavHandler
+        if wav.pcmData is not None and wav.lastOffset < wav.numFrames:
+            return True
+        return not self.model.IsMotionFinished()
+
+    def poll_motion_finished(self):
+        """检查动作是否在上一次检查之后播放完成
+
+        返回值:
+            bool: 动作从播放中变为已完成时返回True
+        """
+        finished = self.model.IsMotionFinished()
+        just_finished = finished and not self.motion_finished
+        self.motion_finished = finished
+        return just_finished
+
+    def _read_params(self):
+        """读取模型全部参数的当前值，不支持读取参数时返回None"""
+        reader = self.param_reader
+        if reader is None:
+            # live2d-py 不同版本读取参数的接口不同
+            if hasattr(self.model, 'GetParameterCount') and hasattr(self.model, 'GetParameter'):
+                reader = self.param_reader = 'parameter'
+            elif hasattr(self.model, 'GetParamCount') and hasattr(self.model, 'GetParamValueByIndex'):
+                reader = self.param_reader = 'value'
+            else:
+                reader = self.param_reader = False
+        model = self.model
+        if reader == 'parameter':
+            get = model.GetParameter
+            return tuple(get(i).value for i in range(model.GetParameterCount()))
+        if reader == 'value':
+            get = model.GetParamValueByIndex
+            return tuple(get(i) for i in range(model.GetParamCount()))
+        return None
+
+    def state_fingerprint(self, background_color):
+        """计算决定画面内容的模型状态指纹，需要在 update 之后调用
+
+        动作或唇形同步正在播放时画面必然变化，直接返回None而不读取参数；
+        否则指纹由缩放、显示区域大小、背景颜色和全部参数值组成，表情、物理、呼吸和眨眼
+        最终都体现为参数值的变化
+
+        参数:
+            background_color (List[int]): 背景颜色 [R, G, B, A]
+        返回值:
+            Optional[tuple]: 状态指纹，为None时表示必须绘制
+        """
+        if self.is_animating():
+            return None
+        params = self._read_params()
+        if params is None:
+            return None
+        return self.scale, self.size, tuple(background_color), params
+
+    def draw_if_changed(self, background_color, force=False, target=None, blit_target=None):
+        """模型状态与上一次绘制时相比有变化时才绘制，否则保留帧缓冲区中的上一帧
+
+        窗口需要使用 PartialUpdate 的更新方式，跳过绘制时帧缓冲区的内容才会保留
+
+        参数:
+            background_color (List[int]): 背景颜色 [R, G, B, A]
+            force (bool): 是否无论状态是否变化都绘制，例如画面上还叠加了其它内容
+            target (RenderTarget): 降低分辨率渲染时的离屏帧缓冲区，为None时直接绘制到当前帧缓冲区
+            blit_target (QOpenGLFramebufferObject): target 放大复制到的帧缓冲区，为None时复制到默认帧缓冲区，
+                在 paintGL 之外(例如离屏基准测试)绘制时需要传入
+        返回值:
+            bool: 是否进行了绘制
+        """
+        fingerprint = self.state_fingerprint(background_color)
+        if not force and fingerprint is not None and fingerprint == self.fingerprint:
+            self.skipped_frames += 1
+            return False
+        self.fingerprint = fingerprint
+        if target is None:
+            self.draw(background_color)
+        else:
+            target.begin()
+            self.draw(background_color)
+            target.end(blit_target)
+        return True
 
     def draw(self, background_color):
+        self.drawn_frames += 1
         # 清除缓冲区并绘制模型，避免残影
         live2d.clearBuffer(background_color[0] / 255,
                            background_color[1] / 255,
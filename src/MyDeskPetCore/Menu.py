@@ -1,10 +1,50 @@
+import shiboken6
 from PySide6.QtGui import QIcon
-from PySide6.QtWidgets import QSystemTrayIcon
+from PySide6.QtWidgets import QFileDialog, QMessageBox, QSystemTrayIcon
 from qfluentwidgets import SystemTrayMenu, Action, FluentIcon, RoundMenu
 
 from ..Window import MainWindow
 
 
+class DeferredMenuSlot:
+    """延迟创建插件自定义菜单时传给插件的菜单对象
+
+    插件调用 addMenu/addAction 时，菜单会插入到占位菜单项之前，保持插件在托盘菜单中的原有顺序，
+    插入的菜单和菜单项(包括通过 insertMenu/insertAction 插入的)记录在 items 中，以便插件被禁用时移除；
+    其余属性直接转发给托盘菜单，通过它们添加的内容不会被记录，插件被禁用时也不会移除
+    """
+
+    def __init__(self, menu, placeholder):
+        self.menu = menu
+        self.placeholder = placeholder
+        self.items = []
+
+    def addMenu(self, menu):
+        self.menu.insertMenu(self.placeholder, menu)
+        self.items.append(menu)
+
+    def addAction(self, action):
+        self.menu.insertAction(self.placeholder, action)
+        self.items.append(action)
+
+    def addActions(self, actions):
+        for action in actions:
+            self.addAction(action)
+
+    def insertMenu(self, before, menu):
+        self.menu.insertMenu(before, menu)
+        self.items.append(menu)
+
+    def insertAction(self, before, action):
+        self.menu.insertAction(before, action)
+        self.items.append(action)
+
+    def __getattr__(self, name):
+        if name.startswith(('add', 'insert')):
+            print(f"自定义菜单调用的 {name} 不受支持，添加的内容不会插入到插件的位置，插件被禁用时也不会移除")
+        return getattr(self.menu, name)
+
+
 class ContextMenuEvent:
     """系统托盘菜单事件处理器
 
@@ -28,45 +68,77 @@ class ContextMenuEvent:
         # 创建插件管理器实例
         self.plugin_manager = self.parent.plugin_manager
 
-        # 创建系统托盘菜单实例
-        self.menu = SystemTrayMenu(parent=parent)
-
-        # 配置并添加功能菜单项
+        # 配置功能菜单项
         # 创建插件管理菜单项并绑定事件
         self.manageAction = Action(
             FluentIcon.HOME_FILL, "插件管理",
             triggered=lambda: self._open_manage_page()
         )
-        self.menu.addAction(self.manageAction)
-
-        # 插件菜单
-        for i in self.parent.plugins:
-            self.add_plugin(i)
-        self.menu.addSeparator()
 
         # 创建关于菜单项并绑定事件
         self.about_action = Action(FluentIcon.INFO, '关于',
                                    triggered=lambda: self._open_about_page())
-        self.menu.addAction(self.about_action)
 
         # 创建设置菜单项并绑定事件
         self.settings_action = Action(FluentIcon.SETTING, '设置',
                                       triggered=lambda: self._open_settings_page())
-        self.menu.addAction(self.settings_action)
+
+        # 性能浮层开关和帧耗时导出
+        self.hud_action = Action(FluentIcon.SPEED_HIGH, '性能浮层',
+                                 triggered=lambda checked: self.parent.set_frame_hud(checked))
+        self.hud_action.setCheckable(True)
+        self.export_trace_action = Action(FluentIcon.SAVE_AS, '导出帧耗时',
+                                          triggered=lambda: self._export_frame_timeline())
 
         # 添加退出菜单项
         self.exit_action = Action(FluentIcon.EMBED, '退出', triggered=lambda: self.parent.quit())
-        self.menu.addAction(self.exit_action)
 
-        # 将菜单绑定到系统托盘
+        # 插件菜单分隔线之后的固定菜单项
+        self.fixed_actions = [self.about_action, self.settings_action, self.hud_action,
+                              self.export_trace_action, self.exit_action]
+
+        # 插件菜单，使用自定义菜单的插件在托盘菜单第一次打开时才加载
+        self.deferred_plugins = []
+        # 插件名称 -> 该插件添加到托盘菜单中的菜单和菜单项，按添加顺序排列
+        self.plugin_menu_items = {}
+        self.menu = None
+        for i in self.parent.plugins:
+            self.add_plugin(i)
+
+        # 创建系统托盘菜单实例
+        self.menu = self._build_menu()
+
+        # 插件在运行时启用、禁用或重新加载时同步更新托盘菜单
+        self.plugin_manager.add_lifecycle_listener(self.on_plugin_state_changed)
+
+        # 将菜单绑定到系统托盘，托盘菜单打开前创建延迟加载的插件菜单
+        self.sysTray.activated.connect(lambda _: self.load_deferred_menus())
         self.sysTray.setContextMenu(self.menu)
         self.sysTray.show()
 
     def show(self, pos):
+        # 创建延迟加载的插件菜单
+        self.load_deferred_menus()
         # 显示右键菜单
         self.menu.exec(pos)
 
+    def notify(self, title, message, icon=QSystemTrayIcon.MessageIcon.Warning):
+        """通过托盘图标向用户显示通知
+
+        参数:
+            title (str): 标题
+            message (str): 内容
+            icon (QSystemTrayIcon.MessageIcon): 通知图标
+        """
+        self.sysTray.showMessage(title, message, icon)
+
     def add_plugin(self, plugin_info):
+        """根据插件清单添加插件菜单
+
+        插件模块不会在这里导入:
+        配置文件中带有菜单项的插件直接按清单创建子菜单，插件模块在菜单项被点击时才加载；
+        使用自定义菜单的插件先添加一个占位菜单项，在托盘菜单第一次打开时才加载插件并创建菜单
+        """
         if plugin_info['plugin_type'] != 'menu':
             return
 
@@ -77,40 +149,171 @@ class ContextMenuEvent:
         plugin_config = self.plugin_manager.get_plugin_config(plugin_info)
         if not plugin_config:
             return
-            
-        # 加载插件模块
-        plugin = self.plugin_manager.load_plugin(plugin_info)
-        if not plugin:
-            return
-            
+
         try:
-            plugin_access = RoundMenu(plugin_info['plugin_chinese_name'])
             icon_name = plugin_config['plugin']['icon']
             try:
-                plugin_access.setIcon(FluentIcon[icon_name])
+                icon = FluentIcon[icon_name]
             except KeyError:
-                plugin_access.setIcon(QIcon(icon_name))
-
-            # 尝试使用插件的自定义菜单方法
-            custom_menu_created = self.plugin_manager.execute_plugin_function(plugin_info,
-                                                                              'create_custom_menu',
-                                                                              self.parent,
-                                                                              self.menu)
-
-            # 如果没有自定义菜单，则使用配置文件中的菜单项
-            if not custom_menu_created and 'menu' in plugin_config:
-                for menu_item in plugin_config['menu']:
-                    action = Action(
-                        QIcon(menu_item['menu_icon']), 
-                        menu_item['menu_name'],
-                        triggered=lambda _, p=menu_item['menu_parameter'], fn=menu_item["function_name"]: 
-                            self.plugin_manager.execute_plugin_function(plugin_info, fn, self.parent, p)
-                    )
-                    plugin_access.addAction(action)
-                self.menu.addMenu(plugin_access)
+                icon = QIcon(icon_name)
+
+            manifest = plugin_config['plugin']
+            custom_menu = manifest.get('custom_menu', False)
+            if ('menu' in plugin_config and not custom_menu and not manifest.get('out_of_process', False)
+                    and self.plugin_manager.defines_custom_menu(plugin_info)):
+                # 同时提供菜单项和自定义菜单的插件按原来的方式加载: 自定义菜单优先，未创建时使用配置文件中的菜单项
+                print(f"插件 {plugin_info['plugin_name']} 同时配置了菜单项并实现了 create_custom_menu，"
+                      f"请在配置文件的 [plugin] 中声明 custom_menu = true")
+                custom_menu = True
+
+            if 'menu' in plugin_config and not custom_menu:
+                # 使用配置文件中的菜单项
+                self._add_plugin_item(plugin_info, self._create_config_menu(plugin_info, plugin_config, icon))
+            else:
+                # 自定义菜单延迟到托盘菜单第一次打开时创建
+                placeholder = Action(icon, plugin_info['plugin_chinese_name'])
+                placeholder.setEnabled(False)
+                self._add_plugin_item(plugin_info, placeholder)
+                self.deferred_plugins.append((plugin_info, placeholder))
         except Exception as err:
             print(f"{plugin_info['plugin_name']}菜单创建出错: {str(err)}")
 
+    def load_deferred_menus(self):
+        """加载使用自定义菜单的插件，并用插件创建的菜单替换占位菜单项
+
+        在托盘菜单第一次打开前调用，之后再次调用不会重复创建；模型仍在加载时推迟到下一次打开
+        """
+        if self.parent.live2d.model is None:
+            return
+        deferred_plugins, self.deferred_plugins = self.deferred_plugins, []
+        for plugin_info, placeholder in deferred_plugins:
+            slot = DeferredMenuSlot(self.menu, placeholder)
+            try:
+                custom_menu_created = self.plugin_manager.execute_plugin_function(plugin_info,
+                                                                                  'create_custom_menu',
+                                                                                  self.parent,
+                                                                                  slot)
+                # 没有创建自定义菜单时使用配置文件中的菜单项
+                plugin_config = self.plugin_manager.get_plugin_config(plugin_info)
+                if not custom_menu_created and not slot.items and plugin_config and 'menu' in plugin_config:
+                    slot.addMenu(self._create_config_menu(plugin_info, plugin_config, placeholder.icon()))
+            except Exception as err:
+                print(f"{plugin_info['plugin_name']}菜单创建出错: {str(err)}")
+            self.menu.removeAction(placeholder)
+            items = self.plugin_menu_items.setdefault(plugin_info['plugin_name'], [])
+            if placeholder in items:
+                items.remove(placeholder)
+            items.extend(slot.items)
+
+    def on_plugin_state_changed(self, plugin_name, enabled):
+        """插件在运行时启用、禁用或重新加载时更新托盘菜单
+
+        禁用时移除插件的所有菜单和菜单项，启用时按插件清单重新添加
+
+        参数:
+            plugin_name (str): 插件名称
+            enabled (bool): 插件是否启用
+        """
+        self.remove_plugin(plugin_name)
+        if enabled:
+            plugin_info = self.plugin_manager.find_plugin_info(plugin_name)
+            if plugin_info is not None:
+                self.add_plugin(plugin_info)
+
+    def remove_plugin(self, plugin_name):
+        """从托盘菜单中移除插件的所有菜单和菜单项
+
+        参数:
+            plugin_name (str): 插件名称
+        """
+        self.deferred_plugins = [(info, placeholder) for info, placeholder in self.deferred_plugins
+                                 if info['plugin_name'] != plugin_name]
+        for item in self.plugin_menu_items.pop(plugin_name, []):
+            if isinstance(item, RoundMenu):
+                self.menu.removeMenu(item)
+                actions = item.actions()
+            else:
+                self.menu.removeAction(item)
+                actions = []
+            # 立即销毁菜单和菜单项，断开它们的信号连接，释放槽函数持有的插件实例，使插件能被立即回收
+            for action in actions:
+                shiboken6.delete(action)
+            shiboken6.delete(item)
+
+    def _create_config_menu(self, plugin_info, plugin_config, icon):
+        """按配置文件中的菜单项创建插件子菜单，插件模块在菜单项被点击时才加载"""
+        plugin_access = RoundMenu(plugin_info['plugin_chinese_name'])
+        plugin_access.setIcon(icon)
+        for menu_item in plugin_config['menu']:
+            action = Action(
+                QIcon(menu_item['menu_icon']), 
+                menu_item['menu_name'],
+                triggered=lambda _, p=menu_item['menu_parameter'], fn=menu_item["function_name"]: 
+                    self.plugin_manager.execute_plugin_function(plugin_info, fn, self.parent, p)
+            )
+            plugin_access.addAction(action)
+        return plugin_access
+
+    def _add_plugin_item(self, plugin_info, item):
+        """记录插件的菜单或菜单项，以便插件被禁用时移除
+
+        托盘菜单创建完成后添加插件菜单时重新创建托盘菜单，使插件菜单位于分隔线之前，与启动时的位置一致
+        """
+        self.plugin_menu_items.setdefault(plugin_info['plugin_name'], []).append(item)
+        if self.menu is not None:
+            self._rebuild_menu()
+
+    def _build_menu(self):
+        """按记录的菜单项创建托盘菜单: 插件管理、各插件的菜单、分隔线和固定菜单项
+
+        返回值:
+            SystemTrayMenu: 托盘菜单
+        """
+        menu = SystemTrayMenu(parent=self.parent)
+        menu.addAction(self.manageAction)
+        for items in self.plugin_menu_items.values():
+            for item in items:
+                if isinstance(item, RoundMenu):
+                    menu.addMenu(item)
+                else:
+                    menu.addAction(item)
+        menu.addSeparator()
+        menu.addActions(self.fixed_actions)
+        menu.aboutToShow.connect(self.load_deferred_menus)
+        return menu
+
+    def _rebuild_menu(self):
+        """把所有菜单和菜单项从旧的托盘菜单中移除，并重新创建托盘菜单"""
+        old_menu = self.menu
+        for action in [self.manageAction, *self.fixed_actions]:
+            old_menu.removeAction(action)
+        for items in self.plugin_menu_items.values():
+            for item in items:
+                if isinstance(item, RoundMenu):
+                    old_menu.removeMenu(item)
+                else:
+                    old_menu.removeAction(item)
+
+        self.menu = self._build_menu()
+        self.sysTray.setContextMenu(self.menu)
+        old_menu.deleteLater()
+
+    def _export_frame_timeline(self):
+        """选择文件并导出性能浮层记录的帧耗时，用消息框告知导出结果"""
+        if self.parent.frame_timeline is None:
+            QMessageBox.information(None, "导出帧耗时", "尚未记录帧耗时，请先开启性能浮层")
+            return
+        path, _ = QFileDialog.getSaveFileName(None, "导出帧耗时", "frame_trace.json",
+                                              "JSON (*.json);;CSV (*.csv)")
+        if not path:
+            return
+        try:
+            self.parent.export_frame_timeline(path)
+        except (RuntimeError, OSError) as e:
+            QMessageBox.critical(None, "导出失败", f"帧耗时导出失败: {e}")
+            return
+        QMessageBox.information(None, "导出成功", f"帧耗时已导出到:\n{path}")
+
     def _open_manage_page(self):
         """打开插件管理页面
 
@@ -0,0 +1,110 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from PySide6.QtCore import QObject, Signal
+
+from .Live2d import Live2dModel
+
+
+@dataclass
+class ModelLoadResult:
+    """后台加载模型的结果
+
+    属性:
+        model_path (str): 模型文件路径
+        model (Any): 已读取模型文件、尚未创建渲染器的模型；live2d-py 不支持分开创建渲染器时为None，
+            此时整个模型在渲染线程中加载
+        prefetched_bytes (int): 预读的模型文件总大小
+        metrics (Dict[str, float]): 后台各阶段耗时(毫秒)，prefetch 为预读文件，
+            read_model 为读取模型文件，只在确实读取了模型文件(model 不为None)时记录
+    """
+    model_path: str
+    model: Any = None
+    prefetched_bytes: int = 0
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+
+def model_files(model_path: str) -> List[str]:
+    """列出模型文件(model3.json)引用的全部文件
+
+    参数:
+        model_path (str): 模型文件路径
+    返回值:
+        List[str]: 文件路径，包括模型文件本身
+    异常:
+        OSError: 模型文件读取失败时抛出
+        ValueError: 模型文件不是有效的JSON时抛出
+    """
+    with open(model_path, "r", encoding="utf-8") as f:
+        references = json.load(f).get("FileReferences", {})
+    home = os.path.dirname(model_path)
+
+    names = [references.get(key) for key in ("Moc", "Physics", "Pose", "UserData", "DisplayInfo")]
+    names.extend(references.get("Textures", []))
+    for motions in references.get("Motions", {}).values():
+        for motion in motions:
+            names.extend((motion.get("File"), motion.get("Sound")))
+    names.extend(expression.get("File") for expression in references.get("Expressions", []))
+    return [model_path] + [os.path.join(home, name) for name in dict.fromkeys(names) if isinstance(name, str)]
+
+
+def prefetch_files(paths: List[str]) -> int:
+    """读取文件的全部内容并丢弃，使之后在渲染线程中加载模型时直接从系统的文件缓存中读取
+
+    参数:
+        paths (List[str]): 文件路径，不存在的文件忽略
+    返回值:
+        int: 读取的总字节数
+    """
+    total = 0
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                while chunk := f.read(1 << 20):
+                    total += len(chunk)
+        except OSError:
+            pass
+    return total
+
+
+class ModelLoader(QObject):
+    """在后台线程中加载模型
+
+    后台线程预读模型引用的全部文件(moc3、纹理、物理、动作、表情和语音)，
+    live2d-py 支持分开创建渲染器时还会读取模型文件(见 Live2dModel.create_model)；
+    其余部分由渲染线程在收到 loaded 信号后完成，目前的 live2d-py 版本下包括读取模型文件
+
+    信号:
+        loaded (ModelLoadResult): 后台加载完成，在GUI线程中发出
+    """
+
+    loaded = Signal(object)
+
+    def start(self, model_path: str) -> None:
+        """开始在后台线程中加载模型
+
+        参数:
+            model_path (str): 模型文件路径
+        """
+        threading.Thread(target=self._run, args=(model_path,), name="ModelLoader", daemon=True).start()
+
+    def _run(self, model_path: str) -> None:
+        """后台线程: 预读文件并读取模型文件，完成后发出 loaded 信号"""
+        result = ModelLoadResult(model_path)
+        start = time.perf_counter()
+        try:
+            result.prefetched_bytes = prefetch_files(model_files(model_path))
+        except (OSError, ValueError) as e:
+            # 模型文件有误时由渲染线程加载并报告错误
+            print(f"模型文件预读失败: {e}")
+        prefetch_end = time.perf_counter()
+        result.metrics['prefetch'] = (prefetch_end - start) * 1000
+        result.model = Live2dModel.create_model(model_path)
+        if result.model is not None:
+            result.metrics['read_model'] = (time.perf_counter() - prefetch_end) * 1000
+        # 跨线程发出信号，槽函数在GUI线程中执行
+        self.loaded.emit(result)
@@ -1,18 +1,38 @@
 import os
 import sys
+import time
 
-from PySide6.QtCore import QTimer, Qt
+from PySide6.QtCore import QEvent, QTimer, Qt, Signal
+from PySide6.QtGui import QColor, QPainter
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
 
+from .FrameGovernor import FrameGovernor
+from .FrameHud import FrameHud
+from .FrameScheduler import FrameScheduler
+from .FrameTimeline import FrameTimeline
 from .Live2d import Live2dModel
 from .Menu import ContextMenuEvent
+from .ModelLoader import ModelLoader
+from .PlaceholderFrame import PlaceholderFrame
+from .RenderTarget import RenderTarget
 from ..ConfigManager import ConfigManager
+from ..ConfigSchema import AppConfig
+from ..ConfigWatcher import ConfigWatcher
+from ..ManifestCache import ManifestCache
 from ..PluginManager import PluginManager
+from ..PluginSupervisor import PluginSupervisor
+from ..PluginWatcher import PluginWatcher
 
 
 class PetMain(QOpenGLWidget):
+    # 后台写入配置失败，在写入线程中发出，在GUI线程中提示用户
+    config_write_failed = Signal(str)
+
     def __init__(self) -> None:
         super().__init__()
+        # 启动耗时统计的起点，startup_metrics 中各时刻都相对于此(毫秒)
+        self.startup_time = time.perf_counter()
+        self.startup_metrics = {}
 
         # 配置文件路径
         config_path = os.path.join(os.path.dirname(__file__), "..", "..", "config.toml")
@@ -23,81 +43,487 @@ class PetMain(QOpenGLWidget):
             import shutil
             shutil.copyfile(example_config_path, config_path)
 
-        # 创建配置管理器实例
-        self.configmanager = ConfigManager(config_path, create_if_not_exists=False)
+        # 创建配置管理器实例，插件开关、设置页面等处的保存合并后在后台写入
+        # 配置在读取时按 AppConfig 统一校验，缺少的配置项使用默认值
+        self.configmanager = ConfigManager.shared(config_path, write_behind=True, schema=AppConfig)
+        settings = self.configmanager.settings
 
         # 从配置文件加载设置
         # 从配置文件中读取窗口的位置和大小设置
-        self.pet_x = self.configmanager.config["window"]["x"]
-        self.pet_y = self.configmanager.config["window"]["y"]
-        self.window_width = self.configmanager.config["window"]["width"]
-        self.window_height = self.configmanager.config["window"]["height"]
+        self.pet_x = settings.window.x
+        self.pet_y = settings.window.y
+        self.window_width = settings.window.width
+        self.window_height = settings.window.height
         # 从配置文件中读取缩放比例设置
-        self.scale = self.configmanager.config["model"]["scale"]
+        self.scale = settings.model.scale
         # 从配置文件中读取模型路径的设置
-        self.model_path = self.configmanager.config["model"]["model_path"]
+        self.model_path = settings.model.model_path
+        # 从配置文件中读取渲染分辨率比例的设置，小于1时通过离屏帧缓冲区降低分辨率渲染
+        self.render_scale = settings.model.render_scale
+        self.render_target = None
         # 从配置文件中读取动画帧率的设置
-        self.frame_rate_ms = self.configmanager.config["animation"]["frame_rate_ms"]
+        self.frame_rate_ms = settings.animation.frame_rate_ms
 
+        # 插件管理器使用配置数据中的插件列表(字典)，插件的启用状态直接在其中修改
         self.plugins = self.configmanager.config.get("plugins", [])
-        self.background_color = self.configmanager.config["window"]["background_color"]
+        self.background_color = settings.window.background_color
 
-        # 创建插件管理器
-        self.plugin_manager = PluginManager(self.plugins)
-        # 执行初始化型插件
+        # 创建插件管理器，插件清单缓存保存在项目根目录的 .cache 目录中
+        manifest_cache_path = os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "plugin_manifest.json")
+        # 插件管理器设置
+        plugin_manager_config = settings.plugin_manager
+        # 插件监督器，反复出错或超出耗时预算的插件会被熔断
+        supervisor = PluginSupervisor(budget_ms=plugin_manager_config.frame_budget_ms,
+                                      failure_threshold=plugin_manager_config.failure_threshold,
+                                      backoff=plugin_manager_config.backoff_s,
+                                      max_backoff=plugin_manager_config.max_backoff_s)
+        self.plugin_manager = PluginManager(self.plugins, manifest_cache=ManifestCache(manifest_cache_path),
+                                            supervisor=supervisor)
+        # 按配置启用插件耗时分析
+        if plugin_manager_config.profiler:
+            self.plugin_manager.enable_profiler()
+        # 按配置启用插件热重载，插件文件修改后只重新加载该插件
+        self.plugin_watcher = None
+        if plugin_manager_config.hot_reload:
+            self.plugin_watcher = PluginWatcher(self.plugin_manager, parent=self)
+        # 执行初始化型插件，执行失败的插件在托盘菜单创建后提示
         self.plugin_manager.execute_init_plugins(self)
 
         # 设置初始窗口位置
         self.setGeometry(self.pet_x, self.pet_y, self.window_width, self.window_height)
 
-        # 创建定时器用于更新模型
-        self.timer = QTimer(self)
+        # 创建帧调度器用于更新模型，按浮点数的帧间隔调度，60fps 时平均间隔为 16.67ms
+        self.timer = FrameScheduler(self)
         self.timer.timeout.connect(self.update)
-        self.timer.start(1000 // self.frame_rate_ms)  # 1000 // (帧率) ,fps = 1000 // 60 =  16
+        self.timer.start(1000 / self.frame_rate_ms)
+        # 上一帧开始的时刻，用于计算传给模型和持续性插件的帧间隔
+        self.last_frame_time = 0.0
+        # 没有动画、输入和插件更新时降低帧率，有活动时立即恢复
+        self.frame_governor = FrameGovernor(self, self.timer, 1000 / self.frame_rate_ms,
+                                            *self._idle_settings(settings.animation))
+        # 帧耗时记录和性能浮层，从托盘菜单开启
+        self.frame_timeline = None
+        self.frame_hud = None
+        # 窗口显示前不渲染，隐藏、最小化或不可见时挂起渲染，持续性插件随之暂停
+        self.frame_governor.suspend('hidden')
+        self._watching_expose = False
 
         self.live2d = Live2dModel()
+        # 模型文件在后台线程中读取，渲染线程只创建渲染器，加载期间显示上次退出时保存的占位帧
+        placeholder_path = os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "placeholder.png")
+        self.placeholder = PlaceholderFrame(placeholder_path)
+        self.placeholder_image = None
+        self.placeholder_painted = False
+        self.pending_model = None
+        # 模型创建渲染器失败时不再等待模型，只显示背景色，直到在设置中更换模型
+        self.model_load_failed = False
+        self.model_loader = ModelLoader(self)
+        self.model_loader.loaded.connect(self._on_model_loaded)
+        self.model_loader.start(self.model_path)
+        # 模型状态没有变化的帧跳过绘制，保留帧缓冲区中的上一帧
+        self.setUpdateBehavior(QOpenGLWidget.UpdateBehavior.PartialUpdate)
 
         # 创建托盘菜单
         self.tray = None
 
         self.draggable = False
         self.offset = None
+        # 按下鼠标后是否拖动过窗口，用于区分单击和拖动
+        self.dragged = False
+
+        # 插件事件: 用户一段时间没有与宠物交互时发布 on_idle
+        self.idle_seconds = plugin_manager_config.idle_timeout_s
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(
+            lambda: self.plugin_manager.events.publish('on_idle', self, self.idle_seconds))
+        self.idle_timer.start(int(self.idle_seconds * 1000))
+        # 只有插件订阅了 on_mouse_move 时才开启鼠标跟踪，避免无用的鼠标移动事件
+        self.plugin_manager.events.add_subscription_listener(self._update_mouse_tracking)
+        self._update_mouse_tracking()
+
+        # 监视配置文件，配置变化(包括设置页面和插件管理页面的保存)后只应用变化的部分
+        self.configmanager.add_change_listener(self.apply_config_changes)
+        # 插件开关等延迟写入的保存失败时通过托盘通知提示
+        self.config_write_failed.connect(self._on_config_write_failed)
+        self.configmanager.add_write_error_listener(self.config_write_failed.emit)
+        self.config_watcher = ConfigWatcher(self.configmanager, parent=self)
+
+    @staticmethod
+    def _idle_settings(animation):
+        """根据动画设置计算空闲帧间隔(毫秒)和进入空闲状态的等待时间(秒)"""
+        idle_interval = 1000 / animation.idle_frame_rate if animation.idle_frame_rate else 0
+        return idle_interval, animation.idle_delay_s
+
+    def _mark_startup(self, name):
+        """记录启动过程中某一时刻距启动的时间"""
+        self.startup_metrics[name] = (time.perf_counter() - self.startup_time) * 1000
+
+    def _on_model_loaded(self, result):
+        """后台加载模型完成，在下一帧中创建渲染器
+
+        参数:
+            result (ModelLoadResult): 后台加载的结果
+        """
+        # 加载期间更换了模型，丢弃旧模型的结果；更换后又换回时同一模型可能加载两次，只使用先完成的一次
+        if result.model_path != self.model_path or self.live2d.model is not None:
+            return
+        self._mark_startup('model_loaded')
+        self.pending_model = result
+        self.frame_governor.wake()
+        self.update()
+
+    def _attach_pending_model(self):
+        """为后台加载的模型创建渲染器，至少显示过一次占位帧之后才进行
+
+        返回值:
+            bool: 模型是否已可以绘制
+        """
+        if self.pending_model is None or not self.placeholder_painted or self.model_load_failed:
+            return False
+        result, self.pending_model = self.pending_model, None
+        start = time.perf_counter()
+        attached = self.live2d.attach_model(result.model, result.model_path, (self.width(), self.height()))
+        self.startup_metrics.update(result.metrics)
+        # 后台没有读取模型文件时，渲染线程中加载的是整个模型
+        stage = 'gl_upload' if result.model is not None else 'load_model'
+        self.startup_metrics[stage] = (time.perf_counter() - start) * 1000
+        if not attached:
+            # 不再显示占位帧，避免看起来像是模型卡住了
+            self.model_load_failed = True
+            self.placeholder_image = None
+            self._on_model_load_failed(result.model_path)
+            return False
+        # 按渲染分辨率比例调整模型的显示区域
+        self._update_render_target()
+        return True
+
+    def _on_model_load_failed(self, model_path):
+        """提示用户模型加载失败
+
+        参数:
+            model_path (str): 加载失败的模型文件路径
+        """
+        message = f"无法加载模型 {model_path}，请在设置中选择其它模型"
+        print(message)
+        if self.tray is not None:
+            self.tray.notify("模型加载失败", message)
+
+    def _paint_placeholder(self):
+        """模型加载期间绘制占位帧，没有可用的占位帧时只清除为背景色"""
+        if not self.placeholder_painted:
+            ratio = self.devicePixelRatioF()
+            self.placeholder_image = self.placeholder.load(
+                self.model_path, (round(self.width() * ratio), round(self.height() * ratio)))
+            self.placeholder_painted = True
+            self._mark_startup('placeholder')
+
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(self.rect(), QColor(*self.background_color[:3], 0))
+        if self.placeholder_image is not None:
+            painter.drawImage(self.rect(), self.placeholder_image)
+        painter.end()
+        # 占位帧显示之后再创建渲染器，创建失败后不再重试
+        if self.pending_model is not None and not self.model_load_failed:
+            self.update()
+
+    def _save_placeholder(self):
+        """保存当前画面作为下次启动时的占位帧，需要在释放Live2D资源之前调用"""
+        if self.live2d.model is None or not self.isVisible():
+            return
+        # 占位帧中不包含性能浮层
+        hud, self.frame_hud = self.frame_hud, None
+        self.live2d.invalidate()
+        image = self.grabFramebuffer()
+        self.frame_hud = hud
+        self.placeholder.save(image, self.model_path)
+
+    def _update_mouse_tracking(self):
+        self.setMouseTracking(self.plugin_manager.events.has_subscribers('on_mouse_move'))
+
+    def apply_config_changes(self, changes):
+        """应用发生变化的配置
+
+        参数:
+            changes (dict): {配置键: 新值}，配置键形如 window.x、plugins[0].enabled
+        """
+        settings = self.configmanager.settings
+        window = settings.window
+        # 去掉数组下标的配置键，例如 window.background_color[3] -> window.background_color
+        changed = {key.split("[", 1)[0] for key in changes}
+
+        if "window.x" in changed or "window.y" in changed:
+            self.pet_x, self.pet_y = window.x, window.y
+            self.move(self.pet_x, self.pet_y)
+        if "window.width" in changed or "window.height" in changed:
+            # 模型的显示区域在 resizeGL 中同步调整
+            self.window_width, self.window_height = window.width, window.height
+            self.resize(self.window_width, self.window_height)
+        if "window.background_color" in changed:
+            self.background_color = window.background_color
+
+        if "model.scale" in changed:
+            self.scale = settings.model.scale
+        if "model.render_scale" in changed:
+            self.render_scale = settings.model.render_scale
+            self.makeCurrent()
+            self._update_render_target()
+            self.doneCurrent()
+        if "model.model_path" in changed:
+            self.model_path = settings.model.model_path
+            if self.live2d.model is None:
+                # 模型仍在后台加载或加载失败，丢弃旧模型的结果，显示新模型的占位帧并在后台加载新模型
+                self.pending_model = None
+                self.model_load_failed = False
+                self.placeholder_painted = False
+                self.model_loader.start(self.model_path)
+                self.update()
+            else:
+                self.makeCurrent()
+                loaded = self.live2d.load_model(self.model_path, (self.window_width, self.window_height))
+                if loaded:
+                    # 按渲染分辨率比例调整新模型的显示区域
+                    self._update_render_target()
+                self.doneCurrent()
+                if not loaded:
+                    self._on_model_load_failed(self.model_path)
+
+        if changed & {"animation.frame_rate_ms", "animation.idle_frame_rate", "animation.idle_delay_s"}:
+            self.frame_rate_ms = settings.animation.frame_rate_ms
+            self.frame_governor.configure(1000 / self.frame_rate_ms, *self._idle_settings(settings.animation))
+            if self.frame_hud is not None:
+                self.frame_hud.frame_budget_ms = 1000 / self.frame_rate_ms
+
+        # 插件列表: 只启用或卸载启用状态变化的插件，插件路径变化时重新加载插件
+        plugin_keys = [key for key in changes if key == "plugins" or key.startswith("plugins[")]
+        if plugin_keys:
+            self.plugins = self.configmanager.config.get("plugins", [])
+            self.plugin_manager.sync_plugins(self.plugins)
+            for key in plugin_keys:
+                if key.endswith("].plugin_path"):
+                    index = int(key[len("plugins["):key.index("]")])
+                    self.plugin_manager.reload_plugin(self.plugins[index]['plugin_name'])
+
+        if "plugin_manager.profiler" in changed:
+            if settings.plugin_manager.profiler:
+                self.plugin_manager.enable_profiler()
+            else:
+                self.plugin_manager.disable_profiler()
+
+        # 通知订阅了 on_config_changed 的插件，并按正常帧率显示变化
+        self.plugin_manager.events.publish('on_config_changed', self, changes)
+        self.frame_governor.wake()
+
+    def _on_config_write_failed(self, error):
+        """后台写入配置失败时提示用户
+
+        参数:
+            error (str): 错误信息
+        """
+        if self.tray is not None:
+            self.tray.notify("配置保存失败", error)
+
+    def set_frame_hud(self, enabled):
+        """显示或隐藏性能浮层，显示期间记录每帧各阶段的耗时
+
+        参数:
+            enabled (bool): 是否显示
+        """
+        if enabled:
+            if self.frame_timeline is None:
+                self.frame_timeline = FrameTimeline()
+            self.frame_hud = FrameHud(1000 / self.frame_rate_ms)
+        else:
+            self.frame_hud = None
+        # 浮层出现或消失后需要重新绘制整个画面
+        self.live2d.invalidate()
+        self.frame_governor.wake()
+
+    def export_frame_timeline(self, path):
+        """导出记录的帧耗时，按扩展名选择 CSV 或 JSON 格式
+
+        参数:
+            path (str): 文件路径
+        异常:
+            RuntimeError: 尚未记录帧耗时(性能浮层从未开启)
+            OSError: 写入文件失败
+        """
+        if self.frame_timeline is None:
+            raise RuntimeError("尚未记录帧耗时，请先开启性能浮层")
+        if path.lower().endswith(".csv"):
+            self.frame_timeline.export_csv(path)
+        else:
+            self.frame_timeline.export_json(path)
+
+    def _update_render_target(self):
+        """按渲染分辨率比例创建或释放离屏帧缓冲区，并调整模型的显示区域，需要在OpenGL上下文中调用"""
+        width, height = self.width(), self.height()
+        if self.render_scale < 1:
+            if self.render_target is None:
+                self.render_target = RenderTarget(self.render_scale)
+            self.render_target.render_scale = self.render_scale
+            width, height = self.render_target.resize(width, height, self.devicePixelRatioF())
+        elif self.render_target is not None:
+            self.render_target.dispose()
+            self.render_target = None
+        self.live2d.resize(width, height)
+
+    def resizeGL(self, width, height):
+        self._update_render_target()
 
     def mousePressEvent(self, event):
+        self.idle_timer.start()
+        self.frame_governor.wake()
         if event.button() == Qt.MouseButton.LeftButton:
             self.draggable = True
+            self.dragged = False
             self.offset = event.pos()
 
     def mouseMoveEvent(self, event):
+        self.idle_timer.start()
+        self.frame_governor.wake()
         if self.draggable:
+            self.dragged = True
             self.move(event.globalPos() - self.offset)
+        pos = event.globalPos()
+        self.plugin_manager.events.publish('on_mouse_move', self, pos.x(), pos.y())
 
     def mouseReleaseEvent(self, event):
+        self.idle_timer.start()
+        self.frame_governor.wake()
+        events = self.plugin_manager.events
         if event.button() == Qt.MouseButton.LeftButton:
             self.draggable = False
+            if self.dragged:
+                events.publish('on_drag_end', self, self.x(), self.y())
+                return
+        pos = event.globalPos()
+        events.publish('on_click', self, event.button(), pos.x(), pos.y())
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # 窗口被其它窗口完全遮挡等情况只通过顶层 QWindow 的 Expose 事件通知
+        if not self._watching_expose and self.windowHandle() is not None:
+            self.windowHandle().installEventFilter(self)
+            self._watching_expose = True
+        # 重新显示后的第一帧完整绘制，不依赖帧缓冲区中保留的内容
+        self.live2d.invalidate()
+        self.frame_governor.resume('hidden')
+        self.plugin_manager.events.publish('on_visibility_changed', self, True)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.frame_governor.suspend('hidden')
+        self.plugin_manager.events.publish('on_visibility_changed', self, False)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            if self.windowState() & Qt.WindowState.WindowMinimized:
+                self.frame_governor.suspend('minimized')
+            else:
+                self.frame_governor.resume('minimized')
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Expose and watched is self.windowHandle():
+            # 恢复时模型和持续性插件按真实经过的时间推进，唇形同步按墙上时间继续
+            if watched.isExposed():
+                self.frame_governor.resume('unexposed')
+            else:
+                self.frame_governor.suspend('unexposed')
+        return super().eventFilter(watched, event)
 
     def keyPressEvent(self, event):
         pass
 
     def paintGL(self):
-        # 执行持续性插件
-        self.plugin_manager.execute_lasting_plugins(self)
+        # 模型加载期间显示占位帧，不执行插件
+        if self.live2d.model is None and not self._attach_pending_model():
+            self._paint_placeholder()
+            return
+
+        # 测量距上一帧的真实间隔，第一帧为0
+        perf_counter = time.perf_counter
+        now = perf_counter()
+        dt = now - self.last_frame_time if self.last_frame_time else 0.0
+        self.last_frame_time = now
+
+        applied_results = self.plugin_manager.applied_results
+        # 执行持续性插件，插件与模型使用同一个帧时间戳
+        self.plugin_manager.execute_lasting_plugins(self, now)
+        # 应用后台执行的持续性插件结果
+        self.plugin_manager.apply_worker_results(self)
+
+        # 更新模型状态，各阶段之间读取时钟的开销可以忽略，因此始终计时，只在开启性能浮层时记录
+        live2d = self.live2d
+        plugins_end = perf_counter()
+        live2d.update_model(dt)
+        model_end = perf_counter()
+        live2d.update_lipsync()
+        lipsync_end = perf_counter()
+        live2d.update_transform(self.scale)
+        transform_end = perf_counter()
+        # 只有插件订阅了 on_motion_finished 时才检查动作状态
+        events = self.plugin_manager.events
+        if events.has_subscribers('on_motion_finished') and live2d.poll_motion_finished():
+            events.publish('on_motion_finished', self)
+        # 绘制模型，模型状态没有变化时跳过，性能浮层每帧都会变化因此开启时始终绘制
+        draw_start = perf_counter()
+        live2d.draw_if_changed(self.background_color, force=self.frame_hud is not None,
+                               target=self.render_target)
+
+        if self.frame_hud is not None:
+            draw_end = perf_counter()
+            self.frame_hud.paint(self, self.frame_timeline, live2d.skipped_frames)
+            self.frame_timeline.record(now, dt, (plugins_end - now, model_end - plugins_end,
+                                                 lipsync_end - model_end, transform_end - lipsync_end,
+                                                 draw_end - draw_start, perf_counter() - draw_end))
+        if 'first_frame' not in self.startup_metrics:
+            self._report_startup()
+        # 动作、唇形同步和插件更新都没有时，帧率调节器在一段时间后降低帧率
+        self.frame_governor.tick(self.live2d.is_animating()
+                                 or self.plugin_manager.applied_results != applied_results)
 
-        # 更新模型状态
-        self.live2d.update(self.scale)
-        # 绘制模型
-        self.live2d.draw(self.background_color)
+    def _report_startup(self):
+        """绘制出第一帧模型时记录启动耗时，启用插件耗时分析时同时输出"""
+        self._mark_startup('first_frame')
+        if self.plugin_manager.profiler is None:
+            return
+        metrics = self.startup_metrics
+        stages = [f"占位帧 {metrics.get('placeholder', 0):.0f}ms",
+                  f"后台预读文件 {metrics.get('prefetch', 0):.0f}ms"]
+        if 'read_model' in metrics:
+            stages.append(f"后台读取模型文件 {metrics['read_model']:.0f}ms")
+            stages.append(f"创建渲染器 {metrics.get('gl_upload', 0):.0f}ms")
+        else:
+            stages.append(f"渲染线程加载模型 {metrics.get('load_model', 0):.0f}ms")
+        stages.append(f"首帧 {metrics['first_frame']:.0f}ms")
+        print(f"启动耗时: {'，'.join(stages)}")
 
     def initializeGL(self) -> None:
-        self.live2d.initialize(self.model_path, (self.window_width, self.window_height))
+        # 模型由后台线程加载，这里只初始化OpenGL资源
+        self.live2d.gl_init()
         # 创建托盘菜单
         self.tray = ContextMenuEvent(self)
+        failures = self.plugin_manager.init_failures
+        if failures:
+            self.tray.notify("插件初始化失败", "\n".join(f"{name}: {reason}" for name, reason in failures.items()))
+        # 启动阶段读取的插件清单写入缓存，下次启动时直接使用
+        self.plugin_manager.manifest_cache.save()
 
     # 右键菜单事件处理函数
     def contextMenuEvent(self, event):
+        self.frame_governor.wake()
         return self.tray.show(event.globalPos())
 
     def quit(self):
+        # 保存最后一帧作为下次启动时的占位帧，读取画面时会执行 paintGL，因此在停止插件之前进行
+        self._save_placeholder()
+        # 停止插件后台线程
+        self.plugin_manager.shutdown()
+        # 写入尚未写入的配置
+        self.configmanager.flush()
         # 释放Live2D资源
         self.live2d.dispose()
         # 退出应用程序
@@ -0,0 +1,58 @@
+import os
+from typing import Optional, Tuple
+
+from PySide6.QtGui import QImage
+
+
+class PlaceholderFrame:
+    """模型加载期间显示的占位帧
+
+    退出时把最后一帧保存为PNG，并在图片中记录模型路径，
+    下次启动时模型路径和窗口大小都一致才使用，模型在后台加载期间显示这一帧
+
+    属性:
+        path (str): 占位帧图片的路径
+    """
+
+    MODEL_PATH_KEY = "model_path"
+
+    def __init__(self, path: str) -> None:
+        """初始化占位帧
+
+        参数:
+            path (str): 占位帧图片的路径
+        """
+        self.path = path
+
+    def load(self, model_path: str, size: Tuple[int, int]) -> Optional[QImage]:
+        """读取占位帧
+
+        参数:
+            model_path (str): 当前的模型路径
+            size (Tuple[int, int]): 当前的窗口大小(物理像素)
+        返回值:
+            Optional[QImage]: 占位帧，不存在或与当前的模型、窗口大小不一致时返回None
+        """
+        if not os.path.exists(self.path):
+            return None
+        image = QImage(self.path)
+        if image.isNull() or image.text(self.MODEL_PATH_KEY) != model_path:
+            return None
+        if (image.width(), image.height()) != tuple(size):
+            return None
+        return image
+
+    def save(self, image: QImage, model_path: str) -> None:
+        """保存占位帧
+
+        参数:
+            image (QImage): 最后一帧
+            model_path (str): 该帧显示的模型路径
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            image.setText(self.MODEL_PATH_KEY, model_path)
+            if not image.save(self.path, "PNG"):
+                print(f"占位帧保存失败: {self.path}")
+        except OSError as e:
+            print(f"占位帧保存失败: {e}")
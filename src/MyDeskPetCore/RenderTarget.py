@@ -0,0 +1,87 @@
+import math
+from typing import Optional, Tuple
+
+from PySide6.QtCore import QRect
+from PySide6.QtGui import QOpenGLContext
+from PySide6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+
+GL_COLOR_BUFFER_BIT = 0x4000
+GL_LINEAR = 0x2601
+
+
+class RenderTarget:
+    """降低分辨率渲染的离屏帧缓冲区
+
+    窗口较大或屏幕缩放比例较高时，绘制模型的耗时主要取决于像素数量。
+    模型先以 render_scale 倍的分辨率绘制到离屏帧缓冲区，再以线性过滤放大复制到窗口的帧缓冲区，
+    像素数量按 render_scale 的平方减少
+
+    帧缓冲区在 begin 中按需创建，所有方法都需要在OpenGL上下文中调用
+
+    属性:
+        render_scale (float): 渲染分辨率相对窗口物理像素的比例，取值 (0, 1]
+        target_size (Tuple[int, int]): 窗口帧缓冲区的大小(物理像素)
+        size (Tuple[int, int]): 离屏帧缓冲区的大小(物理像素)
+    """
+
+    def __init__(self, render_scale: float) -> None:
+        """初始化离屏帧缓冲区
+
+        参数:
+            render_scale (float): 渲染分辨率相对窗口物理像素的比例
+        """
+        self.render_scale = render_scale
+        self.target_size: Tuple[int, int] = (1, 1)
+        self.size: Tuple[int, int] = (1, 1)
+        self._fbo: Optional[QOpenGLFramebufferObject] = None
+
+    def resize(self, width: int, height: int, device_pixel_ratio: float = 1.0) -> Tuple[int, int]:
+        """按窗口大小计算离屏帧缓冲区的大小，帧缓冲区在下一次 begin 时重新创建
+
+        参数:
+            width (int): 窗口宽度(逻辑像素)
+            height (int): 窗口高度(逻辑像素)
+            device_pixel_ratio (float): 屏幕缩放比例
+        返回值:
+            Tuple[int, int]: 离屏帧缓冲区的大小，模型的显示区域按此大小设置
+        """
+        self.target_size = (max(round(width * device_pixel_ratio), 1), max(round(height * device_pixel_ratio), 1))
+        self.size = (max(math.ceil(self.target_size[0] * self.render_scale), 1),
+                     max(math.ceil(self.target_size[1] * self.render_scale), 1))
+        return self.size
+
+    def begin(self) -> None:
+        """绑定离屏帧缓冲区并把视口设置为其大小，之后的绘制都画到离屏帧缓冲区中"""
+        width, height = self.size
+        if self._fbo is None or (self._fbo.width(), self._fbo.height()) != (width, height):
+            fmt = QOpenGLFramebufferObjectFormat()
+            fmt.setAttachment(QOpenGLFramebufferObject.Attachment.CombinedDepthStencil)
+            self._fbo = QOpenGLFramebufferObject(width, height, fmt)
+        self._fbo.bind()
+        QOpenGLContext.currentContext().functions().glViewport(0, 0, width, height)
+
+    def end(self, target: Optional[QOpenGLFramebufferObject] = None) -> None:
+        """解除绑定，把离屏帧缓冲区的内容以线性过滤放大复制到目标帧缓冲区
+
+        参数:
+            target (Optional[QOpenGLFramebufferObject]): 目标帧缓冲区，为None时复制到当前上下文的默认帧缓冲区，
+                在 QOpenGLWidget 的 paintGL 中就是窗口的帧缓冲区
+        """
+        self._fbo.release()
+        width, height = self.target_size
+        QOpenGLFramebufferObject.blitFramebuffer(target, QRect(0, 0, width, height),
+                                                 self._fbo, QRect(0, 0, *self.size),
+                                                 GL_COLOR_BUFFER_BIT, GL_LINEAR)
+        QOpenGLContext.currentContext().functions().glViewport(0, 0, width, height)
+
+    def image(self):
+        """读取离屏帧缓冲区的内容，用于调试和基准测试
+
+        返回值:
+            QImage: 帧缓冲区的图像，尚未创建时返回None
+        """
+        return self._fbo.toImage() if self._fbo is not None else None
+
+    def dispose(self) -> None:
+        """释放离屏帧缓冲区"""
+        self._fbo = None
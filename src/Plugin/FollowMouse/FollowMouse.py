@@ -5,17 +5,42 @@ from src.Plugin.PluginBase import LastingPlugin
 class FollowMousePlugin(LastingPlugin):
     """鼠标跟随插件
     
-    在每一帧更新时执行，使宠物跟随鼠标移动
+    按配置的更新频率执行，使宠物跟随鼠标移动
     """
-    
-    def update(self, parent) -> None:
-        """更新方法，在每一帧调用
+
+    # 视线跟随不需要以渲染帧率更新
+    update_hz = 30
+
+    def initialize(self) -> bool:
+        # 上一次返回的鼠标位置，鼠标没有移动时不再返回结果
+        self.last_position = None
+        return True
+
+    def update(self, parent, dt: float = 0.0):
+        """更新方法，按插件的更新频率调用，可在后台线程中执行
         
         参数:
             parent: 父对象，通常是PetMain实例
+            dt (float): 距上一次调用的真实间隔(秒)
+
+        返回值:
+            tuple: 屏幕上的鼠标位置，鼠标没有移动时返回None
         """
         # 全屏跟随：获取屏幕上的鼠标位置
-        screen_x, screen_y = pyautogui.position()
+        position = tuple(pyautogui.position())
+        if position == self.last_position:
+            return None
+        self.last_position = position
+        return position
+
+    def apply_result(self, parent, result) -> None:
+        """在GUI线程中让模型视线跟随鼠标
+
+        参数:
+            parent: 父对象，通常是PetMain实例
+            result (tuple): 屏幕上的鼠标位置
+        """
+        screen_x, screen_y = result
         # 转换为窗口相对坐标
         x = screen_x - parent.pet_x
         y = screen_y - parent.pet_y
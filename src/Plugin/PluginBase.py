@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Mapping, Optional, Sequence
 
 
 class PluginBase(ABC):
@@ -8,20 +8,24 @@ class PluginBase(ABC):
     所有插件必须继承此基类，并实现相应的抽象方法。
     插件分为三种类型：
     1. 菜单型(menu)：在系统托盘菜单中添加菜单项，点击菜单项执行相应功能
-    2. 持久型(lasting)：在每一帧更新时执行，用于实现持续性功能
+    2. 持久型(lasting)：按插件的更新频率(默认每帧)执行，用于实现持续性功能
     3. 初始化型(init)：在应用程序启动时执行一次，用于初始化功能
+    4. 事件型(event)：只响应事件，事件发生前不做任何工作
+
+    任何类型的插件都可以重写 on_ 开头的事件钩子方法，插件实例创建后会自动订阅重写了的事件，
+    事件回调在GUI线程中执行
     
     属性:
         plugin_info (Dict[str, Any]): 插件信息
-        plugin_config (Dict[str, Any]): 插件配置
+        plugin_config (Mapping[str, Any]): 插件配置的只读视图
     """
 
-    def __init__(self, plugin_info: Dict[str, Any], plugin_config: Dict[str, Any]):
+    def __init__(self, plugin_info: Dict[str, Any], plugin_config: Mapping[str, Any]):
         """初始化插件基类
         
         参数:
             plugin_info (Dict[str, Any]): 插件信息
-            plugin_config (Dict[str, Any]): 插件配置
+            plugin_config (Mapping[str, Any]): 插件配置的只读视图
         """
         self.plugin_info = plugin_info
         self.plugin_config = plugin_config
@@ -40,10 +44,39 @@ class PluginBase(ABC):
     def cleanup(self) -> None:
         """清理插件资源
         
-        在插件卸载时调用，用于清理插件资源
+        在插件被禁用、删除或重新加载时调用，用于清理插件资源。
+        插件应在这里停止自己创建的定时器和线程，并释放对宠物窗口等外部对象的引用
         """
         pass
 
+    def on_mouse_move(self, parent, x: int, y: int) -> None:
+        """鼠标在宠物窗口上移动时调用，x/y 为屏幕坐标"""
+        pass
+
+    def on_click(self, parent, button, x: int, y: int) -> None:
+        """在宠物窗口上单击(按下后未拖动即松开)时调用，button 为 Qt.MouseButton，x/y 为屏幕坐标"""
+        pass
+
+    def on_drag_end(self, parent, x: int, y: int) -> None:
+        """拖动宠物窗口结束时调用，x/y 为窗口的新位置"""
+        pass
+
+    def on_visibility_changed(self, parent, visible: bool) -> None:
+        """宠物窗口显示或隐藏时调用"""
+        pass
+
+    def on_motion_finished(self, parent) -> None:
+        """模型动作播放完成时调用"""
+        pass
+
+    def on_idle(self, parent, idle_seconds: float) -> None:
+        """用户一段时间没有与宠物交互时调用，idle_seconds 为已空闲的秒数"""
+        pass
+
+    def on_config_changed(self, parent, changes: Dict[str, Any]) -> None:
+        """配置发生变化时调用，changes 为 {配置键: 新值}，配置键形如 window.x"""
+        pass
+
 
 class MenuPlugin(PluginBase):
     """菜单型插件基类
@@ -69,7 +102,9 @@ class MenuPlugin(PluginBase):
     menu_parameter = "参数2"
     ```
     
-    插件可以通过实现create_custom_menu方法来自定义菜单，该方法将覆盖配置文件中的菜单项
+    插件可以通过实现create_custom_menu方法来自定义菜单，该方法将覆盖配置文件中的菜单项。
+    配置文件中没有菜单项的插件(或在[plugin]中声明 custom_menu = true 的插件)使用自定义菜单，
+    插件模块在托盘菜单第一次打开时才加载；其余插件直接按配置文件创建菜单，在菜单项被点击时才加载
     """
 
     def initialize(self) -> bool:
@@ -120,9 +155,21 @@ class LastingPlugin(PluginBase):
     [plugin]
     name = "示例持久型插件"
     function_name = "update"
+    update_hz = 30  # 可选，期望的更新频率，不填则每帧调用
+    run_in_worker = false  # 可选，是否在后台工作线程中执行 update
     ```
+
+    后台执行模式下 update 在工作线程中运行，不能直接修改Qt对象或模型，
+    需要把要应用的数据作为返回值，由 apply_result 在GUI线程中应用
+
+    属性:
+        update_hz (Optional[float]): 默认的更新频率，配置文件中的 update_hz 优先，为None时每帧调用
+        run_in_worker (bool): 默认的执行方式，配置文件中的 run_in_worker 优先
     """
 
+    update_hz: Optional[float] = None
+    run_in_worker: bool = False
+
     def initialize(self) -> bool:
         """初始化持久型插件
         
@@ -132,11 +179,27 @@ class LastingPlugin(PluginBase):
         return True
 
     @abstractmethod
-    def update(self, parent) -> None:
-        """更新方法，在每一帧调用
+    def update(self, parent, dt: float = 0.0) -> Any:
+        """更新方法，按插件的更新频率调用
         
         参数:
             parent: 父对象，通常是PetMain实例
+            dt (float): 距上一次调用的真实间隔(秒)，首次调用时为0
+
+        返回值:
+            Any: 不为None时会传给 apply_result 在GUI线程中应用；
+                没有需要显示的变化时应返回None，宠物窗口空闲时可以降低渲染帧率
+        """
+        pass
+
+    def apply_result(self, parent, result: Any) -> None:
+        """在GUI线程中应用 update 的返回值
+
+        在模型更新之前调用，修改Qt对象和模型的操作应放在这里
+
+        参数:
+            parent: 父对象，通常是PetMain实例
+            result (Any): update 的返回值
         """
         pass
 
@@ -151,9 +214,21 @@ class InitPlugin(PluginBase):
     [plugin]
     name = "示例初始化型插件"
     function_name = "on_init"  # 初始化时调用的函数名
+    depends_on = ["OtherInitPlugin"]  # 可选，必须先执行完成的初始化型插件
+    gui_thread = true  # 可选，是否必须在GUI线程中执行
     ```
+
+    gui_thread 为 false 的插件在启动时与其它插件并行地在线程池中执行，
+    只能做文件扫描、缓存预热等不涉及Qt对象的工作；修改窗口属性等操作必须在GUI线程中执行
+
+    属性:
+        depends_on (Sequence[str]): 默认的依赖插件列表，配置文件中的 depends_on 优先
+        gui_thread (bool): 默认是否在GUI线程中执行，配置文件中的 gui_thread 优先
     """
 
+    depends_on: Sequence[str] = ()
+    gui_thread: bool = True
+
     def initialize(self) -> bool:
         """初始化插件并执行初始化函数
         
@@ -168,3 +243,26 @@ class InitPlugin(PluginBase):
         在应用程序启动时执行一次
         """
         pass
+
+
+class EventPlugin(PluginBase):
+    """事件型插件基类
+
+    插件启用后立即实例化并订阅重写了的事件钩子，没有事件时不做任何工作，
+    用于替代只为响应用户操作而每帧轮询的持续性插件
+
+    事件型插件配置示例:
+    ```toml
+    [plugin]
+    name = "示例事件型插件"
+    plugin_type = "event"
+    ```
+    """
+
+    def initialize(self) -> bool:
+        """初始化事件型插件
+
+        返回值:
+            bool: 初始化是否成功
+        """
+        return True
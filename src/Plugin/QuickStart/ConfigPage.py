@@ -177,8 +177,7 @@ class ConfigPage(ScrollArea):
             
             # 读取配置文件
             if os.path.exists(self.config_path):
-                config_manager = ConfigManager(self.config_path)
-                menu_items = config_manager.config.get("menu", [])
+                menu_items = ConfigManager.shared(self.config_path).view().get("menu", ())
                 
                 # 添加菜单项卡片
                 for menu_item in menu_items:
@@ -218,7 +217,7 @@ class ConfigPage(ScrollArea):
         try:
             if not os.path.exists(self.config_path):
                 return
-            config_manager = ConfigManager(self.config_path)
+            config_manager = ConfigManager.shared(self.config_path)
             config = config_manager.config
             
             # 收集所有菜单项数据
@@ -0,0 +1,651 @@
+"""进程外插件宿主
+
+插件可以在配置文件中声明 out_of_process = true，使插件模块在独立的子进程中加载和执行，
+插件卡死或崩溃时不会影响桌宠的渲染进程。
+
+宿主进程与 PluginManager 通过标准输入输出管道通信，每条消息由4字节小端长度和 marshal 序列化的元组组成:
+    请求: (request_id, op, plugin_name, payload)
+    响应: (request_id, ok, result)
+op 取值:
+    load: 加载插件，payload 为插件信息
+    unload: 卸载插件并调用插件的 cleanup
+    call: 调用插件函数，payload 为 (function_name, args)
+    tick: 批量执行持续性插件，payload 为 [(plugin_name, dt), ...]，
+          响应结果为 [(plugin_name, ok, result), ...]，ok 为False时 result 为错误信息，单个插件出错不影响其它插件
+    ping: 空操作，用于测量往返延迟
+
+运行方式(由 PluginHostClient 自动启动):
+    python -m src.PluginHost
+"""
+import inspect
+import marshal
+import os
+import queue
+import struct
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.Plugin.PluginBase import MenuPlugin, LastingPlugin, InitPlugin, EventPlugin
+
+# 消息头: 4字节小端无符号整数，表示消息体长度
+HEADER = struct.Struct("<I")
+
+
+def write_message(stream, message: tuple) -> None:
+    """写入一条消息
+
+    参数:
+        stream: 二进制输出流
+        message (tuple): 消息元组，元素必须可被 marshal 序列化
+    """
+    body = marshal.dumps(message)
+    stream.write(HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def read_message(stream) -> Optional[tuple]:
+    """读取一条消息
+
+    参数:
+        stream: 二进制输入流
+    返回值:
+        Optional[tuple]: 消息元组，流已关闭时返回None
+    """
+    header = _read_exact(stream, HEADER.size)
+    if header is None:
+        return None
+    body = _read_exact(stream, HEADER.unpack(header)[0])
+    if body is None:
+        return None
+    return marshal.loads(body)
+
+
+def _read_exact(stream, size: int) -> Optional[bytes]:
+    """从流中读取指定长度的数据，流提前结束时返回None"""
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+class PluginHostServer:
+    """插件宿主进程中的服务端
+
+    负责加载插件模块、创建插件实例，并执行来自 PluginManager 的请求。
+    宿主进程中没有桌宠窗口，插件收到的 parent 参数始终为None
+
+    属性:
+        instances (dict): 插件名 -> 插件实例
+    """
+
+    def __init__(self) -> None:
+        """初始化插件宿主服务端"""
+        self.instances: Dict[str, Any] = {}
+
+    def handle(self, op: str, plugin_name: Optional[str], payload: Any) -> Any:
+        """处理一条请求
+
+        参数:
+            op (str): 操作类型
+            plugin_name (Optional[str]): 插件名称
+            payload (Any): 请求数据
+        返回值:
+            Any: 请求结果
+        """
+        if op == 'tick':
+            results = []
+            for name, dt in payload:
+                try:
+                    result = self.instances[name].update(None, dt)
+                except Exception as e:
+                    results.append((name, False, f"{type(e).__name__}: {e}"))
+                    continue
+                if result is not None:
+                    results.append((name, True, result))
+            return results
+        if op == 'call':
+            function_name, args = payload
+            return getattr(self.instances[plugin_name], function_name)(None, *args)
+        if op == 'load':
+            self.load(payload)
+            return True
+        if op == 'unload':
+            instance = self.instances.pop(plugin_name, None)
+            if instance is not None:
+                instance.cleanup()
+            return True
+        if op == 'ping':
+            return payload
+        raise ValueError(f"未知的操作: {op}")
+
+    def load(self, plugin_info: Dict[str, Any]) -> None:
+        """加载插件模块并创建插件实例
+
+        参数:
+            plugin_info (Dict[str, Any]): 插件信息
+        """
+        from src.ConfigManager import ConfigManager
+        from src.Plugin.PluginBase import PluginBase
+        from src.PluginManager import PluginManager
+
+        plugin_name = plugin_info['plugin_name']
+        plugin = PluginManager.import_plugin_module(plugin_info)
+
+        plugin_config = ConfigManager.shared(os.path.join(plugin_info['plugin_path'], "config.toml")).view()
+
+        for name, obj in inspect.getmembers(plugin):
+            if (inspect.isclass(obj)
+                    and issubclass(obj, PluginBase)
+                    and obj not in (PluginBase, MenuPlugin, LastingPlugin, InitPlugin, EventPlugin)):
+                instance = obj(plugin_info, plugin_config)
+                if not instance.initialize():
+                    raise RuntimeError(f"插件 {plugin_name} 初始化失败")
+                self.instances[plugin_name] = instance
+                return
+        raise RuntimeError(f"插件 {plugin_name} 中找不到继承自PluginBase的类")
+
+    def serve(self, reader, writer) -> None:
+        """处理请求直到输入流关闭
+
+        参数:
+            reader: 二进制输入流
+            writer: 二进制输出流
+        """
+        while True:
+            message = read_message(reader)
+            if message is None:
+                return
+            request_id, op, plugin_name, payload = message
+            try:
+                response = (request_id, True, self.handle(op, plugin_name, payload))
+                write_message(writer, response)
+            except Exception as e:
+                write_message(writer, (request_id, False, f"{type(e).__name__}: {e}"))
+
+
+class PluginHostClient:
+    """渲染进程中的插件宿主客户端
+
+    负责启动宿主子进程并与之通信。GUI线程中的加载、卸载、菜单和初始化调用只发送请求而不等待响应，
+    失败时在响应到达后打印错误；持续性插件的调用在每帧合并为一条批量请求，结果在之后的帧中取回，
+    渲染循环从不等待宿主进程。
+
+    宿主进程崩溃后在后台线程中重启并重新加载插件，超过重启次数上限后停止重启；
+    批量请求超过 tick_timeout 仍未返回时视为宿主卡死，结束宿主进程后同样重启
+
+    属性:
+        name (str): 宿主名称
+        plugins (dict): 插件名 -> 插件信息，宿主重启后会重新加载
+        max_restarts (int): 重启窗口内允许的最大重启次数
+        restart_window (float): 重启次数的统计窗口(秒)
+        call_timeout (float): 同步请求(request/call)的超时时间(秒)
+        tick_timeout (float): 批量请求的超时时间(秒)
+    """
+
+    def __init__(self, name: str, max_restarts: int = 3, restart_window: float = 60.0,
+                 call_timeout: float = 5.0, tick_timeout: float = 2.0) -> None:
+        """初始化插件宿主客户端
+
+        参数:
+            name (str): 宿主名称
+            max_restarts (int): 重启窗口内允许的最大重启次数
+            restart_window (float): 重启次数的统计窗口(秒)
+            call_timeout (float): 同步请求的超时时间(秒)
+            tick_timeout (float): 批量请求的超时时间(秒)
+        """
+        self.name = name
+        self.plugins: Dict[str, Dict[str, Any]] = {}
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.call_timeout = call_timeout
+        self.tick_timeout = tick_timeout
+
+        self.process: Optional[subprocess.Popen] = None
+        self._restart_times: List[float] = []
+        self._next_id = 0
+        # 请求编号 -> (发送请求的宿主进程, 响应回调)
+        self._pending: Dict[int, Tuple[subprocess.Popen, Callable[[bool, Any], None]]] = {}
+        self._lock = threading.Lock()
+        # 保证同一时刻只有一个线程在启动宿主进程
+        self._start_lock = threading.Lock()
+        self._restarting = False
+        # 后台启动期间到达的调用，宿主进程可用后依次执行，由 _lock 保护
+        self._start_callbacks: List[Callable[[], None]] = []
+        # 当前帧待发送的持续性插件调用
+        self._tick_batch: List[Tuple[str, float]] = []
+        self._tick_in_flight = False
+        self._tick_sent_at = 0.0
+        self._tick_results: queue.Queue = queue.Queue()
+        self.disabled = False
+
+    def start(self) -> bool:
+        """启动宿主进程并重新加载已注册的插件，宿主进程已在运行时直接返回
+
+        加载请求只发送不等待，因此不会因宿主进程导入插件而阻塞
+
+        返回值:
+            bool: 宿主进程是否可用
+        """
+        with self._start_lock:
+            if self.disabled:
+                return False
+            if self.is_alive():
+                return True
+            if self.process is not None:
+                # 统计窗口内的重启次数超过上限时停止重启
+                now = time.monotonic()
+                self._restart_times = [t for t in self._restart_times if now - t < self.restart_window]
+                if len(self._restart_times) >= self.max_restarts:
+                    print(f"插件宿主 {self.name} 重启次数过多，已停止")
+                    self.disabled = True
+                    return False
+                self._restart_times.append(now)
+                print(f"插件宿主 {self.name} 已退出，正在重启")
+
+            # 保证宿主进程能以 src.PluginHost 的形式导入
+            root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+            python_path = os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))
+            process = subprocess.Popen(
+                [sys.executable, "-m", "src.PluginHost"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=os.getcwd(),
+                env={**os.environ, "PYTHONPATH": python_path}
+            )
+            threading.Thread(target=self._read_loop, args=(process,), daemon=True,
+                             name=f"PluginHost-{self.name}").start()
+            # 先发送加载请求再公开新进程，保证其它线程发送的调用排在加载之后
+            for plugin_info in list(self.plugins.values()):
+                self._load(plugin_info, process)
+            self._tick_in_flight = False
+            self._tick_batch = []
+            self.process = process
+            return True
+
+    def start_in_background(self, kill: bool = False, then: Optional[Callable[[], None]] = None) -> None:
+        """在后台线程中(重新)启动宿主进程，已有重启在进行时只登记 then
+
+        参数:
+            kill (bool): 是否先结束当前的宿主进程，用于宿主卡死时
+            then (Optional[Callable[[], None]]): 宿主进程可用后在后台线程中调用，
+                已有重启在进行时在那次重启完成后调用
+        """
+        with self._lock:
+            if self.disabled:
+                return
+            if then is not None:
+                self._start_callbacks.append(then)
+            if self._restarting:
+                return
+            self._restarting = True
+
+        def restart():
+            started = False
+            try:
+                process = self.process
+                if kill and process is not None and process.poll() is None:
+                    process.kill()
+                    process.wait()
+                started = self.start()
+            finally:
+                # 取出回调与清除标志在同一把锁内，之后登记的回调会启动新的一次重启
+                with self._lock:
+                    callbacks, self._start_callbacks = self._start_callbacks, []
+                    self._restarting = False
+            if not started:
+                if callbacks:
+                    print(f"插件宿主 {self.name} 不可用，{len(callbacks)} 个调用未发送")
+                return
+            for callback in callbacks:
+                callback()
+
+        threading.Thread(target=restart, daemon=True, name=f"PluginHostStart-{self.name}").start()
+
+    def is_alive(self) -> bool:
+        """宿主进程是否正在运行"""
+        return self.process is not None and self.process.poll() is None
+
+    def ensure_running(self) -> bool:
+        """确保宿主进程正在运行，必要时按重启策略重启
+
+        返回值:
+            bool: 宿主进程是否可用
+        """
+        if self.is_alive():
+            return True
+        return self.start()
+
+    def register(self, plugin_info: Dict[str, Any]) -> bool:
+        """在宿主进程中加载插件
+
+        加载请求只发送不等待，宿主进程尚未运行时在后台启动并加载，加载失败时在响应到达后打印错误
+
+        参数:
+            plugin_info (Dict[str, Any]): 插件信息
+        返回值:
+            bool: 宿主是否可用(已停止重启时为False)
+        """
+        self.plugins[plugin_info['plugin_name']] = plugin_info
+        if self.disabled:
+            return False
+        if self.is_alive():
+            self._load(plugin_info)
+        else:
+            # 启动时会加载全部已注册的插件
+            self.start_in_background()
+        return True
+
+    def unregister(self, plugin_name: str) -> None:
+        """在宿主进程中卸载插件，不等待响应
+
+        参数:
+            plugin_name (str): 插件名称
+        """
+        if self.plugins.pop(plugin_name, None) is not None and self.is_alive():
+            self.send_request('unload', plugin_name, None)
+
+    def _load(self, plugin_info: Dict[str, Any], process: Optional[subprocess.Popen] = None) -> None:
+        """向宿主进程发送加载请求，不等待响应
+
+        参数:
+            plugin_info (Dict[str, Any]): 插件信息
+            process (Optional[subprocess.Popen]): 接收请求的宿主进程，为None时发给当前的宿主进程
+        """
+        plugin_name = plugin_info['plugin_name']
+
+        def on_loaded(ok, result):
+            if not ok:
+                print(f"插件 {plugin_name} 在宿主 {self.name} 中加载失败: {result}")
+
+        self.send_request('load', plugin_name, dict(plugin_info), on_loaded, process)
+
+    def call(self, plugin_name: str, function_name: str, *args) -> Any:
+        """同步调用插件函数并等待结果，不应在GUI线程中使用，GUI线程使用 call_async
+
+        参数:
+            plugin_name (str): 插件名称
+            function_name (str): 函数名称
+            *args: 传递给函数的参数，必须可被 marshal 序列化
+        返回值:
+            Any: 函数执行结果，失败时返回None
+        """
+        if not self.ensure_running():
+            return None
+        ok, result = self.request('call', plugin_name, (function_name, args))
+        if not ok:
+            print(f"插件 {plugin_name} 远程调用 {function_name} 失败: {result}")
+            return None
+        return result
+
+    def call_async(self, plugin_name: str, function_name: str, *args) -> None:
+        """调用插件函数但不等待结果，失败时在响应到达后打印错误
+
+        宿主进程未运行时在后台重启，重启完成后再发送
+
+        参数:
+            plugin_name (str): 插件名称
+            function_name (str): 函数名称
+            *args: 传递给函数的参数，必须可被 marshal 序列化
+        """
+        def on_done(ok, result):
+            if not ok:
+                print(f"插件 {plugin_name} 远程调用 {function_name} 失败: {result}")
+
+        def send():
+            self.send_request('call', plugin_name, (function_name, args), on_done)
+
+        if self.is_alive():
+            send()
+        else:
+            self.start_in_background(then=send)
+
+    def send_request(self, op: str, plugin_name: Optional[str], payload: Any,
+                     callback: Optional[Callable[[bool, Any], None]] = None,
+                     process: Optional[subprocess.Popen] = None) -> Optional[int]:
+        """发送请求但不等待响应
+
+        参数:
+            op (str): 操作类型
+            plugin_name (Optional[str]): 插件名称
+            payload (Any): 请求数据
+            callback (Optional[Callable[[bool, Any], None]]): 响应到达时在读取线程中调用 callback(ok, result)，
+                宿主进程退出时以 (False, 错误信息) 调用
+            process (Optional[subprocess.Popen]): 接收请求的宿主进程，为None时发给当前的宿主进程
+        返回值:
+            Optional[int]: 请求编号，发送失败时返回None(此时已经以失败调用 callback)
+        """
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            if process is None:
+                process = self.process
+            if callback is not None:
+                self._pending[request_id] = (process, callback)
+            try:
+                write_message(process.stdin, (request_id, op, plugin_name, payload))
+            except (OSError, ValueError, AttributeError) as e:
+                self._pending.pop(request_id, None)
+                error = f"发送请求失败: {e}"
+            else:
+                return request_id
+        if callback is not None:
+            callback(False, error)
+        return None
+
+    def request(self, op: str, plugin_name: Optional[str], payload: Any) -> Tuple[bool, Any]:
+        """发送请求并等待响应，最长等待 call_timeout 秒
+
+        参数:
+            op (str): 操作类型
+            plugin_name (Optional[str]): 插件名称
+            payload (Any): 请求数据
+        返回值:
+            Tuple[bool, Any]: (是否成功, 结果或错误信息)
+        """
+        event = threading.Event()
+        response = [False, "宿主进程无响应"]
+
+        def on_response(ok, result):
+            response[:] = [ok, result]
+            event.set()
+
+        request_id = self.send_request(op, plugin_name, payload, on_response)
+        if request_id is not None and not event.wait(self.call_timeout):
+            with self._lock:
+                self._pending.pop(request_id, None)
+        return response[0], response[1]
+
+    def queue_tick(self, plugin_name: str, dt: float) -> None:
+        """把一次持续性插件调用加入当前帧的批量请求"""
+        self._tick_batch.append((plugin_name, dt))
+
+    def flush_ticks(self) -> None:
+        """发送当前帧的批量请求
+
+        在渲染循环中调用，从不等待宿主进程: 上一批请求尚未完成时丢弃本帧的调用，
+        上一批请求超时(宿主卡死)或宿主进程已退出时在后台重启宿主，重启期间丢弃本帧的调用
+        """
+        batch = self._tick_batch
+        if not batch:
+            return
+        self._tick_batch = []
+        if self._tick_in_flight:
+            if time.monotonic() - self._tick_sent_at > self.tick_timeout:
+                print(f"插件宿主 {self.name} 执行持续性插件超过 {self.tick_timeout:g} 秒，正在重启")
+                self._tick_in_flight = False
+                self.start_in_background(kill=True)
+            return
+        if not self.is_alive():
+            self.start_in_background()
+            return
+        self._tick_in_flight = True
+        self._tick_sent_at = time.monotonic()
+        if self.send_request('tick', None, batch, self._on_tick) is None:
+            self._tick_in_flight = False
+
+    def _on_tick(self, ok: bool, result: Any) -> None:
+        """读取线程中处理批量请求的响应"""
+        self._tick_in_flight = False
+        if not ok:
+            print(f"插件宿主 {self.name} 执行持续性插件失败: {result}")
+            return
+        results = []
+        for plugin_name, plugin_ok, plugin_result in result:
+            if plugin_ok:
+                results.append((plugin_name, plugin_result))
+            else:
+                print(f"插件 {plugin_name} 在宿主 {self.name} 中执行出错: {plugin_result}")
+        if results:
+            self._tick_results.put(results)
+
+    def poll_tick_results(self) -> List[Tuple[str, Any]]:
+        """取出已完成的持续性插件调用结果
+
+        返回值:
+            List[Tuple[str, Any]]: [(plugin_name, result), ...]
+        """
+        results = []
+        while True:
+            try:
+                results.extend(self._tick_results.get_nowait())
+            except queue.Empty:
+                return results
+
+    def close(self) -> None:
+        """关闭宿主进程"""
+        self.disabled = True
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(1)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+    def _read_loop(self, process: subprocess.Popen) -> None:
+        """读取宿主进程的响应，直到宿主进程退出"""
+        while True:
+            try:
+                message = read_message(process.stdout)
+            except (OSError, ValueError, EOFError):
+                message = None
+            if message is None:
+                break
+
+            request_id, ok, result = message
+            # dict.pop 本身是原子的，这里不加锁，避免与正在发送请求的主线程争用锁而延迟响应
+            pending = self._pending.pop(request_id, None)
+            if pending is not None:
+                pending[1](ok, result)
+
+        # 宿主进程已退出，以失败结束发给该进程的所有请求
+        with self._lock:
+            failed = [request_id for request_id, (owner, _) in self._pending.items() if owner is process]
+            callbacks = [self._pending.pop(request_id)[1] for request_id in failed]
+        for callback in callbacks:
+            callback(False, "宿主进程已退出")
+
+
+class RemoteMenuPlugin(MenuPlugin):
+    """进程外菜单型插件代理
+
+    菜单函数在宿主进程中执行，插件收到的 parent 参数为None。
+    自定义菜单需要操作Qt对象，无法跨进程创建，因此始终使用配置文件中的菜单项
+
+    属性:
+        host (PluginHostClient): 插件所在的宿主
+    """
+
+    def __init__(self, plugin_info: Dict[str, Any], plugin_config: Dict[str, Any], host: PluginHostClient):
+        super().__init__(plugin_info, plugin_config)
+        self.host = host
+
+    def initialize(self) -> bool:
+        return self.host.register(self.plugin_info)
+
+    def cleanup(self) -> None:
+        self.host.unregister(self.plugin_info['plugin_name'])
+
+    def execute_function(self, function_name: str, params, parameter: Any) -> Any:
+        if function_name == 'create_custom_menu':
+            return False
+        # 菜单函数在宿主进程中执行，GUI线程不等待其结果
+        self.host.call_async(self.plugin_info['plugin_name'], function_name, parameter)
+        return None
+
+
+class RemoteInitPlugin(InitPlugin):
+    """进程外初始化型插件代理
+
+    初始化函数在宿主进程中执行，插件收到的 parent 参数为None，
+    因此需要修改桌宠窗口的插件(如 Immersive)不能在进程外运行。
+    调用只发送不等待，依赖它的插件不会等到宿主进程中的初始化完成
+
+    属性:
+        host (PluginHostClient): 插件所在的宿主
+    """
+
+    def __init__(self, plugin_info: Dict[str, Any], plugin_config: Dict[str, Any], host: PluginHostClient):
+        super().__init__(plugin_info, plugin_config)
+        self.host = host
+
+    def initialize(self) -> bool:
+        return self.host.register(self.plugin_info)
+
+    def cleanup(self) -> None:
+        self.host.unregister(self.plugin_info['plugin_name'])
+
+    def __getattr__(self, function_name: str):
+        if function_name.startswith('_'):
+            raise AttributeError(function_name)
+        return lambda parent=None: self.host.call_async(self.plugin_info['plugin_name'], function_name)
+
+    def on_init(self, parent=None) -> None:
+        self.host.call_async(self.plugin_info['plugin_name'], 'on_init')
+
+
+class RemoteLastingPlugin(LastingPlugin):
+    """进程外持续性插件代理
+
+    update 只把调用加入宿主的批量请求，由 PluginManager 在每帧末尾统一发送。
+    宿主进程中 update 的返回值会在之后的帧中交给 apply_result，
+    返回值为 [(方法名, 参数...), ...] 时依次调用模型的对应方法，例如 [("Drag", x, y)]
+
+    属性:
+        host (PluginHostClient): 插件所在的宿主
+    """
+
+    def __init__(self, plugin_info: Dict[str, Any], plugin_config: Dict[str, Any], host: PluginHostClient):
+        super().__init__(plugin_info, plugin_config)
+        self.host = host
+
+    def initialize(self) -> bool:
+        return self.host.register(self.plugin_info)
+
+    def cleanup(self) -> None:
+        self.host.unregister(self.plugin_info['plugin_name'])
+
+    def update(self, parent, dt: float = 0.0) -> None:
+        self.host.queue_tick(self.plugin_info['plugin_name'], dt)
+
+    def apply_result(self, parent, result: Any) -> None:
+        if not isinstance(result, (list, tuple)):
+            return
+        model = parent.live2d.model
+        for command in result:
+            getattr(model, command[0])(*command[1:])
+
+
+def main() -> None:
+    """宿主进程入口"""
+    # 协议独占原始标准输出，插件的打印输出重定向到标准错误
+    writer = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    PluginHostServer().serve(sys.stdin.buffer, writer)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,118 @@
+import ast
+import gc
 import importlib.util
 import inspect
 import os
-from typing import Any, Dict, List, Optional
+import queue
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 from .ConfigManager import ConfigManager
-from src.Plugin.PluginBase import PluginBase, MenuPlugin, LastingPlugin, InitPlugin
+from .EventBus import EventBus
+from .ManifestCache import ManifestCache
+from .PluginHost import PluginHostClient, RemoteMenuPlugin, RemoteLastingPlugin, RemoteInitPlugin
+from .PluginProfiler import PluginProfiler
+from .PluginSupervisor import CircuitBreaker, PluginSupervisor
+from src.Plugin.PluginBase import PluginBase, MenuPlugin, LastingPlugin, InitPlugin, EventPlugin
+
+# 插件模块在 sys.modules 中的名称前缀
+PLUGIN_MODULE_PREFIX = "deskpet_plugin"
+
+
+class LastingEntry:
+    """持续性插件调度项
+
+    保存已绑定的 update 方法以及按插件更新频率计算出的调度状态
+
+    属性:
+        plugin_name (str): 插件名称
+        update (Callable): 已绑定的 update 方法，调用形式为 update(parent, dt)
+        apply (Callable): 已绑定的 apply_result 方法，在GUI线程应用 update 的返回值
+        run_in_worker (bool): 是否在后台工作线程中执行 update
+        interval (float): 两次调用之间的最小间隔(秒)，为0时每帧调用
+        next_due (float): 下一次应调用的时间点
+        last_time (float): 上一次调用的时间点，为0时表示尚未调用
+        in_flight (bool): 后台任务是否尚未完成，完成前不会再次提交
+        breaker (Optional[CircuitBreaker]): 插件的熔断器
+    """
+
+    __slots__ = ('plugin_name', 'update', 'apply', 'run_in_worker', 'interval', 'next_due', 'last_time',
+                 'in_flight', 'breaker')
+
+    def __init__(self, plugin_name: str, update: Callable, apply: Callable, update_hz: Optional[float],
+                 run_in_worker: bool = False, breaker: Optional[CircuitBreaker] = None) -> None:
+        """初始化调度项
+
+        参数:
+            plugin_name (str): 插件名称
+            update (Callable): 已绑定的 update 方法
+            apply (Callable): 已绑定的 apply_result 方法
+            update_hz (Optional[float]): 期望的更新频率，为None或0时每帧调用
+            run_in_worker (bool): 是否在后台工作线程中执行 update
+            breaker (Optional[CircuitBreaker]): 插件的熔断器，为None时创建一个独立的熔断器
+        """
+        self.plugin_name = plugin_name
+        self.update = update
+        self.apply = apply
+        self.run_in_worker = run_in_worker
+        self.interval = 1.0 / update_hz if update_hz else 0.0
+        self.next_due = 0.0
+        self.last_time = 0.0
+        self.in_flight = False
+        self.breaker = breaker if breaker is not None else CircuitBreaker(plugin_name)
+
+
+class InitTask:
+    """初始化型插件的执行任务，同时记录执行过程用于生成启动时间线
+
+    属性:
+        plugin_name (str): 插件名称
+        function (Callable): 初始化函数
+        depends_on (Tuple[str, ...]): 必须先执行完成的插件
+        gui_thread (bool): 是否必须在GUI线程中执行
+        start (float): 相对启动时刻的开始时间(秒)
+        end (float): 相对启动时刻的结束时间(秒)
+        thread_name (str): 执行所在的线程名称
+        error (Optional[str]): 执行失败的原因，成功时为None
+    """
+
+    __slots__ = ('plugin_name', 'function', 'depends_on', 'gui_thread',
+                 'start', 'end', 'thread_name', 'error')
+
+    def __init__(self, plugin_name: str, function: Callable, depends_on, gui_thread: bool) -> None:
+        self.plugin_name = plugin_name
+        self.function = function
+        self.depends_on = tuple(depends_on)
+        self.gui_thread = gui_thread
+        self.start = 0.0
+        self.end = 0.0
+        self.thread_name = ""
+        self.error: Optional[str] = None
+
+    def run(self, parent, origin: float) -> None:
+        """执行初始化函数，依赖执行失败时跳过
+
+        参数:
+            parent: 父对象，通常是PetMain实例
+            origin (float): 启动时刻(time.perf_counter)
+        """
+        if self.error is not None:
+            print(f"插件 {self.plugin_name} 未执行: {self.error}")
+            return
+
+        self.thread_name = threading.current_thread().name
+        self.start = time.perf_counter() - origin
+        try:
+            self.function(parent)
+        except Exception as e:
+            self.error = str(e)
+            print(f"插件 {self.plugin_name} 初始化失败: {e}")
+        finally:
+            self.end = time.perf_counter() - origin
 
 
 class PluginManager:
@@ -17,22 +125,384 @@ class PluginManager:
         loaded_plugins (dict): 已加载的插件模块
         plugin_instances (dict): 已实例化的插件对象
         plugin_types (dict): 插件类型缓存，用于避免重复的类型检查
+        profiler (Optional[PluginProfiler]): 插件耗时分析器，为None时表示未启用
+        worker_count (int): 后台执行持续性插件的工作线程数
+        plugin_hosts (dict): 宿主名称 -> 进程外插件宿主客户端
+        manifest_cache (Optional[ManifestCache]): 插件清单持久化缓存，为None时每次都解析配置文件
+        supervisor (PluginSupervisor): 插件监督器，捕获插件异常并熔断反复出错或超时的插件
+        events (EventBus): 插件事件总线
+        applied_results (int): 持续性插件结果被应用的累计次数，渲染帧率调节器据此判断插件是否仍在请求新帧
+
+    插件按类型(menu/lasting/init)预先建立索引，索引中保存已绑定的可调用对象，
+    仅在插件列表或启用状态变化时重建，使每帧的持续性插件调度只需遍历一次索引
     """
-    
-    def __init__(self, plugins: List[Dict[str, Any]]):
+
+    # 卸载插件时等待其正在执行的后台任务结束的最长时间(秒)
+    UNLOAD_WAIT = 1.0
+
+    def __init__(self, plugins: List[Dict[str, Any]], worker_count: int = 2, result_queue_size: int = 64,
+                 manifest_cache: Optional[ManifestCache] = None, supervisor: Optional[PluginSupervisor] = None):
         """初始化插件管理器
         
         参数:
             plugins (List[Dict[str, Any]]): 插件配置列表
+            worker_count (int): 后台执行持续性插件的工作线程数
+            result_queue_size (int): 后台执行结果队列的容量，队列已满时丢弃新结果
+            manifest_cache (Optional[ManifestCache]): 插件清单持久化缓存
+            supervisor (Optional[PluginSupervisor]): 插件监督器，为None时使用默认设置
         """
-        self.plugins = plugins
+        self._plugins = plugins
+        # 上一次同步时已启用的插件名称
+        self._enabled_names = {plugin_info['plugin_name'] for plugin_info in plugins
+                               if plugin_info.get('enabled', True)}
         # 缓存已加载的插件模块
         self.loaded_plugins = {}
         # 缓存已实例化的插件对象
         self.plugin_instances = {}
         # 缓存插件类型，避免重复的类型检查
         self.plugin_types = {}
-        
+
+        # 按类型划分的插件索引
+        # 菜单型: 插件名 -> 已绑定的 execute_function，首次调用时填充
+        self._menu_index: Dict[str, Callable] = {}
+        # 持续性: 按配置顺序排列的调度项列表，每帧在GUI线程中调用的插件单独存放，不检查调度时间
+        self._frame_index: List[LastingEntry] = []
+        self._lasting_index: List[LastingEntry] = []
+        # 每帧调用的插件的 (update, apply_result)，正常情况下直接依次调用，共用同一个帧间隔
+        self._frame_calls: List[Tuple[Callable, Callable]] = []
+        # 上一次调用每帧插件的时间戳，为0时表示尚未调用
+        self._frame_time = 0.0
+        # 每帧插件的总耗时预算(秒)，重建索引时从监督器读取
+        self._frame_budget = float('inf')
+        # 为True时逐个插件计时并检查熔断状态，整体超出预算、插件出错或有插件未恢复时开启
+        self._watch_frame_plugins = False
+        # 初始化型: 已启用的初始化型插件信息列表
+        self._init_index: List[Dict[str, Any]] = []
+        # 索引是否需要重建
+        self._index_dirty = True
+
+        # 插件耗时分析器，默认关闭
+        self.profiler: Optional[PluginProfiler] = None
+
+        # 后台执行持续性插件的线程池，首次需要时创建
+        self.worker_count = worker_count
+        self._worker_pool: Optional[ThreadPoolExecutor] = None
+        # 后台执行结果队列，元素为 (插件名, 加载代数, apply_result, result)，由GUI线程取出并应用
+        self._worker_results: queue.Queue = queue.Queue(maxsize=result_queue_size)
+        # 插件名 -> 尚未完成的后台任务
+        self._worker_jobs: Dict[str, Future] = {}
+        # 插件名 -> 加载代数，每次卸载时递增，卸载前提交的后台任务的结果不再应用
+        self._plugin_generation: Dict[str, int] = {}
+
+        # 进程外插件宿主，按插件配置中的 host 名称分组
+        self.plugin_hosts: Dict[str, PluginHostClient] = {}
+
+        # 插件清单缓存
+        self.manifest_cache = manifest_cache
+
+        # 插件监督器
+        self.supervisor = supervisor if supervisor is not None else PluginSupervisor()
+
+        # 插件事件总线，事件回调的异常和耗时由插件监督器处理
+        self.events = EventBus(self.supervisor)
+
+        # 最近一次启动时初始化型插件的执行记录
+        self.init_timeline: List[InitTask] = []
+        # 最近一次启动时执行失败或未执行的初始化型插件: 插件名 -> 原因
+        self.init_failures: Dict[str, str] = {}
+
+        # 持续性插件结果被应用的累计次数
+        self.applied_results = 0
+
+        # 插件启用状态变化的监听器，调用形式为 listener(plugin_name, enabled)
+        self._lifecycle_listeners: List[Callable[[str, bool], None]] = []
+
+    def enable_profiler(self, capacity: int = 512) -> PluginProfiler:
+        """启用插件耗时分析
+
+        启用后索引中的可调用对象会被替换为记录耗时的包装函数
+
+        参数:
+            capacity (int): 每个插件保留的最近样本数
+        返回值:
+            PluginProfiler: 插件耗时分析器
+        """
+        if self.profiler is None:
+            self.profiler = PluginProfiler(capacity)
+            self.invalidate_index()
+        return self.profiler
+
+    def disable_profiler(self) -> None:
+        """关闭插件耗时分析，索引恢复为直接调用插件方法"""
+        if self.profiler is not None:
+            self.profiler = None
+            self.invalidate_index()
+
+    @property
+    def plugins(self) -> List[Dict[str, Any]]:
+        """插件配置列表"""
+        return self._plugins
+
+    @plugins.setter
+    def plugins(self, plugins: List[Dict[str, Any]]) -> None:
+        self._plugins = plugins
+        self.invalidate_index()
+
+    def invalidate_index(self) -> None:
+        """标记插件索引失效
+
+        在插件列表或插件启用状态发生变化后调用，索引会在下一次调度时重建
+        """
+        self._index_dirty = True
+
+    def rebuild_index(self) -> None:
+        """按插件类型重建调度索引
+
+        持续性插件在此处完成实例化和类型检查，类型不匹配的插件只提示一次，
+        事件型插件在此处实例化并订阅事件，菜单型插件保持按需加载，只有在首次执行时才实例化
+        """
+        frame_index = []
+        lasting_index = []
+        init_index = []
+
+        for plugin_info in self._plugins:
+            if not plugin_info.get('enabled', True):
+                continue
+
+            plugin_type = plugin_info.get('plugin_type')
+            if plugin_type == 'lasting':
+                plugin_instance = self.get_plugin_instance(plugin_info)
+                if not plugin_instance:
+                    continue
+                if not isinstance(plugin_instance, LastingPlugin):
+                    self.plugin_types[plugin_info['plugin_name']] = 'unknown'
+                    print(f"插件 {plugin_info['plugin_name']} 不是持续性插件，忽略执行")
+                    continue
+                entry = self._create_lasting_entry(plugin_info, plugin_instance)
+                if entry.interval or entry.run_in_worker:
+                    lasting_index.append(entry)
+                else:
+                    frame_index.append(entry)
+            elif plugin_type == 'init':
+                init_index.append(plugin_info)
+            elif plugin_type == 'event':
+                # 事件型插件在启用后立即实例化，以便订阅事件
+                self.get_plugin_instance(plugin_info)
+
+        self._menu_index = {}
+        self._set_frame_index(frame_index)
+        self._lasting_index = lasting_index
+        self._init_index = init_index
+        self._index_dirty = False
+
+    def _set_frame_index(self, frame_index: List[LastingEntry]) -> None:
+        """设置每帧调用的插件，调度项都是新建的，因此第一帧的间隔为0
+
+        参数:
+            frame_index (List[LastingEntry]): 每帧在GUI线程中调用的插件的调度项
+        """
+        self._frame_index = frame_index
+        self._frame_calls = [(entry.update, entry.apply) for entry in frame_index]
+        self._frame_time = 0.0
+        self._frame_budget = self.supervisor.budget or float('inf')
+        # 熔断器在重建索引后保留，仍有插件未恢复时继续逐个检查
+        self._watch_frame_plugins = any(not entry.breaker.healthy for entry in frame_index)
+
+    def _create_lasting_entry(self, plugin_info: Dict[str, Any], plugin_instance: LastingPlugin) -> LastingEntry:
+        """为持续性插件创建调度项
+
+        更新频率和执行方式优先读取插件配置中的 update_hz 和 run_in_worker，其次使用插件类的同名属性。
+        不接受 dt 参数的旧版 update 方法会被适配为 update(parent, dt) 的调用形式
+
+        参数:
+            plugin_info (Dict[str, Any]): 插件信息
+            plugin_instance (LastingPlugin): 插件实例
+        返回值:
+            LastingEntry: 调度项
+        """
+        plugin_name = plugin_info['plugin_name']
+        manifest = plugin_instance.plugin_config.get('plugin', {})
+        update_hz = manifest.get('update_hz', plugin_instance.update_hz)
+        run_in_worker = manifest.get('run_in_worker', plugin_instance.run_in_worker)
+
+        update = plugin_instance.update
+        if not self._accepts_delta_time(update):
+            update = lambda parent, dt, _update=update: _update(parent)
+        if self.profiler is not None:
+            update = self.profiler.wrap(plugin_name, 'update', update)
+
+        return LastingEntry(plugin_name, update, plugin_instance.apply_result, update_hz, run_in_worker,
+                            self.supervisor.get_breaker(plugin_name))
+
+    @staticmethod
+    def _accepts_delta_time(func: Callable) -> bool:
+        """检查 update 方法是否接受 dt 参数"""
+        try:
+            parameters = inspect.signature(func).parameters.values()
+        except (TypeError, ValueError):
+            return True
+
+        positional = 0
+        for parameter in parameters:
+            if parameter.kind == inspect.Parameter.VAR_POSITIONAL:
+                return True
+            if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
+                positional += 1
+        return positional >= 2
+
+    def add_lifecycle_listener(self, listener: Callable[[str, bool], None]) -> None:
+        """添加插件启用状态变化的监听器
+
+        插件被卸载前以 enabled=False 调用，插件被启用或重新加载后以 enabled=True 调用，
+        监听器应在此时拆除或重建与插件相关的界面元素(如托盘菜单项)
+
+        参数:
+            listener (Callable[[str, bool], None]): 监听器
+        """
+        self._lifecycle_listeners.append(listener)
+
+    def _notify_lifecycle(self, plugin_name: str, enabled: bool) -> None:
+        """通知所有监听器插件启用状态发生变化"""
+        for listener in self._lifecycle_listeners:
+            try:
+                listener(plugin_name, enabled)
+            except Exception as e:
+                print(f"插件 {plugin_name} 状态变化通知失败: {e}")
+
+    def find_plugin_info(self, plugin_name: str) -> Optional[Dict[str, Any]]:
+        """按插件名称查找插件信息
+
+        参数:
+            plugin_name (str): 插件名称
+        返回值:
+            Optional[Dict[str, Any]]: 插件信息，找不到则返回None
+        """
+        for plugin_info in self._plugins:
+            if plugin_info.get('plugin_name') == plugin_name:
+                return plugin_info
+        return None
+
+    def set_plugin_enabled(self, plugin_name: str, enabled: bool) -> None:
+        """在运行时启用或禁用插件
+
+        禁用时卸载插件并释放资源；启用时持续性插件在下一帧实例化，菜单型插件由监听器重建菜单，
+        初始化型插件会在下次启动时执行
+
+        参数:
+            plugin_name (str): 插件名称
+            enabled (bool): 是否启用
+        """
+        plugin_info = self.find_plugin_info(plugin_name)
+        if plugin_info is None:
+            return
+
+        plugin_info['enabled'] = enabled
+        self.sync_plugins()
+
+    def sync_plugins(self, plugins: Optional[List[Dict[str, Any]]] = None) -> None:
+        """按插件列表中的启用状态同步运行中的插件
+
+        与上一次同步时的启用状态比较，只卸载新禁用或被删除的插件、只启用新启用或新添加的插件，
+        插件列表被原地修改(如直接修改配置数据后保存)时也能正确同步
+
+        参数:
+            plugins (Optional[List[Dict[str, Any]]]): 新的插件列表，为None时使用当前插件列表
+        """
+        if plugins is not None:
+            self._plugins = plugins
+        enabled = {plugin_info['plugin_name'] for plugin_info in self._plugins if plugin_info.get('enabled', True)}
+
+        for plugin_name in self._enabled_names - enabled:
+            self.unload_plugin(plugin_name)
+        self.invalidate_index()
+        for plugin_name in enabled - self._enabled_names:
+            self._notify_lifecycle(plugin_name, True)
+        self._enabled_names = enabled
+
+    def reload_plugin(self, plugin_name: str) -> bool:
+        """重新加载插件
+
+        卸载插件后，如果插件处于启用状态，按启用插件的流程重新加载
+
+        参数:
+            plugin_name (str): 插件名称
+        返回值:
+            bool: 旧的插件对象是否已被完全释放
+        """
+        released = self.unload_plugin(plugin_name)
+        plugin_info = self.find_plugin_info(plugin_name)
+        if plugin_info is not None and plugin_info.get('enabled', True):
+            self._notify_lifecycle(plugin_name, True)
+        return released
+
+    def unload_plugin(self, plugin_name: str) -> bool:
+        """卸载插件
+
+        通知监听器拆除插件的界面元素，调用插件的 cleanup，
+        然后移除插件模块、实例及索引中的所有引用，并用弱引用检查它们是否已被回收
+
+        参数:
+            plugin_name (str): 插件名称
+        返回值:
+            bool: 插件模块和实例是否已被完全释放，插件未被加载时返回False
+        """
+        self._notify_lifecycle(plugin_name, False)
+
+        plugin_instance = self.plugin_instances.pop(plugin_name, None)
+        plugin_module = self.loaded_plugins.pop(plugin_name, None)
+        self.plugin_types.pop(plugin_name, None)
+        if sys.modules.get(self.plugin_module_name(plugin_name)) is plugin_module:
+            sys.modules.pop(self.plugin_module_name(plugin_name), None)
+
+        # 立即移除索引中的绑定方法，避免在下一次重建索引前仍然持有插件实例
+        self._menu_index.pop(plugin_name, None)
+        self._set_frame_index([entry for entry in self._frame_index if entry.plugin_name != plugin_name])
+        self._lasting_index = [entry for entry in self._lasting_index if entry.plugin_name != plugin_name]
+        self.invalidate_index()
+        # 之后才完成的后台任务的结果按加载代数丢弃；等待正在执行的任务结束，它持有插件实例
+        self._plugin_generation[plugin_name] = self._plugin_generation.get(plugin_name, 0) + 1
+        job = self._worker_jobs.pop(plugin_name, None)
+        if job is not None:
+            wait([job], timeout=self.UNLOAD_WAIT)
+        self._discard_worker_results(plugin_name)
+        self.supervisor.reset(plugin_name)
+        self.events.unsubscribe(plugin_name)
+
+        if plugin_instance is not None:
+            try:
+                plugin_instance.cleanup()
+            except Exception as e:
+                print(f"插件 {plugin_name} 清理失败: {e}")
+
+        if plugin_instance is None and plugin_module is None:
+            return False
+
+        references = [weakref.ref(obj) for obj in (plugin_instance, plugin_module) if obj is not None]
+        del plugin_instance, plugin_module
+        gc.collect()
+
+        leaked = [ref() for ref in references if ref() is not None]
+        if leaked and job is not None and not job.done():
+            print(f"插件 {plugin_name} 的后台任务仍在执行，插件将在任务结束后释放")
+            return False
+        if leaked:
+            print(f"插件 {plugin_name} 卸载后仍有对象未被释放: {[type(obj).__name__ for obj in leaked]}")
+            return False
+        return True
+
+    def _discard_worker_results(self, plugin_name: str) -> None:
+        """丢弃结果队列中属于指定插件、尚未应用的后台执行结果"""
+        kept = []
+        while True:
+            try:
+                item = self._worker_results.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] != plugin_name:
+                kept.append(item)
+        for item in kept:
+            self._worker_results.put_nowait(item)
+
     def load_plugin(self, plugin_info: Dict[str, Any]) -> Optional[Any]:
         """加载插件模块
         
@@ -49,12 +519,7 @@ class PluginManager:
             return self.loaded_plugins[plugin_name]
 
         try:
-            # 创建模块 spec
-            plugin_file_path = os.path.join(plugin_info['plugin_path'], f"{plugin_name}.py")
-            spec = importlib.util.spec_from_file_location("plugin", plugin_file_path)
-            plugin = importlib.util.module_from_spec(spec)
-            # 执行模块代码
-            spec.loader.exec_module(plugin)
+            plugin = self.import_plugin_module(plugin_info)
             # 缓存已加载的插件
             self.loaded_plugins[plugin_name] = plugin
             return plugin
@@ -63,22 +528,52 @@ class PluginManager:
             return None
     
     @staticmethod
-    def get_plugin_config(plugin_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """获取插件配置
+    def plugin_module_name(plugin_name: str) -> str:
+        """插件模块在 sys.modules 中的名称，每个插件唯一且在重新加载前后保持不变"""
+        return f"{PLUGIN_MODULE_PREFIX}.{plugin_name}"
+
+    @classmethod
+    def import_plugin_module(cls, plugin_info: Dict[str, Any]) -> Any:
+        """从插件目录执行插件模块代码，并以插件唯一的模块名注册到 sys.modules
+
+        每次调用都会重新执行模块代码，已注册的旧模块会被替换
+
+        参数:
+            plugin_info (Dict[str, Any]): 插件信息
+        返回值:
+            Any: 插件模块
+        异常:
+            Exception: 模块代码执行失败时抛出，此时模块不会被注册
+        """
+        plugin_name = plugin_info['plugin_name']
+        module_name = cls.plugin_module_name(plugin_name)
+        plugin_file_path = os.path.join(plugin_info['plugin_path'], f"{plugin_name}.py")
+        spec = importlib.util.spec_from_file_location(module_name, plugin_file_path)
+        plugin = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = plugin
+        try:
+            spec.loader.exec_module(plugin)
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
+        return plugin
+
+    def get_plugin_config(self, plugin_info: Dict[str, Any]) -> Optional[Mapping[str, Any]]:
+        """获取插件配置的只读视图
+
+        启用插件清单缓存时，配置文件未变化则直接返回缓存的配置；需要修改插件配置时通过 ConfigManager.shared 获取
         
         参数:
             plugin_info (Dict[str, Any]): 插件信息
             
         返回值:
-            Optional[Dict[str, Any]]: 插件配置，获取失败则返回None
+            Optional[Mapping[str, Any]]: 插件配置的只读视图，获取失败则返回None
         """
         try:
+            if self.manifest_cache is not None:
+                return self.manifest_cache.get_config(plugin_info['plugin_path'])
             config_path = os.path.join(plugin_info['plugin_path'], "config.toml")
-            plugin_config: Dict[str, Any] = ConfigManager(
-                config_path,
-                create_if_not_exists=False
-            ).config
-            return plugin_config
+            return ConfigManager.shared(config_path).view()
         except FileNotFoundError:
             print(f"{plugin_info['plugin_name']}配置文件未找到，请检查文件路径。")
             return None
@@ -101,33 +596,36 @@ class PluginManager:
         if plugin_name in self.plugin_instances:
             return self.plugin_instances[plugin_name]
         
-        # 加载插件模块
-        plugin_module = self.load_plugin(plugin_info)
-        if not plugin_module:
-            return None
-        
         # 获取插件配置
         plugin_config = self.get_plugin_config(plugin_info)
         if not plugin_config:
             return None
-        
-        # 查找插件类（继承自PluginBase的类）
-        plugin_class = None
-        for name, obj in inspect.getmembers(plugin_module):
-            if (inspect.isclass(obj)
-                    and issubclass(obj, PluginBase)
-                    and obj != PluginBase and obj != MenuPlugin
-                    and obj != LastingPlugin and obj != InitPlugin):
-                plugin_class = obj
-                break
-        
-        if not plugin_class:
-            print(f"插件 {plugin_name} 中找不到继承自PluginBase的类")
-            return None
+
+        # 声明了进程外运行的插件使用代理类，插件模块只在宿主进程中加载
+        if plugin_config.get('plugin', {}).get('out_of_process', False):
+            plugin_class = self._get_remote_class(plugin_info)
+            if not plugin_class:
+                print(f"插件 {plugin_name} 的类型不支持进程外运行")
+                return None
+        else:
+            # 加载插件模块
+            plugin_module = self.load_plugin(plugin_info)
+            if not plugin_module:
+                return None
+
+            # 查找插件类（继承自PluginBase的类）
+            plugin_class = self._find_plugin_class(plugin_info, plugin_module)
+            if not plugin_class:
+                print(f"插件 {plugin_name} 中找不到继承自PluginBase的类")
+                return None
         
         # 创建插件实例
         try:
-            plugin_instance = plugin_class(plugin_info, plugin_config)
+            if plugin_class in (RemoteMenuPlugin, RemoteLastingPlugin, RemoteInitPlugin):
+                host_name = plugin_config['plugin'].get('host', plugin_name)
+                plugin_instance = plugin_class(plugin_info, plugin_config, self.get_plugin_host(host_name))
+            else:
+                plugin_instance = plugin_class(plugin_info, plugin_config)
             # 初始化插件
             if plugin_instance.initialize():
                 # 缓存插件实例
@@ -139,8 +637,12 @@ class PluginManager:
                     self.plugin_types[plugin_name] = 'lasting'
                 elif isinstance(plugin_instance, InitPlugin):
                     self.plugin_types[plugin_name] = 'init'
+                elif isinstance(plugin_instance, EventPlugin):
+                    self.plugin_types[plugin_name] = 'event'
                 else:
                     self.plugin_types[plugin_name] = 'unknown'
+                # 订阅插件重写了的事件钩子
+                self.events.subscribe_plugin(plugin_name, plugin_instance)
                 return plugin_instance
             else:
                 print(f"插件 {plugin_name} 初始化失败")
@@ -149,6 +651,88 @@ class PluginManager:
             print(f"插件 {plugin_name} 实例化失败: {e}")
             return None
     
+    def _find_plugin_class(self, plugin_info: Dict[str, Any], plugin_module: Any) -> Optional[type]:
+        """查找插件模块中继承自PluginBase的类
+
+        插件清单缓存中有有效的类名时直接按类名获取，否则扫描模块并把结果写入缓存
+
+        参数:
+            plugin_info (Dict[str, Any]): 插件信息
+            plugin_module (Any): 插件模块
+        返回值:
+            Optional[type]: 插件类，找不到则返回None
+        """
+        plugin_path = plugin_info['plugin_path']
+        module_file = os.path.join(plugin_path, f"{plugin_info['plugin_name']}.py")
+
+        if self.manifest_cache is not None:
+            class_name = self.manifest_cache.get_class_name(plugin_path, module_file)
+            plugin_class = getattr(plugin_module, class_name, None) if class_name else None
+            if inspect.isclass(plugin_class) and issubclass(plugin_class, PluginBase):
+                return plugin_class
+
+        for name, obj in inspect.getmembers(plugin_module):
+            if (inspect.isclass(obj)
+                    and issubclass(obj, PluginBase)
+                    and obj != PluginBase and obj != MenuPlugin
+                    and obj != LastingPlugin and obj != InitPlugin and obj != EventPlugin):
+                if self.manifest_cache is not None:
+                    self.manifest_cache.set_class_name(plugin_path, module_file, name)
+                return obj
+        return None
+
+    def defines_custom_menu(self, plugin_info: Dict[str, Any]) -> bool:
+        """检查插件模块是否实现了 create_custom_menu，只解析源码不执行模块代码
+
+        参数:
+            plugin_info (Dict[str, Any]): 插件信息
+        返回值:
+            bool: 插件类中定义了 create_custom_menu 时返回True，无法解析的模块返回False
+        """
+        plugin_path = plugin_info['plugin_path']
+        module_file = os.path.join(plugin_path, f"{plugin_info['plugin_name']}.py")
+        if self.manifest_cache is not None:
+            custom_menu = self.manifest_cache.get_custom_menu(plugin_path, module_file)
+            if custom_menu is not None:
+                return custom_menu
+
+        try:
+            with open(module_file, "r", encoding="utf-8") as f:
+                tree = ast.parse(f.read(), module_file)
+        except (OSError, SyntaxError, ValueError):
+            return False
+        custom_menu = any(isinstance(node, ast.ClassDef)
+                          and any(isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                                  and item.name == 'create_custom_menu' for item in node.body)
+                          for node in ast.walk(tree))
+        if self.manifest_cache is not None:
+            self.manifest_cache.set_custom_menu(plugin_path, module_file, custom_menu)
+        return custom_menu
+
+    @staticmethod
+    def _get_remote_class(plugin_info: Dict[str, Any]) -> Optional[type]:
+        """根据插件类型获取进程外插件代理类"""
+        return {
+            'menu': RemoteMenuPlugin,
+            'lasting': RemoteLastingPlugin,
+            'init': RemoteInitPlugin,
+        }.get(plugin_info.get('plugin_type'))
+
+    def get_plugin_host(self, host_name: str) -> PluginHostClient:
+        """获取(或创建)进程外插件宿主
+
+        配置了相同 host 名称的插件共享同一个宿主进程，它们的每帧调用会合并为一条批量请求
+
+        参数:
+            host_name (str): 宿主名称
+        返回值:
+            PluginHostClient: 插件宿主客户端
+        """
+        host = self.plugin_hosts.get(host_name)
+        if host is None:
+            host = self.plugin_hosts[host_name] = PluginHostClient(host_name)
+        return host
+
     def execute_plugin_function(self, plugin_info: Dict[str, Any], function_name: str, params,  *args, **kwargs) -> Any:
         """执行插件函数
         
@@ -162,75 +746,388 @@ class PluginManager:
         """
         plugin_name = plugin_info['plugin_name']
         if plugin_info.get('plugin_type') == 'menu':
-            plugin_instance = self.get_plugin_instance(plugin_info)
-            if not plugin_instance:
-                return None
-            
-            # 使用缓存的类型信息避免重复的类型检查
-            if plugin_name in self.plugin_types and self.plugin_types[plugin_name] == 'menu':
-                return plugin_instance.execute_function(function_name, params, *args)
-            elif isinstance(plugin_instance, MenuPlugin):
-                # 如果缓存中没有类型信息，则进行检查并缓存
-                self.plugin_types[plugin_name] = 'menu'
-                return plugin_instance.execute_function(function_name, params,  *args)
-            else:
-                self.plugin_types[plugin_name] = 'unknown'
-                print(f"插件 {plugin_name} 不是菜单型插件")
-                return None
+            if self._index_dirty:
+                self.rebuild_index()
+
+            execute_function = self._menu_index.get(plugin_name)
+            if execute_function is None:
+                plugin_instance = self.get_plugin_instance(plugin_info)
+                if not plugin_instance:
+                    return None
+
+                if not isinstance(plugin_instance, MenuPlugin):
+                    self.plugin_types[plugin_name] = 'unknown'
+                    print(f"插件 {plugin_name} 不是菜单型插件")
+                    return None
 
-    def execute_lasting_plugins(self, parent):
+                # 缓存已绑定的执行函数，后续调用无需再次查找实例和检查类型
+                execute_function = plugin_instance.execute_function
+                if self.profiler is not None:
+                    execute_function = self.profiler.wrap(plugin_name, 'menu', execute_function)
+                self._menu_index[plugin_name] = execute_function
+
+            # 菜单函数可能打开对话框，只捕获异常不检查耗时
+            return self.supervisor.call(plugin_name, execute_function, function_name, params, *args, budget=0)
+
+    def execute_lasting_plugins(self, parent, now: Optional[float] = None):
         """执行持续性插件
+
+        每帧调用的插件直接依次调用，正常情况下只测量总耗时；设置了更新频率或在后台执行的插件只调用已到期的，
+        均传入距该插件上一次调用的真实间隔
         
         参数:
             parent: 父对象，通常是PetMain实例
+            now (Optional[float]): 本帧的时间戳(time.perf_counter)，为None时读取当前时间；
+                传入渲染循环测得的帧时间戳时，插件的间隔与模型使用的帧间隔一致
+        """
+        if self._index_dirty:
+            self.rebuild_index()
+
+        perf_counter = time.perf_counter
+        if now is None:
+            now = start = perf_counter()
+        else:
+            start = None
+        calls = self._frame_calls
+        if calls and not self._watch_frame_plugins:
+            # 正常情况: 依次调用，只测量全部插件的总耗时
+            last = self._frame_time
+            dt = now - last if last else 0.0
+            self._frame_time = now
+            if start is None:
+                start = perf_counter()
+            try:
+                for update, apply in calls:
+                    result = update(parent, dt)
+                    if result is not None:
+                        apply(parent, result)
+                        self.applied_results += 1
+            except Exception as e:
+                # 出错的插件就是循环变量当前指向的插件
+                self._on_frame_call_failed(parent, now, last, update, e)
+            else:
+                if perf_counter() - start > self._frame_budget:
+                    # 总耗时超出预算，之后的帧逐个插件计时，找出超时的插件
+                    for entry in self._frame_index:
+                        entry.last_time = now
+                    self._watch_frame_plugins = True
+        elif calls:
+            self._watch_frame_plugins = not self._run_watched(parent, now, self._frame_index)
+            self._frame_time = now
+        if self._lasting_index:
+            self._run_watched(parent, now, self._lasting_index)
+
+        # 发送本帧合并的进程外插件调用
+        if self.plugin_hosts:
+            for host in self.plugin_hosts.values():
+                host.flush_ticks()
+
+    def _on_frame_call_failed(self, parent, now: float, last: float, update: Callable, error: Exception) -> None:
+        """每帧插件出错时记录失败，本帧尚未调用的插件逐个调用，之后的帧逐个插件检查直到全部恢复
+
+        参数:
+            parent: 父对象，通常是PetMain实例
+            now (float): 本帧的时间戳
+            last (float): 上一帧的时间戳
+            update (Callable): 出错插件的 update
+            error (Exception): 插件抛出的异常
         """
-        for plugin_info in self.plugins:
-            plugin_name = plugin_info['plugin_name']
-            if not plugin_info.get('enabled', True) or plugin_info.get('plugin_type') != 'lasting':
+        entries = self._frame_index
+        position = next(i for i, call in enumerate(self._frame_calls) if call[0] is update)
+        for i, entry in enumerate(entries):
+            entry.last_time = now if i <= position else last
+        self.supervisor.record_failure(entries[position].breaker, error)
+        self._watch_frame_plugins = True
+        self._run_watched(parent, now, entries[position + 1:])
+
+    def _run_watched(self, parent, now: float, entries: List[LastingEntry]) -> bool:
+        """逐个调用已到期的插件，测量每个插件的耗时并检查熔断状态
+
+        参数:
+            parent: 父对象，通常是PetMain实例
+            now (float): 本帧的时间戳
+            entries (List[LastingEntry]): 调度项
+        返回值:
+            bool: 是否全部正常，即没有插件被跳过、出错或超时，总耗时也没有超出预算
+        """
+        perf_counter = time.perf_counter
+        supervisor = self.supervisor
+        budget = supervisor.budget or float('inf')
+        clean = True
+        start = mark = perf_counter()
+        for entry in entries:
+            # 未到期或上一次后台任务尚未完成时跳过，渲染循环从不等待插件
+            if now < entry.next_due or entry.in_flight:
                 continue
-                
-            # 获取插件实例
-            plugin_instance = self.get_plugin_instance(plugin_info)
-            if not plugin_instance:
+            # 熔断中的插件跳过
+            breaker = entry.breaker
+            if not breaker.healthy and not breaker.allow(now):
+                clean = False
                 continue
-                
-            # 使用缓存的类型信息避免重复的类型检查
-            if plugin_name in self.plugin_types and self.plugin_types[plugin_name] == 'lasting':
-                plugin_instance.update(parent)
-            elif isinstance(plugin_instance, LastingPlugin):
-                # 如果缓存中没有类型信息，则进行检查并缓存
-                self.plugin_types[plugin_name] = 'lasting'
-                plugin_instance.update(parent)
+
+            # 传入距上一次调用的真实间隔，首次调用时为0
+            dt = now - entry.last_time if entry.last_time else 0.0
+            entry.last_time = now
+            # 保持调度相位，落后超过一个周期时从当前时间重新计时
+            entry.next_due += entry.interval
+            if entry.next_due <= now:
+                entry.next_due = now + entry.interval
+
+            if entry.run_in_worker:
+                entry.in_flight = True
+                self._submit_worker(entry, parent, dt)
+                mark = perf_counter()
             else:
-                self.plugin_types[plugin_name] = 'unknown'
-                print(f"插件 {plugin_name} 不是持续性插件，忽略执行")
+                try:
+                    result = entry.update(parent, dt)
+                    if result is not None:
+                        entry.apply(parent, result)
+                        self.applied_results += 1
+                except Exception as e:
+                    supervisor.record_failure(breaker, e)
+                    clean = False
+                    mark = perf_counter()
+                    continue
+                # 相邻插件共用时间戳，每个插件只读取一次时钟；
+                # 只有超出预算或需要恢复熔断状态时才调用监督器
+                end = perf_counter()
+                duration = end - mark
+                mark = end
+                if duration > budget or not breaker.healthy:
+                    supervisor.record(breaker, duration)
+                    clean = clean and breaker.healthy and duration <= budget
+        return clean and mark - start <= budget
+
+    def _submit_worker(self, entry: LastingEntry, parent, dt: float) -> None:
+        """将持续性插件的 update 提交到后台线程池执行
+
+        参数:
+            entry (LastingEntry): 调度项
+            parent: 父对象，通常是PetMain实例
+            dt (float): 距上一次调用的真实间隔(秒)
+        """
+        if self._worker_pool is None:
+            self._worker_pool = ThreadPoolExecutor(max_workers=self.worker_count,
+                                                   thread_name_prefix="PluginWorker")
+        generation = self._plugin_generation.get(entry.plugin_name, 0)
+        self._worker_jobs[entry.plugin_name] = self._worker_pool.submit(self._run_worker, entry, parent, dt,
+                                                                        generation)
+
+    def _run_worker(self, entry: LastingEntry, parent, dt: float, generation: int) -> None:
+        """在后台线程中执行 update，并把结果放入结果队列
+
+        参数:
+            entry (LastingEntry): 调度项
+            parent: 父对象，通常是PetMain实例
+            dt (float): 距上一次调用的真实间隔(秒)
+            generation (int): 提交任务时插件的加载代数
+        """
+        try:
+            result = entry.update(parent, dt)
+            # 后台执行不占用帧时间，只记录成功以便从熔断中恢复
+            self.supervisor.record(entry.breaker, 0.0, 0)
+            if result is not None:
+                # 队列已满时直接丢弃，不阻塞工作线程
+                self._worker_results.put_nowait((entry.plugin_name, generation, entry.apply, result))
+        except queue.Full:
+            pass
+        except Exception as e:
+            self.supervisor.record_failure(entry.breaker, e)
+        finally:
+            entry.in_flight = False
+
+    def apply_worker_results(self, parent) -> None:
+        """在GUI线程中应用后台执行的持续性插件结果
+
+        应在每帧模型更新之前调用，插件对Qt对象和模型的修改都在这里完成，
+        进程外持续性插件返回的结果也在这里应用
+
+        参数:
+            parent: 父对象，通常是PetMain实例
+        """
+        results = self._worker_results
+        while True:
+            try:
+                plugin_name, generation, apply, result = results.get_nowait()
+            except queue.Empty:
+                break
+            # 插件在任务执行期间被卸载或重新加载，结果属于旧的实例
+            if generation != self._plugin_generation.get(plugin_name, 0):
+                continue
+            self.supervisor.call(plugin_name, apply, parent, result)
+            self.applied_results += 1
+
+        # 应用进程外插件返回的结果
+        if self.plugin_hosts:
+            for host in self.plugin_hosts.values():
+                for plugin_name, result in host.poll_tick_results():
+                    plugin_instance = self.plugin_instances.get(plugin_name)
+                    if plugin_instance is not None:
+                        self.supervisor.call(plugin_name, plugin_instance.apply_result, parent, result)
+                        self.applied_results += 1
+
+    def shutdown(self) -> None:
+        """停止后台线程池和进程外插件宿主，丢弃尚未开始的任务，并保存插件清单缓存"""
+        if self.manifest_cache is not None:
+            self.manifest_cache.save()
+        if self._worker_pool is not None:
+            self._worker_pool.shutdown(wait=False, cancel_futures=True)
+            self._worker_pool = None
+        for host in self.plugin_hosts.values():
+            host.close()
     
-    def execute_init_plugins(self, parent):
+    def execute_init_plugins(self, parent, max_workers: int = 4) -> Dict[str, str]:
         """执行初始化型插件
-        
-        在应用程序启动时调用，用于执行初始化型插件
+
+        在应用程序启动时调用。插件按 depends_on 声明的依赖关系拓扑排序执行，
+        gui_thread 为 false 的插件在线程池中并行执行，其余插件在GUI线程中执行，
+        依赖执行失败的插件会被跳过。单个插件抛出的异常不会中断启动，
+        执行失败或未执行的插件及原因记录在 init_failures 中，由调用方提示用户。
+        执行过程记录在 init_timeline 中，启用耗时分析时打印启动时间线
 
         参数:
             parent: 父对象，通常是PetMain实例
+            max_workers (int): 并行执行的最大线程数
+        返回值:
+            Dict[str, str]: 执行失败或未执行的插件名 -> 原因
         """
-        for plugin_info in self.plugins:
-            plugin_name = plugin_info['plugin_name']
-            if not plugin_info.get('enabled', True) or plugin_info.get('plugin_type') != 'init':
-                continue
-                
-            # 获取插件实例
-            plugin_instance = self.get_plugin_instance(plugin_info)
-            if not plugin_instance:
-                continue
-                
-            # 使用缓存的类型信息避免重复的类型检查
-            function_name = plugin_info.get('function_name', 'on_init')
-            if plugin_name in self.plugin_types and self.plugin_types[plugin_name] == 'init':
-                getattr(plugin_instance, function_name)(parent)
-            elif isinstance(plugin_instance, InitPlugin):
-                # 如果缓存中没有类型信息，则进行检查并缓存
-                self.plugin_types[plugin_name] = 'init'
-                getattr(plugin_instance, function_name)(parent)
-            else:
-                self.plugin_types[plugin_name] = 'unknown'
-                print(f"插件 {plugin_name} 不是初始化型插件，忽略执行")
+        if self._index_dirty:
+            self.rebuild_index()
+
+        self.init_failures = {}
+        tasks = {}
+        for plugin_info in self._init_index:
+            task = self._create_init_task(plugin_info)
+            if task is not None:
+                tasks[task.plugin_name] = task
+
+        # 依赖关系: 插件 -> 尚未完成的依赖数，依赖 -> 依赖它的插件
+        remaining = {}
+        dependents = {name: [] for name in tasks}
+        for name, task in tasks.items():
+            depends_on = []
+            for dependency in task.depends_on:
+                if dependency in tasks:
+                    depends_on.append(dependency)
+                    dependents[dependency].append(name)
+                else:
+                    print(f"插件 {name} 依赖的初始化型插件 {dependency} 不存在或未启用，忽略该依赖")
+            remaining[name] = len(depends_on)
+
+        ready = [name for name, count in remaining.items() if count == 0]
+        futures = {}
+        start = time.perf_counter()
+        pool = None
+        try:
+            while ready or futures:
+                # 先提交可以并行执行的插件，再在GUI线程中执行其余插件
+                gui_ready = []
+                for name in ready:
+                    task = tasks[name]
+                    if task.gui_thread:
+                        gui_ready.append(name)
+                    else:
+                        if pool is None:
+                            pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PluginInit")
+                        futures[pool.submit(task.run, parent, start)] = name
+                ready = []
+
+                finished = []
+                for name in gui_ready:
+                    tasks[name].run(parent, start)
+                    finished.append(name)
+                if not finished and futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    finished.extend(futures.pop(future) for future in done)
+                else:
+                    finished.extend(futures.pop(future) for future in [f for f in futures if f.done()])
+
+                for name in finished:
+                    for dependent in dependents[name]:
+                        if tasks[name].error is not None:
+                            tasks[dependent].error = f"依赖的插件 {name} 执行失败"
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0:
+                            ready.append(dependent)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+        # 存在循环依赖的插件不会被执行
+        for name, count in remaining.items():
+            if count > 0:
+                print(f"插件 {name} 存在循环依赖，忽略执行")
+                tasks[name].error = "存在循环依赖"
+
+        self.init_failures.update((name, task.error) for name, task in tasks.items() if task.error is not None)
+        self.init_timeline = [task for task in tasks.values() if task.end]
+        if self.profiler is not None:
+            print(self.format_init_timeline())
+        return self.init_failures
+
+    def _create_init_task(self, plugin_info: Dict[str, Any]) -> Optional["InitTask"]:
+        """为初始化型插件创建执行任务
+
+        依赖关系和执行线程优先读取插件配置中的 depends_on 和 gui_thread，其次使用插件类的同名属性；
+        初始化函数名依次取主配置插件列表中的 function_name、插件配置 [plugin] 中的 function_name，默认为 on_init
+
+        参数:
+            plugin_info (Dict[str, Any]): 插件信息
+        返回值:
+            Optional[InitTask]: 执行任务，插件加载失败、类型不匹配或找不到初始化函数时返回None
+        """
+        plugin_name = plugin_info['plugin_name']
+
+        # 获取插件实例
+        plugin_instance = self.get_plugin_instance(plugin_info)
+        if not plugin_instance:
+            self.init_failures[plugin_name] = "插件加载失败"
+            return None
+
+        if not isinstance(plugin_instance, InitPlugin):
+            self.plugin_types[plugin_name] = 'unknown'
+            print(f"插件 {plugin_name} 不是初始化型插件，忽略执行")
+            return None
+
+        manifest = plugin_instance.plugin_config.get('plugin', {})
+        function_name = plugin_info.get('function_name', manifest.get('function_name', 'on_init'))
+        init_function = getattr(plugin_instance, function_name, None)
+        if not callable(init_function):
+            print(f"插件 {plugin_name} 中找不到初始化函数 {function_name}，忽略执行")
+            self.init_failures[plugin_name] = f"找不到初始化函数 {function_name}"
+            return None
+        if self.profiler is not None:
+            init_function = self.profiler.wrap(plugin_name, 'init', init_function)
+
+        return InitTask(plugin_name, init_function,
+                        manifest.get('depends_on', plugin_instance.depends_on),
+                        manifest.get('gui_thread', plugin_instance.gui_thread))
+
+    def format_init_timeline(self, width: int = 40) -> str:
+        """把最近一次启动的初始化型插件执行过程格式化为文本时间线
+
+        参数:
+            width (int): 时间轴的字符宽度
+        返回值:
+            str: 时间线文本，末尾给出总耗时、各插件耗时之和及并行度
+        """
+        timeline = sorted(self.init_timeline, key=lambda task: task.start)
+        if not timeline:
+            return "没有执行初始化型插件"
+
+        total = max(task.end for task in timeline)
+        busy = sum(task.end - task.start for task in timeline)
+        scale = width / total if total > 0 else 0
+        name_width = max(len(task.plugin_name) for task in timeline)
+        lines = ["初始化型插件启动时间线:"]
+        for task in timeline:
+            begin = int(task.start * scale)
+            length = max(int(task.end * scale) - begin, 1)
+            bar = " " * begin + "#" * length
+            status = "" if task.error is None else f" 失败: {task.error}"
+            lines.append(f"  {task.plugin_name:<{name_width}} |{bar:<{width}}| "
+                         f"{task.start * 1000:8.1f}ms +{(task.end - task.start) * 1000:7.1f}ms "
+                         f"{task.thread_name}{status}")
+        lines.append(f"  总耗时 {total * 1000:.1f}ms，插件耗时之和 {busy * 1000:.1f}ms，"
+                     f"并行度 {busy / total if total > 0 else 1:.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,132 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class RingBuffer:
+    """定长环形缓冲区，写满后覆盖最旧的数据
+
+    属性:
+        capacity (int): 缓冲区容量
+        count (int): 累计写入次数
+    """
+
+    __slots__ = ('capacity', 'count', '_data', '_index')
+
+    def __init__(self, capacity: int) -> None:
+        """初始化环形缓冲区
+
+        参数:
+            capacity (int): 缓冲区容量
+        """
+        self.capacity = capacity
+        self.count = 0
+        self._data = [0.0] * capacity
+        self._index = 0
+
+    def append(self, value: float) -> None:
+        """写入一个数据，缓冲区已满时覆盖最旧的数据"""
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        self.count += 1
+
+    def values(self) -> List[float]:
+        """返回缓冲区中的有效数据(不保证顺序)"""
+        if self.count >= self.capacity:
+            return list(self._data)
+        return self._data[:self._index]
+
+
+class PluginProfiler:
+    """插件耗时分析器
+
+    使用单调时钟记录每个插件每次调用的耗时，数据保存在定长环形缓冲区中，
+    可以查询每个插件的 p50/p95/p99/max 耗时。
+    分析器只在启用时才会包装插件的可调用对象，关闭时不产生任何额外开销
+
+    属性:
+        capacity (int): 每个插件保留的最近样本数
+        buffers (dict): (插件名, 调用类型) -> 耗时环形缓冲区(单位: 秒)
+    """
+
+    def __init__(self, capacity: int = 512) -> None:
+        """初始化插件耗时分析器
+
+        参数:
+            capacity (int): 每个插件保留的最近样本数
+        """
+        self.capacity = capacity
+        self.buffers: Dict[Tuple[str, str], RingBuffer] = {}
+
+    def get_buffer(self, plugin_name: str, kind: str) -> RingBuffer:
+        """获取(或创建)插件对应的环形缓冲区
+
+        参数:
+            plugin_name (str): 插件名称
+            kind (str): 调用类型，如 update/init/menu
+        返回值:
+            RingBuffer: 耗时环形缓冲区
+        """
+        key = (plugin_name, kind)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = RingBuffer(self.capacity)
+        return buffer
+
+    def wrap(self, plugin_name: str, kind: str, func: Callable) -> Callable:
+        """包装插件的可调用对象，使每次调用的耗时被记录下来
+
+        参数:
+            plugin_name (str): 插件名称
+            kind (str): 调用类型，如 update/init/menu
+            func (Callable): 被包装的可调用对象
+        返回值:
+            Callable: 记录耗时的可调用对象
+        """
+        append = self.get_buffer(plugin_name, kind).append
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                append(perf_counter() - start)
+
+        return timed
+
+    def stats(self, plugin_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """查询插件耗时统计
+
+        参数:
+            plugin_name (Optional[str]): 插件名称，为None时返回所有插件的统计
+        返回值:
+            List[Dict[str, Any]]: 统计结果列表，耗时单位为毫秒，每项包含
+                plugin_name, kind, count, p50, p95, p99, max
+        """
+        result = []
+        for (name, kind), buffer in self.buffers.items():
+            if plugin_name is not None and name != plugin_name:
+                continue
+            samples = sorted(buffer.values())
+            if not samples:
+                continue
+            result.append({
+                'plugin_name': name,
+                'kind': kind,
+                'count': buffer.count,
+                'p50': self._percentile(samples, 50) * 1000,
+                'p95': self._percentile(samples, 95) * 1000,
+                'p99': self._percentile(samples, 99) * 1000,
+                'max': samples[-1] * 1000,
+            })
+        return result
+
+    def reset(self) -> None:
+        """清空所有已记录的数据"""
+        self.buffers.clear()
+
+    @staticmethod
+    def _percentile(samples: List[float], percent: float) -> float:
+        """计算已排序样本的百分位数(最近秩法)"""
+        rank = max(int(len(samples) * percent / 100 + 0.5) - 1, 0)
+        return samples[min(rank, len(samples) - 1)]
@@ -0,0 +1,185 @@
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class CircuitBreaker:
+    """单个插件的熔断器
+
+    插件连续失败或连续超出耗时预算达到阈值后熔断，熔断期间插件不会被调用；
+    熔断时间到期后进入半开状态放行一次调用，成功则恢复，失败则再次熔断并把熔断时间加倍
+
+    属性:
+        plugin_name (str): 插件名称
+        state (str): 状态，closed/open/half_open
+        strikes (int): 连续失败或超时的次数
+        trips (int): 连续熔断的次数，决定下一次熔断时间
+        retry_at (float): 熔断结束的时刻(time.perf_counter)
+        failures (int): 累计失败次数
+        slow_calls (int): 累计超出耗时预算的次数
+        last_error (Optional[str]): 最近一次失败的原因
+        healthy (bool): 是否处于正常状态(未熔断且没有连续失败)，调度循环只检查这一个属性
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    __slots__ = ('plugin_name', 'state', 'strikes', 'trips', 'retry_at',
+                 'failures', 'slow_calls', 'last_error', 'healthy')
+
+    def __init__(self, plugin_name: str) -> None:
+        self.plugin_name = plugin_name
+        self.state = self.CLOSED
+        self.strikes = 0
+        self.trips = 0
+        self.retry_at = 0.0
+        self.failures = 0
+        self.slow_calls = 0
+        self.last_error: Optional[str] = None
+        self.healthy = True
+
+    def allow(self, now: float) -> bool:
+        """检查插件当前是否可以被调用，熔断到期时转为半开状态"""
+        if self.state != self.OPEN:
+            return True
+        if now < self.retry_at:
+            return False
+        self.state = self.HALF_OPEN
+        return True
+
+
+class PluginSupervisor:
+    """插件监督器
+
+    捕获插件调用中的异常并测量调用耗时，连续失败或连续超出耗时预算的插件会被熔断，
+    熔断时间按指数退避增长，避免一个有问题的插件持续拖慢渲染或刷屏输出错误
+
+    属性:
+        budget (float): 单次调用的耗时预算(秒)，为0时不检查耗时
+        failure_threshold (int): 触发熔断的连续失败或超时次数
+        backoff (float): 第一次熔断的时间(秒)
+        max_backoff (float): 最长熔断时间(秒)
+        breakers (dict): 插件名称 -> 熔断器
+    """
+
+    def __init__(self, budget_ms: float = 8.0, failure_threshold: int = 3,
+                 backoff: float = 1.0, max_backoff: float = 60.0) -> None:
+        """初始化插件监督器
+
+        参数:
+            budget_ms (float): 单次调用的耗时预算(毫秒)，为0时不检查耗时
+            failure_threshold (int): 触发熔断的连续失败或超时次数
+            backoff (float): 第一次熔断的时间(秒)
+            max_backoff (float): 最长熔断时间(秒)
+        """
+        self.budget = budget_ms / 1000
+        self.failure_threshold = failure_threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get_breaker(self, plugin_name: str) -> CircuitBreaker:
+        """获取(或创建)插件对应的熔断器"""
+        breaker = self.breakers.get(plugin_name)
+        if breaker is None:
+            breaker = self.breakers[plugin_name] = CircuitBreaker(plugin_name)
+        return breaker
+
+    def record(self, breaker: CircuitBreaker, duration: float, budget: Optional[float] = None) -> None:
+        """记录一次成功的调用
+
+        参数:
+            breaker (CircuitBreaker): 熔断器
+            duration (float): 调用耗时(秒)
+            budget (Optional[float]): 本次调用的耗时预算(秒)，为None时使用默认预算
+        """
+        budget = self.budget if budget is None else budget
+        if budget and duration > budget:
+            breaker.slow_calls += 1
+            self._strike(breaker, f"耗时 {duration * 1000:.1f}ms 超出预算 {budget * 1000:.1f}ms")
+            return
+
+        if breaker.state == CircuitBreaker.HALF_OPEN:
+            print(f"插件 {breaker.plugin_name} 已恢复正常")
+            breaker.trips = 0
+        breaker.state = CircuitBreaker.CLOSED
+        breaker.strikes = 0
+        breaker.healthy = True
+
+    def record_failure(self, breaker: CircuitBreaker, error: BaseException) -> None:
+        """记录一次失败的调用，只在第一次失败和熔断时输出错误，不会每帧刷屏
+
+        参数:
+            breaker (CircuitBreaker): 熔断器
+            error (BaseException): 插件抛出的异常
+        """
+        breaker.failures += 1
+        if breaker.strikes == 0 and breaker.state == CircuitBreaker.CLOSED:
+            print(f"插件 {breaker.plugin_name} 执行出错: {error}")
+        self._strike(breaker, f"{type(error).__name__}: {error}")
+
+    def _strike(self, breaker: CircuitBreaker, reason: str) -> None:
+        """累计一次失败或超时，达到阈值或处于半开状态时熔断"""
+        breaker.last_error = reason
+        breaker.strikes += 1
+        breaker.healthy = False
+        if breaker.state == CircuitBreaker.HALF_OPEN or breaker.strikes >= self.failure_threshold:
+            delay = min(self.backoff * 2 ** breaker.trips, self.max_backoff)
+            breaker.state = CircuitBreaker.OPEN
+            breaker.retry_at = time.perf_counter() + delay
+            breaker.trips += 1
+            breaker.strikes = 0
+            print(f"插件 {breaker.plugin_name} 已熔断 {delay:g} 秒: {reason}")
+
+    def call(self, plugin_name: str, func: Callable, *args, budget: Optional[float] = None, **kwargs) -> Any:
+        """在监督下调用插件函数
+
+        参数:
+            plugin_name (str): 插件名称
+            func (Callable): 插件函数
+            *args, **kwargs: 传递给函数的参数
+            budget (Optional[float]): 本次调用的耗时预算(秒)，为None时使用默认预算，为0时不检查耗时
+        返回值:
+            Any: 函数执行结果，插件被熔断或执行出错时返回None
+        """
+        breaker = self.get_breaker(plugin_name)
+        start = time.perf_counter()
+        if not breaker.allow(start):
+            return None
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(breaker, e)
+            return None
+        self.record(breaker, time.perf_counter() - start, budget)
+        return result
+
+    def reset(self, plugin_name: Optional[str] = None) -> None:
+        """清除插件的熔断状态
+
+        参数:
+            plugin_name (Optional[str]): 插件名称，为None时清除所有插件
+        """
+        # 调度项中保存着熔断器的引用，因此原地重置而不是删除
+        for name, breaker in self.breakers.items():
+            if plugin_name is None or name == plugin_name:
+                breaker.__init__(name)
+
+    def is_healthy(self, plugin_name: str) -> bool:
+        """插件是否处于正常状态(未熔断且没有连续失败)"""
+        breaker = self.breakers.get(plugin_name)
+        return breaker is None or breaker.healthy
+
+    def describe(self, plugin_name: str) -> str:
+        """返回插件运行状态的描述文本，用于在界面中展示"""
+        breaker = self.breakers.get(plugin_name)
+        if self.is_healthy(plugin_name):
+            if breaker is not None and breaker.failures:
+                return f"正常 (累计失败 {breaker.failures} 次)"
+            return "正常"
+        if breaker.state == CircuitBreaker.OPEN:
+            remaining = max(breaker.retry_at - time.perf_counter(), 0)
+            return f"已熔断，{remaining:.0f} 秒后重试: {breaker.last_error}"
+        if breaker.state == CircuitBreaker.HALF_OPEN:
+            return f"正在重试: {breaker.last_error}"
+        return f"异常 {breaker.strikes}/{self.failure_threshold}: {breaker.last_error}"
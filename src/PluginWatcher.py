@@ -0,0 +1,134 @@
+import os
+from typing import Dict, Set, Tuple
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer
+
+
+class PluginWatcher(QObject):
+    """插件源码热重载
+
+    使用 QFileSystemWatcher 监视每个插件目录及其中的 .py/.toml 文件，
+    文件变化后等待一段时间合并连续的修改，然后只重新加载内容确实发生变化的插件，
+    其它插件和 Live2D 模型不受影响
+
+    属性:
+        plugin_manager (PluginManager): 插件管理器
+        debounce_ms (int): 合并连续修改的等待时间(毫秒)
+    """
+
+    # 被监视的插件文件扩展名
+    WATCHED_EXTENSIONS = ('.py', '.toml')
+
+    def __init__(self, plugin_manager, debounce_ms: int = 300, parent=None) -> None:
+        """初始化插件热重载
+
+        参数:
+            plugin_manager (PluginManager): 插件管理器
+            debounce_ms (int): 合并连续修改的等待时间(毫秒)
+            parent (QObject): 父对象
+        """
+        super().__init__(parent)
+        self.plugin_manager = plugin_manager
+        self.debounce_ms = debounce_ms
+
+        # 插件目录 -> 插件名称
+        self._directories: Dict[str, str] = {}
+        # 插件名称 -> 插件文件的 (路径, mtime, size) 快照，用于过滤没有实际变化的通知
+        self._signatures: Dict[str, Tuple] = {}
+        # 等待重新加载的插件
+        self._pending: Set[str] = set()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_path_changed)
+        self._watcher.fileChanged.connect(self._on_path_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._reload_pending)
+
+        # 插件被添加、删除或重新加载后同步监视列表
+        self.plugin_manager.add_lifecycle_listener(lambda plugin_name, enabled: self.sync())
+        self.sync()
+
+    def sync(self) -> None:
+        """按插件管理器当前的插件列表更新监视的目录和文件"""
+        directories = {}
+        for plugin_info in self.plugin_manager.plugins:
+            plugin_path = plugin_info.get('plugin_path')
+            if plugin_path and os.path.isdir(plugin_path):
+                directories[os.path.abspath(plugin_path)] = plugin_info['plugin_name']
+
+        removed = [path for path in self._directories if path not in directories]
+        if removed:
+            self._watcher.removePaths(removed)
+            stale_files = [path for path in self._watcher.files()
+                           if os.path.dirname(path) in removed]
+            if stale_files:
+                self._watcher.removePaths(stale_files)
+        for path in removed:
+            self._signatures.pop(self._directories.pop(path), None)
+
+        for path, plugin_name in directories.items():
+            if path not in self._directories:
+                self._directories[path] = plugin_name
+                self._watcher.addPath(path)
+                self._signatures[plugin_name] = self._signature(path)
+            self._watch_files(path)
+
+    def _watch_files(self, directory: str) -> None:
+        """监视目录中的插件文件
+
+        编辑器保存文件时常用写临时文件再重命名的方式，被替换的文件会从监视列表中消失，需要重新添加
+        """
+        watched = set(self._watcher.files())
+        files = [path for path in self._list_files(directory) if path not in watched]
+        if files:
+            self._watcher.addPaths(files)
+
+    def _list_files(self, directory: str):
+        """列出目录中需要监视的插件文件"""
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        return [os.path.join(directory, name) for name in sorted(names)
+                if name.endswith(self.WATCHED_EXTENSIONS)]
+
+    def _signature(self, directory: str) -> Tuple:
+        """计算目录中插件文件的快照"""
+        signature = []
+        for path in self._list_files(directory):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _on_path_changed(self, path: str) -> None:
+        """文件或目录发生变化，记录对应的插件并重新开始计时"""
+        path = os.path.abspath(path)
+        directory = path if path in self._directories else os.path.dirname(path)
+        plugin_name = self._directories.get(directory)
+        if plugin_name is None:
+            return
+
+        self._pending.add(plugin_name)
+        self._timer.start()
+
+    def _reload_pending(self) -> None:
+        """重新加载等待中的、文件快照确实发生变化的插件"""
+        pending, self._pending = self._pending, set()
+        for directory, plugin_name in list(self._directories.items()):
+            if plugin_name not in pending:
+                continue
+
+            self._watch_files(directory)
+            signature = self._signature(directory)
+            if signature == self._signatures.get(plugin_name):
+                continue
+            self._signatures[plugin_name] = signature
+
+            print(f"插件 {plugin_name} 的文件已修改，正在重新加载")
+            self.plugin_manager.reload_plugin(plugin_name)
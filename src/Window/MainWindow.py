@@ -6,7 +6,6 @@ from qfluentwidgets import MSFluentWindow, FluentIcon, NavigationItemPosition
 from .AboutPage import AboutPage
 from .PluginManage import PluginManagePage
 from .Settings import SettingsPage
-from src.ConfigManager import ConfigManager
 
 
 class MainWindow(MSFluentWindow):
@@ -109,8 +108,9 @@ class MainWindow(MSFluentWindow):
 
             # 检查插件配置文件
             try:
-                config_path = os.path.join(plugin_path, "config.toml")
-                plugin_config = ConfigManager(config_path, create_if_not_exists=False).config
+                plugin_config = self.pet_parent.plugin_manager.get_plugin_config(plugin_info)
+                if not plugin_config:
+                    continue
 
                 # 检查是否有main_page字段
                 if 'plugin' in plugin_config and 'main_page' in plugin_config['plugin']:
@@ -1,9 +1,10 @@
 import os
 
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QFileDialog, QMessageBox, QWidget
+from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QFileDialog, QMessageBox, QWidget, QTableWidgetItem, \
+    QAbstractItemView
 from qfluentwidgets import ScrollArea, SubtitleLabel, PrimaryPushButton, FluentIcon, CardWidget, SwitchButton, \
-    BodyLabel, PushButton, InfoBar, InfoBarPosition, StrongBodyLabel
+    BodyLabel, PushButton, InfoBar, InfoBarPosition, StrongBodyLabel, TableWidget
 
 from src.ConfigManager import ConfigManager
 
@@ -14,9 +15,11 @@ class PluginCard(CardWidget):
     Attributes:
         statusChanged (Signal): 插件状态变化信号，参数(plugin_name: str, enabled: bool)
         deleteRequested (Signal): 删除插件请求信号，参数(plugin_name: str)
+        resetRequested (Signal): 解除插件熔断请求信号，参数(plugin_name: str)
     """
     statusChanged = Signal(str, bool)  # 插件状态变化信号
     deleteRequested = Signal(str)  # 删除插件请求信号
+    resetRequested = Signal(str)  # 解除插件熔断请求信号
 
     def __init__(self, plugin_info):
         """初始化插件卡片
@@ -89,12 +92,28 @@ class PluginCard(CardWidget):
         type_layout.addStretch()
         info_layout.addLayout(type_layout)
 
+        # 运行状态展示（插件监督器给出的熔断状态）
+        health_layout = QHBoxLayout()
+        health_label = BodyLabel("状态: ", self)
+        self.health_value = BodyLabel("正常", self)
+        health_layout.addWidget(health_label)
+        health_layout.addWidget(self.health_value)
+        health_layout.addStretch()
+        info_layout.addLayout(health_layout)
+
         main_layout.addLayout(info_layout)
 
         # 操作按钮区域
         button_layout = QHBoxLayout()
         button_layout.addStretch(1)
 
+        # 解除熔断按钮，只在插件异常时显示
+        self.reset_button = PushButton("重置状态", self)
+        self.reset_button.setIcon(FluentIcon.SYNC)
+        self.reset_button.clicked.connect(lambda: self.resetRequested.emit(self.plugin_name))
+        self.reset_button.hide()
+        button_layout.addWidget(self.reset_button)
+
         # 删除按钮
         delete_button = PushButton("删除", self)
         delete_button.setIcon(FluentIcon.DELETE)
@@ -102,6 +121,17 @@ class PluginCard(CardWidget):
         button_layout.addWidget(delete_button)
         main_layout.addLayout(button_layout)
 
+    def set_health(self, text, healthy):
+        """更新插件运行状态
+
+        Args:
+            text (str): 状态描述
+            healthy (bool): 插件是否正常运行
+        """
+        if self.health_value.text() != text:
+            self.health_value.setText(text)
+        self.reset_button.setVisible(not healthy)
+
     def _on_status_changed(self, checked):
         """处理状态开关变化事件
 
@@ -116,6 +146,81 @@ class PluginCard(CardWidget):
         self.deleteRequested.emit(self.plugin_name)
 
 
+class PluginProfilerCard(CardWidget):
+    """插件性能面板，只读展示每个插件的调用耗时统计
+
+    Attributes:
+        plugin_manager (PluginManager): 插件管理器
+    """
+    # 表头: 插件名称, 调用类型, 调用次数, p50, p95, p99, max
+    HEADERS = ["插件", "类型", "次数", "p50(ms)", "p95(ms)", "p99(ms)", "max(ms)"]
+
+    def __init__(self, plugin_manager, parent=None):
+        """初始化插件性能面板
+
+        Args:
+            plugin_manager (PluginManager): 插件管理器
+            parent (QWidget): 父级窗口部件
+        """
+        super().__init__(parent=parent)
+        self.plugin_manager = plugin_manager
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(16, 16, 16, 16)
+        main_layout.setSpacing(8)
+
+        # 标题行布局（包含标题和分析开关）
+        title_layout = QHBoxLayout()
+        title_layout.addWidget(StrongBodyLabel("插件性能", self))
+        title_layout.addStretch(1)
+        self.switch = SwitchButton(self)
+        self.switch.setChecked(self.plugin_manager.profiler is not None)
+        self.switch.checkedChanged.connect(self._on_switch_changed)
+        title_layout.addWidget(self.switch)
+        main_layout.addLayout(title_layout)
+
+        # 只读统计表格
+        self.table = TableWidget(self)
+        self.table.setColumnCount(len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setMinimumHeight(160)
+        main_layout.addWidget(self.table)
+
+        # 定时刷新统计数据
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(1000)
+        self.refresh()
+
+    def _on_switch_changed(self, checked):
+        """处理分析开关变化事件
+
+        Args:
+            checked (bool): 是否启用耗时分析
+        """
+        if checked:
+            self.plugin_manager.enable_profiler()
+        else:
+            self.plugin_manager.disable_profiler()
+        self.refresh()
+
+    def refresh(self):
+        """刷新统计表格，窗口不可见时跳过"""
+        if not self.isVisible():
+            return
+
+        profiler = self.plugin_manager.profiler
+        stats = profiler.stats() if profiler is not None else []
+        self.table.setRowCount(len(stats))
+        for row, item in enumerate(stats):
+            values = [item['plugin_name'], item['kind'], str(item['count']),
+                      f"{item['p50']:.3f}", f"{item['p95']:.3f}", f"{item['p99']:.3f}", f"{item['max']:.3f}"]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+
 class PluginManagePage(ScrollArea):
     """插件管理页面，提供插件列表展示和管理功能"""
 
@@ -149,6 +254,9 @@ class PluginManagePage(ScrollArea):
         # 添加新插件按钮
         self.addPluginButton = PrimaryPushButton("添加新插件", self)
 
+        # 插件性能面板
+        self.profilerCard = PluginProfilerCard(self.pet_parent.plugin_manager, self)
+
         # 插件容器区域
         self.pluginsContainer = QWidget(self)
         self.pluginsLayout = QVBoxLayout(self.pluginsContainer)
@@ -160,6 +268,11 @@ class PluginManagePage(ScrollArea):
         self.setup_ui()
         self.load_plugins()
 
+        # 定时刷新插件运行状态
+        self.health_timer = QTimer(self)
+        self.health_timer.timeout.connect(self.refresh_health)
+        self.health_timer.start(1000)
+
         # 启用透明背景功能
         self.enableTransparentBackground()
 
@@ -169,6 +282,9 @@ class PluginManagePage(ScrollArea):
 
         self.vBoxLayout.addWidget(self.descLabel)
 
+        # 添加插件性能面板
+        self.vBoxLayout.addWidget(self.profilerCard)
+
         self.pluginsLayout.setContentsMargins(0, 10, 0, 10)
         self.pluginsLayout.setSpacing(15)
         self.pluginsLayout.setAlignment(Qt.AlignmentFlag.AlignTop)
@@ -192,7 +308,8 @@ class PluginManagePage(ScrollArea):
 
     def load_plugins(self):
         """加载配置中的插件信息并生成卡片"""
-        self.configmanager.load()
+        # 配置文件在外部被修改时才重新读取
+        self.configmanager.refresh()
 
         # 获取插件列表
         plugins = self.pet_parent.plugins
@@ -215,6 +332,7 @@ class PluginManagePage(ScrollArea):
         card = PluginCard(plugin_info)
         card.statusChanged.connect(self.on_plugin_status_changed)
         card.deleteRequested.connect(self.on_plugin_delete_requested)
+        card.resetRequested.connect(self.on_plugin_reset_requested)
 
         # 添加到布局
         self.pluginsLayout.addWidget(card)
@@ -243,10 +361,11 @@ class PluginManagePage(ScrollArea):
             return
         new_plugin = None
         try:
-            plugin_config_manager = ConfigManager(config_file, create_if_not_exists=False)
-            plugin_name = plugin_config_manager.config.get('plugin').get('plugin_name')
+            plugin_config = ConfigManager.shared(config_file).view()
+            plugin_name = plugin_config.get('plugin').get('plugin_name')
 
-            new_plugin = plugin_config_manager.config.get('plugin')
+            # 从只读视图复制插件信息，不修改插件自己的配置
+            new_plugin = dict(plugin_config.get('plugin'))
             new_plugin['plugin_path'] = plugin_dir
             new_plugin['enabled'] = True
 
@@ -275,9 +394,8 @@ class PluginManagePage(ScrollArea):
         try:
             # 添加新插件
             self.configmanager.config['plugins'].append(new_plugin)
-            # 保存配置
-            self.configmanager.save()
-            self.pet_parent.plugins = self.configmanager.config['plugins']
+            # 立即保存配置，写入失败时在这里提示，桌宠收到配置变化后立即启用新插件
+            self.configmanager.save(wait=True)
             # 添加插件卡片
             self.add_plugin_card(new_plugin)
             # 显示成功消息
@@ -319,14 +437,33 @@ class PluginManagePage(ScrollArea):
                 plugin['enabled'] = enabled
                 break
         try:
+            # 保存配置，频繁切换开关时合并写入，后台写入失败由桌宠通过托盘通知提示，
+            # 桌宠收到配置变化后在运行时启用或卸载插件
             self.configmanager.save()
-            self.pet_parent.plugins = self.configmanager.config['plugins']
         except Exception as e:
             QMessageBox.critical(
                 self, "保存失败",
                 f"保存配置文件时出错: {str(e)}"
             )
 
+    def refresh_health(self):
+        """刷新每个插件卡片的运行状态，窗口不可见时跳过"""
+        if not self.isVisible():
+            return
+
+        supervisor = self.pet_parent.plugin_manager.supervisor
+        for plugin_name, card in self.plugin_cards.items():
+            card.set_health(supervisor.describe(plugin_name), supervisor.is_healthy(plugin_name))
+
+    def on_plugin_reset_requested(self, plugin_name):
+        """处理解除插件熔断请求事件
+
+        Args:
+            plugin_name (str): 插件名称
+        """
+        self.pet_parent.plugin_manager.supervisor.reset(plugin_name)
+        self.refresh_health()
+
     def on_plugin_delete_requested(self, plugin_name):
         """处理插件删除请求事件
 
@@ -351,9 +488,8 @@ class PluginManagePage(ScrollArea):
                 if plugin.get('plugin_name') == plugin_name:
                     del plugins[i]
                     break
-            self.pet_parent.plugins = plugins
-            # 保存配置
-            self.configmanager.save()
+            # 立即保存配置，写入失败时在这里提示，桌宠收到配置变化后卸载插件并移除它的托盘菜单
+            self.configmanager.save(wait=True)
             # 移除插件卡片
             if plugin_name in self.plugin_cards:
                 self.plugin_cards[plugin_name].setParent(None)
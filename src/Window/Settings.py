@@ -87,6 +87,12 @@ class ModelSettingsCard(BaseSettingsCard):
         self.scale_combo_box.setFixedWidth(120)
         self.addSettingItem("缩放比例", "设置桌宠的缩放比例", self.scale_combo_box)
 
+        # 渲染分辨率设置
+        self.render_scale_combo_box = EditableComboBox(self)
+        self.render_scale_combo_box.addItems(["0.5", "0.75", "1.0"])
+        self.render_scale_combo_box.setFixedWidth(120)
+        self.addSettingItem("渲染分辨率", "降低渲染分辨率可以减少大窗口的绘制耗时", self.render_scale_combo_box)
+
 
 # 动画设置卡片
 class AnimationSettingsCard(BaseSettingsCard):
@@ -201,11 +207,13 @@ class SettingsPage(ScrollArea):
             if not self.pet_parent:
                 raise ValueError("无法获取桌宠对象引用")
 
+            settings = self.configManager.settings
+
             # 窗口设置
-            width = self.pet_parent.window_width
-            height = self.pet_parent.window_height
-            pet_x = self.configManager.config["window"]["x"]
-            pet_y = self.configManager.config["window"]["y"]
+            width = settings.window.width
+            height = settings.window.height
+            pet_x = settings.window.x
+            pet_y = settings.window.y
 
             # 设置ComboBox选项
             self.setComboBoxValue(self.windowSettingsCard.widthComboBox, str(width))
@@ -213,73 +221,50 @@ class SettingsPage(ScrollArea):
             self.setComboBoxValue(self.windowSettingsCard.xComboBox, str(pet_x))
             self.setComboBoxValue(self.windowSettingsCard.yComboBox, str(pet_y))
 
+            self.windowSettingsCard.current_bg_color = list(settings.window.background_color)
+
             # 模型设置
-            model_path = self.pet_parent.model_path
+            model_path = settings.model.model_path
             self.modelSettingsCard.model_path = model_path
-            scale = self.pet_parent.scale
+            scale = settings.model.scale
             self.setComboBoxValue(self.modelSettingsCard.scale_combo_box, str(scale))
+            render_scale = settings.model.render_scale
+            self.setComboBoxValue(self.modelSettingsCard.render_scale_combo_box, str(render_scale))
 
             # 动画设置
-            frame_rate_ms = self.pet_parent.frame_rate_ms
+            frame_rate_ms = settings.animation.frame_rate_ms
             self.setComboBoxValue(self.animationSettingsCard.frameRateComboBox, str(frame_rate_ms))
 
         except Exception as e:
             self.showMessage(self.saveButton, InfoBarIcon.ERROR, "加载失败", f"加载设置失败: {str(e)}")
 
     def saveSettings(self):
-        """保存设置到pet_parent对象并同步到配置文件"""
+        """保存设置到配置文件
+
+        桌宠监听配置变化，保存后只应用发生变化的设置，无需重启
+        """
         try:
             if not self.pet_parent:
                 raise ValueError("无法获取桌宠对象引用")
 
+            # 在当前配置的副本上修改，保存时统一做类型转换和校验，校验失败不影响当前配置
+            settings = self.configManager.settings.copy()
+
             # 从UI获取设置值
-            width = int(self.windowSettingsCard.widthComboBox.currentText())
-            height = int(self.windowSettingsCard.heightComboBox.currentText())
-            pet_x = int(self.windowSettingsCard.xComboBox.currentText())
-            pet_y = int(self.windowSettingsCard.yComboBox.currentText())
-            scale = float(self.modelSettingsCard.scale_combo_box.currentText())
-            frame_rate_ms = int(self.animationSettingsCard.frameRateComboBox.currentText())
-            model_path = self.modelSettingsCard.model_path
-            background_color = self.windowSettingsCard.current_bg_color
-
-            # 直接更新pet_parent对象的属性
-            self.pet_parent.window_width = width
-            self.pet_parent.window_height = height
-            self.pet_parent.scale = scale
-            self.pet_parent.frame_rate_ms = frame_rate_ms
-            self.pet_parent.model_path = model_path
-            self.pet_parent.background_color = background_color
-
-            # 更新桌宠对象
-            self.pet_parent.timer.setInterval(1000 // frame_rate_ms)
-
-            # 同时更新配置文件以便下次启动时保持设置
-            if self.configManager:
-                # 窗口设置
-                if "window" not in self.configManager.config:
-                    self.configManager.config["window"] = {}
-                self.configManager.config["window"]["width"] = width
-                self.configManager.config["window"]["height"] = height
-                self.configManager.config["window"]["x"] = pet_x
-                self.configManager.config["window"]["y"] = pet_y
-                self.configManager.config["window"]["background_color"] = background_color
-
-                # 模型设置
-                if "model" not in self.configManager.config:
-                    self.configManager.config["model"] = {}
-                self.configManager.config["model"]["model_path"] = model_path
-                self.configManager.config["model"]["scale"] = scale
-
-                # 动画设置
-                if "animation" not in self.configManager.config:
-                    self.configManager.config["animation"] = {}
-                self.configManager.config["animation"]["frame_rate_ms"] = frame_rate_ms
-
-                # 保存配置
-                self.configManager.save()
-
-            self.showMessage(self.saveButton, InfoBarIcon.SUCCESS, "保存成功",
-                             "设置已成功保存，部分设置可能需要重启应用后生效")
+            settings.window.width = self.windowSettingsCard.widthComboBox.currentText()
+            settings.window.height = self.windowSettingsCard.heightComboBox.currentText()
+            settings.window.x = self.windowSettingsCard.xComboBox.currentText()
+            settings.window.y = self.windowSettingsCard.yComboBox.currentText()
+            settings.window.background_color = list(self.windowSettingsCard.current_bg_color)
+            settings.model.model_path = self.modelSettingsCard.model_path
+            settings.model.scale = self.modelSettingsCard.scale_combo_box.currentText()
+            settings.model.render_scale = self.modelSettingsCard.render_scale_combo_box.currentText()
+            settings.animation.frame_rate_ms = self.animationSettingsCard.frameRateComboBox.currentText()
+
+            # 立即保存配置，写入失败时在这里提示，桌宠收到配置变化后立即应用
+            self.configManager.save_settings(settings, wait=True)
+
+            self.showMessage(self.saveButton, InfoBarIcon.SUCCESS, "保存成功", "设置已成功保存")
         except Exception as e:
             self.showMessage(self.saveButton, InfoBarIcon.ERROR, "保存失败", f"保存设置失败: {str(e)}")
 
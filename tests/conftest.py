@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """整个测试过程共享的 QApplication，Qt 只允许创建一个应用程序对象"""
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def create_plugin(tmp_path):
+    """在临时目录下生成测试插件，返回生成函数
+
+    生成函数的参数:
+        name (str): 插件名称，同时是插件目录和模块文件的名称
+        plugin_type (str): 插件类型
+        source (Optional[str]): 插件模块的源码，为None时只生成配置文件
+        config (str): 追加到配置文件 [plugin] 表中的内容，也可以包含其它表
+        **plugin_info: 插件信息中的其它字段
+    生成函数的返回值:
+        dict: 插件信息
+    """
+    def create(name, plugin_type, source=None, config="", **plugin_info):
+        plugin_path = tmp_path / name
+        plugin_path.mkdir()
+        if source is not None:
+            (plugin_path / f"{name}.py").write_text(source, encoding="utf-8")
+        (plugin_path / "config.toml").write_text(
+            f'[plugin]\nplugin_name = "{name}"\nplugin_type = "{plugin_type}"\n{config}', encoding="utf-8")
+        return {'plugin_name': name, 'plugin_path': str(plugin_path), 'plugin_type': plugin_type, 'enabled': True,
+                **plugin_info}
+
+    return create
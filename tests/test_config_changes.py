@@ -0,0 +1,90 @@
+"""配置变化的比较和配置文件监视"""
+import time
+
+from src.ConfigManager import ConfigManager
+from src.ConfigWatcher import ConfigWatcher
+
+CONFIG = '''
+[window]
+x = 1
+y = 2
+'''
+
+
+def test_diff_nested_tables():
+    old = {'window': {'x': 1, 'y': 2, 'size': {'w': 100, 'h': 100}}, 'removed': {'a': 1}}
+    new = {'window': {'x': 1, 'y': 3, 'size': {'w': 120, 'h': 100}, 'z': 0}}
+
+    assert ConfigManager.diff(old, new) == {
+        'window.y': 3,
+        'window.size.w': 120,
+        'window.z': 0,
+        'removed': None,
+    }
+
+
+def test_diff_lists():
+    old = {'plugins': [{'plugin_name': "A", 'enabled': True}, {'plugin_name': "B", 'enabled': True}],
+           'color': [255, 255, 255, 0]}
+    # 长度相同的数组按下标比较
+    new = {'plugins': [{'plugin_name': "A", 'enabled': True}, {'plugin_name': "B", 'enabled': False}],
+           'color': [255, 255, 255, 128]}
+    assert ConfigManager.diff(old, new) == {'plugins[1].enabled': False, 'color[3]': 128}
+
+    # 长度不同的数组整体视为变化
+    shorter = {'plugins': old['plugins'][:1], 'color': old['color']}
+    assert ConfigManager.diff(old, shorter) == {'plugins': shorter['plugins']}
+
+
+def test_diff_equal_configs():
+    config = {'window': {'x': 1}, 'plugins': [{'plugin_name': "A"}]}
+    assert ConfigManager.diff(config, ConfigManager._copy(config)) == {}
+
+
+def create_watched_config(tmp_path, qapp):
+    config_file = tmp_path / "config.toml"
+    config_file.write_text(CONFIG, encoding="utf-8")
+    manager = ConfigManager(str(config_file))
+    watcher = ConfigWatcher(manager, debounce_ms=20)
+    # 记录监视器每次 refresh 是否重新读取了文件
+    refreshes = []
+    original_refresh = manager.refresh
+
+    def refresh():
+        refreshes.append(original_refresh())
+        return refreshes[-1]
+    manager.refresh = refresh
+    return config_file, manager, watcher, refreshes
+
+
+def process_events(qapp, seconds=0.3):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+def test_watcher_ignores_own_writes(tmp_path, qapp):
+    config_file, manager, watcher, refreshes = create_watched_config(tmp_path, qapp)
+
+    manager.config['window']['x'] = 10
+    manager.save()
+    process_events(qapp)
+
+    # 监视器收到了文件变化，但文件与配置管理器记录的一致，不重新读取
+    assert refreshes and not any(refreshes)
+    assert manager.config['window']['x'] == 10
+
+
+def test_watcher_reloads_external_changes(tmp_path, qapp):
+    config_file, manager, watcher, refreshes = create_watched_config(tmp_path, qapp)
+    changes = []
+    manager.add_change_listener(changes.append)
+
+    config_file.write_text(CONFIG.replace("x = 1", "x = 12"), encoding="utf-8")
+    process_events(qapp)
+
+    # 快照文件的写入也会触发目录变化，此时不再重复读取
+    assert refreshes.count(True) == 1
+    assert manager.config['window']['x'] == 12
+    assert changes == [{'window.x': 12}]
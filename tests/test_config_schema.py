@@ -0,0 +1,100 @@
+"""配置模型的读取和写回"""
+import tomli
+
+from src.ConfigManager import ConfigManager
+from src.ConfigSchema import AppConfig
+
+CONFIG = '''
+version = 3
+
+[window]
+x = 10
+y = 20
+width = 300
+height = 500
+background_color = [255, 255, 255, 0]
+always_on_top = true
+
+[model]
+model_path = "resources/Live2dModel/Test/Test.model3.json"
+scale = 0.5
+render_scale = 0.75
+
+[animation]
+frame_rate_ms = 30
+idle_frame_rate = 0
+idle_delay_s = 2.5
+
+[plugin_manager]
+profiler = true
+hot_reload = false
+frame_budget_ms = 4.0
+failure_threshold = 5
+backoff_s = 0.5
+max_backoff_s = 30.0
+idle_timeout_s = 120.0
+
+[theme]
+name = "dark"
+accent = [1, 2, 3]
+
+[[plugins]]
+plugin_name = "Hello"
+plugin_path = "src/Plugin/Hello"
+plugin_type = "menu"
+enabled = true
+plugin_chinese_name = "你好"
+icon = "hello.png"
+
+[[plugins]]
+plugin_name = "Clock"
+plugin_path = "src/Plugin/Clock"
+plugin_type = "lasting"
+enabled = false
+order = 2
+'''
+
+
+def test_from_dict_to_dict_round_trip():
+    data = tomli.loads(CONFIG)
+    settings = AppConfig.from_dict(data)
+
+    # 未在配置模型中声明的表和配置键保存在 extra 中
+    assert settings.extra == {'version': 3, 'theme': {'name': "dark", 'accent': [1, 2, 3]}}
+    assert settings.window.extra == {'always_on_top': True}
+    assert settings.plugins[1].extra == {'order': 2}
+    assert settings.find_plugin("Hello").plugin_chinese_name == "你好"
+
+    assert settings.to_dict() == data
+
+
+def test_save_settings_round_trip(tmp_path):
+    config_file = tmp_path / "config.toml"
+    config_file.write_text(CONFIG, encoding="utf-8")
+    manager = ConfigManager(str(config_file), schema=AppConfig, snapshot=False)
+
+    manager.save_settings(manager.settings.copy())
+
+    saved = ConfigManager(str(config_file), schema=AppConfig, snapshot=False)
+    assert saved.settings == manager.settings
+    assert saved.config == manager.config
+    assert saved.config['theme'] == {'name': "dark", 'accent': [1, 2, 3]}
+    assert saved.config['plugins'] == tomli.loads(CONFIG)['plugins']
+
+
+def test_modified_copy_does_not_change_settings(tmp_path):
+    config_file = tmp_path / "config.toml"
+    config_file.write_text(CONFIG, encoding="utf-8")
+    manager = ConfigManager(str(config_file), schema=AppConfig, snapshot=False)
+
+    settings = manager.settings.copy()
+    settings.window.x = 99
+    settings.plugins[0].enabled = False
+    assert manager.settings.window.x == 10
+    assert manager.settings.plugins[0].enabled
+
+    manager.save_settings(settings)
+    saved = ConfigManager(str(config_file), schema=AppConfig, snapshot=False)
+    assert saved.settings.window.x == 99
+    assert not saved.settings.find_plugin("Hello").enabled
+    assert saved.config['window']['always_on_top']
@@ -0,0 +1,84 @@
+"""配置文件的二进制快照"""
+import marshal
+import os
+
+import tomli
+
+from src.ConfigManager import ConfigManager
+
+CONFIG = '''
+[window]
+x = 1
+background_color = [255, 255, 255, 0]
+
+[[plugins]]
+plugin_name = "Hello"
+enabled = true
+'''
+
+
+def create_config(tmp_path, content=CONFIG):
+    config_file = tmp_path / "config.toml"
+    config_file.write_text(content, encoding="utf-8")
+    return str(config_file)
+
+
+def forbid_toml_parsing(monkeypatch):
+    """之后的读取不允许解析TOML，用于确认配置来自快照"""
+    def loads(*args, **kwargs):
+        raise AssertionError("不应解析TOML")
+    monkeypatch.setattr(tomli, "loads", loads)
+
+
+def test_snapshot_and_toml_loads_are_equal(tmp_path, monkeypatch):
+    config_file = create_config(tmp_path)
+    parsed = ConfigManager(config_file, snapshot=False).config
+    # 第一次读取解析TOML并写入快照
+    assert ConfigManager(config_file).config == parsed
+    assert os.path.exists(config_file + ConfigManager.SNAPSHOT_SUFFIX)
+
+    forbid_toml_parsing(monkeypatch)
+    assert ConfigManager(config_file).config == parsed
+
+
+def test_corrupt_snapshot_falls_back_to_toml(tmp_path):
+    config_file = create_config(tmp_path)
+    ConfigManager(config_file)
+    snapshot_file = config_file + ConfigManager.SNAPSHOT_SUFFIX
+    with open(snapshot_file, "r+b") as f:
+        data = f.read()
+        f.seek(0)
+        f.write(data[:len(data) // 2])
+        f.truncate()
+
+    assert ConfigManager(config_file).config['window']['x'] == 1
+    # 损坏的快照被重新写入
+    assert ConfigManager(config_file)._load_snapshot()[2]['window']['x'] == 1
+
+
+def test_stale_snapshot_falls_back_to_toml(tmp_path):
+    config_file = create_config(tmp_path)
+    header = ConfigManager.SNAPSHOT_MAGIC + bytes((ConfigManager.SNAPSHOT_VERSION, marshal.version))
+    stale = {'window': {'x': 99}}
+    with open(config_file + ConfigManager.SNAPSHOT_SUFFIX, "wb") as f:
+        f.write(header + marshal.dumps((0, 0, "0" * 40, stale)))
+
+    assert ConfigManager(config_file).config['window']['x'] == 1
+
+
+def test_snapshot_is_invalidated_when_toml_changes(tmp_path):
+    config_file = create_config(tmp_path)
+    ConfigManager(config_file)
+
+    create_config(tmp_path, CONFIG.replace("x = 1", "x = 12"))
+    assert ConfigManager(config_file).config['window']['x'] == 12
+
+
+def test_touched_file_with_same_content_uses_snapshot(tmp_path, monkeypatch):
+    config_file = create_config(tmp_path)
+    ConfigManager(config_file)
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    forbid_toml_parsing(monkeypatch)
+    assert ConfigManager(config_file).config['window']['x'] == 1
@@ -0,0 +1,45 @@
+"""配置写入失败的处理"""
+import pytest
+
+from src.ConfigManager import ConfigManager
+
+
+def create_manager(tmp_path):
+    config_file = tmp_path / "config.toml"
+    config_file.write_text('[window]\nx = 1\n', encoding="utf-8")
+    return ConfigManager(str(config_file), write_behind=True, write_delay=0.01, snapshot=False)
+
+
+def test_write_behind_failure_is_reported(tmp_path):
+    manager = create_manager(tmp_path)
+    errors = []
+    manager.add_write_error_listener(errors.append)
+
+    # TOML 无法表示的值使写入失败
+    manager.config['window']['x'] = object()
+    manager.save()
+    assert manager.flush(5)
+
+    assert len(errors) == 1
+    assert manager.write_error == errors[0]
+
+    manager.config['window']['x'] = 2
+    manager.save()
+    assert manager.flush(5)
+    assert manager.write_error is None
+
+
+def test_waiting_save_raises_and_rolls_back(tmp_path):
+    manager = create_manager(tmp_path)
+    manager.config['window']['x'] = 2
+    manager.save()
+
+    manager.config['window']['x'] = object()
+    with pytest.raises(IOError):
+        manager.save(wait=True)
+    assert manager.config['window']['x'] == 2
+
+    # 立即写入取代了尚未写入的延迟写入
+    manager.save(wait=True)
+    assert manager.flush(5)
+    assert ConfigManager(manager.config_file).config['window']['x'] == 2
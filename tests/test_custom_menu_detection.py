@@ -0,0 +1,50 @@
+"""同时配置菜单项并实现 create_custom_menu 的插件的识别"""
+import os
+
+from src.ManifestCache import ManifestCache
+from src.PluginManager import PluginManager
+
+MIXED_SOURCE = '''
+raise RuntimeError("识别自定义菜单时不应执行插件模块")
+
+from src.Plugin.PluginBase import MenuPlugin
+
+
+class Mixed(MenuPlugin):
+    def create_custom_menu(self, params, menu):
+        return True
+'''
+
+PLAIN_SOURCE = '''
+from src.Plugin.PluginBase import MenuPlugin
+
+
+class Plain(MenuPlugin):
+    def greet(self, params, parameter):
+        return parameter
+'''
+
+
+def test_custom_menu_is_detected_without_importing(create_plugin):
+    mixed = create_plugin("Mixed", "menu", MIXED_SOURCE)
+    plain = create_plugin("Plain", "menu", PLAIN_SOURCE)
+    manager = PluginManager([mixed, plain])
+
+    assert manager.defines_custom_menu(mixed)
+    assert not manager.defines_custom_menu(plain)
+    assert "Mixed" not in manager.loaded_plugins
+
+
+def test_detection_is_cached_until_module_changes(tmp_path, create_plugin):
+    plain = create_plugin("Plain", "menu", PLAIN_SOURCE)
+    cache = ManifestCache(str(tmp_path / "cache.json"))
+    manager = PluginManager([plain], manifest_cache=cache)
+    manager.get_plugin_config(plain)
+
+    assert not manager.defines_custom_menu(plain)
+    module_file = os.path.join(plain['plugin_path'], "Plain.py")
+    assert cache.get_custom_menu(plain['plugin_path'], module_file) is False
+
+    with open(module_file, "a", encoding="utf-8") as f:
+        f.write("\n    def create_custom_menu(self, params, menu):\n        return True\n")
+    assert manager.defines_custom_menu(plain)
@@ -0,0 +1,95 @@
+"""插件事件总线"""
+import pytest
+
+from src.EventBus import EventBus
+from src.Plugin.PluginBase import EventPlugin
+from src.PluginSupervisor import CircuitBreaker, PluginSupervisor
+
+
+class ClickPlugin(EventPlugin):
+    """只重写 on_click 的事件型插件"""
+
+    def __init__(self, plugin_info, plugin_config):
+        super().__init__(plugin_info, plugin_config)
+        self.clicks = []
+
+    def on_click(self, parent, button, x, y):
+        self.clicks.append((button, x, y))
+
+
+class FailingPlugin(ClickPlugin):
+    def on_click(self, parent, button, x, y):
+        super().on_click(parent, button, x, y)
+        raise RuntimeError("failing")
+
+
+def create_plugin(plugin_class, plugin_name):
+    return plugin_class({'plugin_name': plugin_name, 'plugin_type': 'event'}, {})
+
+
+def test_subscribe_plugin_registers_overridden_hooks():
+    bus = EventBus()
+    changes = []
+    bus.add_subscription_listener(lambda: changes.append(True))
+    plugin = create_plugin(ClickPlugin, "Click")
+
+    assert bus.subscribe_plugin("Click", plugin) == ['on_click']
+    assert bus.has_subscribers('on_click')
+    assert not bus.has_subscribers('on_mouse_move')
+
+    bus.publish('on_click', None, "left", 1, 2)
+    assert plugin.clicks == [("left", 1, 2)]
+    assert changes == [True]
+
+
+def test_unsubscribe_removes_only_that_plugin():
+    bus = EventBus()
+    first = create_plugin(ClickPlugin, "First")
+    second = create_plugin(ClickPlugin, "Second")
+    bus.subscribe_plugin("First", first)
+    bus.subscribe_plugin("Second", second)
+    moves = []
+    bus.subscribe('on_mouse_move', "First", lambda parent, x, y: moves.append((x, y)))
+
+    bus.unsubscribe("First")
+    bus.publish('on_click', None, "left", 1, 2)
+    bus.publish('on_mouse_move', None, 3, 4)
+
+    assert first.clicks == [] and moves == []
+    assert second.clicks == [("left", 1, 2)]
+    assert not bus.has_subscribers('on_mouse_move')
+
+    bus.unsubscribe("Second")
+    assert not bus.has_subscribers('on_click')
+
+
+def test_unsubscribe_unknown_plugin_does_not_notify():
+    bus = EventBus()
+    changes = []
+    bus.add_subscription_listener(lambda: changes.append(True))
+
+    bus.unsubscribe("Missing")
+    assert changes == []
+
+
+def test_subscribe_unknown_event():
+    bus = EventBus()
+    with pytest.raises(ValueError):
+        bus.subscribe('on_unknown', "Plugin", print)
+
+
+def test_raising_hook_does_not_break_dispatch():
+    bus = EventBus(PluginSupervisor(failure_threshold=2, backoff=60))
+    before = create_plugin(ClickPlugin, "Before")
+    failing = create_plugin(FailingPlugin, "Failing")
+    after = create_plugin(ClickPlugin, "After")
+    for plugin in (before, failing, after):
+        bus.subscribe_plugin(plugin.plugin_info['plugin_name'], plugin)
+
+    for i in range(3):
+        bus.publish('on_click', None, "left", i, i)
+
+    assert before.clicks == after.clicks == [("left", i, i) for i in range(3)]
+    # 连续失败两次后熔断，之后不再调用
+    assert len(failing.clicks) == 2
+    assert bus.supervisor.get_breaker("Failing").state == CircuitBreaker.OPEN
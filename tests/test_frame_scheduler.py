@@ -0,0 +1,47 @@
+"""帧调度器的平均帧间隔"""
+import random
+import time
+
+from PySide6.QtCore import QTimer
+
+from src.MyDeskPetCore.FrameScheduler import FrameScheduler
+
+FPS = 60
+FRAMES = 300
+# 整数毫秒的 QTimer 平均间隔为 16ms，无法满足平均间隔的要求；
+# 单帧的触发时刻受机器负载影响较大，只比较平均帧间隔
+MEAN_TOLERANCE_MS = 0.2
+
+
+def measure(app, timer, interval):
+    """运行 FRAMES 帧，返回第一帧到最后一帧的时间(毫秒)"""
+    stamps = []
+    rng = random.Random(0)
+
+    def on_frame():
+        stamps.append(time.perf_counter())
+        # 模拟 2~6ms 的渲染耗时
+        end = time.perf_counter() + rng.uniform(0.002, 0.006)
+        while time.perf_counter() < end:
+            pass
+        if len(stamps) > FRAMES:
+            timer.stop()
+            app.quit()
+
+    timer.timeout.connect(on_frame)
+    # 超时保护，避免调度器失效时测试一直运行
+    QTimer.singleShot(int(FRAMES * 1000 / FPS * 3), app.quit)
+    timer.start(interval)
+    app.exec()
+    assert len(stamps) == FRAMES + 1
+    return (stamps[-1] - stamps[0]) * 1000
+
+
+def test_mean_frame_interval_matches_target(qapp):
+    target = 1000 / FPS
+    scheduler = FrameScheduler()
+    elapsed = measure(qapp, scheduler, target)
+
+    # 机器繁忙时丢弃的帧也占用一个帧间隔
+    mean = elapsed / (FRAMES + scheduler.skipped)
+    assert abs(mean - target) < MEAN_TOLERANCE_MS
@@ -0,0 +1,34 @@
+"""初始化型插件执行失败的记录"""
+from src.PluginManager import PluginManager
+
+PLUGIN_SOURCE = '''
+from src.Plugin.PluginBase import InitPlugin
+
+
+class {name}(InitPlugin):
+    def on_init(self, parent):
+        {body}
+'''
+
+
+def test_failures_are_recorded_without_interrupting_startup(create_plugin):
+    def create_init_plugin(name, body, config="", **plugin_info):
+        return create_plugin(name, "init", PLUGIN_SOURCE.format(name=name, body=body), config, **plugin_info)
+
+    plugins = [
+        create_init_plugin("Broken", "raise RuntimeError('boom')"),
+        create_init_plugin("Dependent", "pass", 'depends_on = ["Broken"]\n'),
+        create_init_plugin("Missing", "pass", function_name="setup"),
+        create_init_plugin("Healthy", "parent.append('Healthy')"),
+    ]
+    manager = PluginManager(plugins)
+    started = []
+
+    failures = manager.execute_init_plugins(started)
+
+    assert started == ['Healthy']
+    assert failures == manager.init_failures
+    assert failures['Broken'] == "boom"
+    assert failures['Dependent'] == "依赖的插件 Broken 执行失败"
+    assert failures['Missing'] == "找不到初始化函数 setup"
+    assert 'Healthy' not in failures
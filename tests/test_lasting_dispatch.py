@@ -0,0 +1,100 @@
+"""持续性插件的每帧调度"""
+import time
+
+from src.Plugin.PluginBase import LastingPlugin
+from src.PluginManager import PluginManager
+from src.PluginSupervisor import CircuitBreaker, PluginSupervisor
+
+
+class Recorder(LastingPlugin):
+    """记录每次调用收到的 dt"""
+
+    def __init__(self, plugin_info, plugin_config):
+        super().__init__(plugin_info, plugin_config)
+        self.calls = []
+
+    def update(self, parent, dt: float = 0.0):
+        self.calls.append(dt)
+
+
+class Failing(Recorder):
+    broken = True
+
+    def update(self, parent, dt: float = 0.0):
+        super().update(parent, dt)
+        if self.broken:
+            raise RuntimeError("failing")
+
+
+class Slow(Recorder):
+    def update(self, parent, dt: float = 0.0):
+        super().update(parent, dt)
+        time.sleep(0.005)
+
+
+def create_manager(*plugins, supervisor=None):
+    """构造插件管理器，plugins 为 (插件类, update_hz)，插件依次命名为 Plugin0、Plugin1..."""
+    plugin_list = []
+    manager = PluginManager(plugin_list, supervisor=supervisor)
+    for i, (plugin_class, update_hz) in enumerate(plugins):
+        plugin_info = {'plugin_name': f"Plugin{i}", 'plugin_path': "", 'plugin_type': 'lasting', 'enabled': True}
+        plugin_list.append(plugin_info)
+        # 直接注入实例，跳过模块加载
+        manager.plugin_instances[plugin_info['plugin_name']] = plugin_class(plugin_info,
+                                                                            {'plugin': {'update_hz': update_hz}})
+    manager.invalidate_index()
+    return manager
+
+
+def test_every_frame_and_rate_limited_plugins():
+    # 帧间隔和调度周期都取二进制可以精确表示的值，避免浮点误差影响到期判断
+    manager = create_manager((Recorder, 0), (Recorder, 8))
+    every_frame, rate_limited = manager.plugin_instances.values()
+
+    # 64fps 运行 0.5 秒
+    for frame in range(32):
+        manager.execute_lasting_plugins(None, 1.0 + frame / 64)
+
+    assert every_frame.calls == [0.0] + [1 / 64] * 31
+    assert rate_limited.calls == [0.0, 0.125, 0.125, 0.125]
+
+
+def test_failing_plugin_is_tripped_without_skipping_others():
+    manager = create_manager((Recorder, 0), (Failing, 0), (Recorder, 0),
+                             supervisor=PluginSupervisor(failure_threshold=3, backoff=60))
+    before, failing, after = manager.plugin_instances.values()
+
+    for frame in range(6):
+        manager.execute_lasting_plugins(None, 1.0 + frame / 64)
+
+    assert len(before.calls) == len(after.calls) == 6
+    # 第一次出错后的帧中仍按各插件自己的上一次调用计算间隔
+    assert after.calls == [0.0] + [1 / 64] * 5
+    assert len(failing.calls) == 3
+    assert manager.supervisor.get_breaker("Plugin1").state == CircuitBreaker.OPEN
+
+
+def test_slow_plugin_is_found_after_frame_overrun():
+    manager = create_manager((Recorder, 0), (Slow, 0),
+                             supervisor=PluginSupervisor(budget_ms=2, failure_threshold=3, backoff=60))
+    fast, slow = manager.plugin_instances.values()
+
+    # 第一帧只发现总耗时超出预算，之后逐个插件计时，连续超时三次后熔断
+    for _ in range(6):
+        manager.execute_lasting_plugins(None)
+
+    assert len(fast.calls) == 6
+    assert len(slow.calls) == 4
+    assert manager.supervisor.get_breaker("Plugin1").state == CircuitBreaker.OPEN
+
+
+def test_returns_to_unwatched_calls_after_recovery():
+    manager = create_manager((Recorder, 0), (Failing, 0), supervisor=PluginSupervisor(failure_threshold=3))
+    manager.execute_lasting_plugins(None, 1.0)
+    assert manager._watch_frame_plugins
+
+    # 插件恢复正常后回到只测量总耗时的调用方式
+    manager.plugin_instances["Plugin1"].broken = False
+    manager.execute_lasting_plugins(None, 1.5)
+    assert not manager._watch_frame_plugins
+    assert manager.supervisor.is_healthy("Plugin1")
@@ -0,0 +1,100 @@
+"""插件清单缓存的失效"""
+import os
+
+from src.ConfigManager import ConfigManager
+from src.ManifestCache import ManifestCache
+
+SOURCE = '''
+from src.Plugin.PluginBase import MenuPlugin
+
+
+class Hello(MenuPlugin):
+    def initialize(self) -> bool:
+        return True
+
+    def execute(self, parent=None) -> None:
+        pass
+'''
+
+
+def write(path, content):
+    """写入文件并把 mtime 推后一秒，避免文件系统时间精度不足时 mtime 不变"""
+    stat = os.stat(path)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def create_cache(tmp_path, create_plugin):
+    plugin_info = create_plugin("Hello", "menu", SOURCE, config='greeting = "hi"\n')
+    cache = ManifestCache(str(tmp_path / "cache" / "manifest.json"))
+    plugin_path = plugin_info['plugin_path']
+    config_path = os.path.join(plugin_path, "config.toml")
+    module_file = os.path.join(plugin_path, "Hello.py")
+    assert cache.get_config(plugin_path)['plugin']['greeting'] == "hi"
+    cache.set_class_name(plugin_path, module_file, "Hello")
+    cache.save()
+    # 重新打开缓存，确认读取的是缓存文件而不是内存中的条目
+    return ManifestCache(cache.cache_file), plugin_path, config_path, module_file
+
+
+def forbid_parsing(monkeypatch):
+    def shared(*args, **kwargs):
+        raise AssertionError("不应重新解析插件配置")
+    monkeypatch.setattr(ConfigManager, "shared", shared)
+
+
+def test_unchanged_plugin_uses_cache(tmp_path, create_plugin, monkeypatch):
+    cache, plugin_path, config_path, module_file = create_cache(tmp_path, create_plugin)
+
+    forbid_parsing(monkeypatch)
+    assert cache.get_config(plugin_path)['plugin']['greeting'] == "hi"
+    assert cache.get_class_name(plugin_path, module_file) == "Hello"
+
+
+def test_mtime_change_with_same_content_keeps_cache(tmp_path, create_plugin, monkeypatch):
+    cache, plugin_path, config_path, module_file = create_cache(tmp_path, create_plugin)
+    touch(config_path)
+    touch(module_file)
+
+    forbid_parsing(monkeypatch)
+    assert cache.get_config(plugin_path)['plugin']['greeting'] == "hi"
+    assert cache.get_class_name(plugin_path, module_file) == "Hello"
+    # 哈希一致时更新记录的 mtime，下次启动不必再计算哈希
+    entry = cache.entries[ManifestCache._key(plugin_path)]
+    assert entry['config_stamp']['mtime_ns'] == os.stat(config_path).st_mtime_ns
+    assert entry['module_stamp']['mtime_ns'] == os.stat(module_file).st_mtime_ns
+    assert cache._dirty
+
+
+def test_size_change_invalidates_config(tmp_path, create_plugin):
+    cache, plugin_path, config_path, module_file = create_cache(tmp_path, create_plugin)
+    with open(config_path, encoding="utf-8") as f:
+        content = f.read()
+    write(config_path, content.replace('"hi"', '"hello"'))
+
+    assert cache.get_config(plugin_path)['plugin']['greeting'] == "hello"
+
+
+def test_content_change_with_same_size_invalidates_config(tmp_path, create_plugin):
+    cache, plugin_path, config_path, module_file = create_cache(tmp_path, create_plugin)
+    with open(config_path, encoding="utf-8") as f:
+        content = f.read()
+    write(config_path, content.replace('"hi"', '"ok"'))
+    assert os.path.getsize(config_path) == cache.entries[ManifestCache._key(plugin_path)]['config_stamp']['size']
+
+    assert cache.get_config(plugin_path)['plugin']['greeting'] == "ok"
+
+
+def test_module_change_invalidates_class_name(tmp_path, create_plugin):
+    cache, plugin_path, config_path, module_file = create_cache(tmp_path, create_plugin)
+    with open(module_file, encoding="utf-8") as f:
+        content = f.read()
+    write(module_file, content.replace("class Hello", "class Hi"))
+
+    assert cache.get_class_name(plugin_path, module_file) is None
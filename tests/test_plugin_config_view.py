@@ -0,0 +1,35 @@
+"""插件配置的只读视图"""
+import os
+
+import pytest
+
+from src.ConfigManager import ConfigManager
+from src.ManifestCache import ManifestCache
+from src.PluginManager import PluginManager
+
+MENU_CONFIG = '''
+[[menu]]
+menu_name = "菜单"
+'''
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_readers_cannot_modify_shared_config(tmp_path, create_plugin, use_cache):
+    plugin_info = create_plugin("Viewed", "menu", config=MENU_CONFIG)
+    cache_file = str(tmp_path / "cache.json")
+    cache = ManifestCache(cache_file) if use_cache else None
+    manager = PluginManager([plugin_info], manifest_cache=cache)
+
+    plugin_config = manager.get_plugin_config(plugin_info)
+    with pytest.raises(TypeError):
+        plugin_config['plugin']['plugin_name'] = "Changed"
+    shared = ConfigManager.shared(os.path.join(plugin_info['plugin_path'], "config.toml"))
+    assert shared.config['plugin']['plugin_name'] == "Viewed"
+
+    if use_cache:
+        # 只读视图可以写入缓存文件，从缓存文件读取的配置同样是只读的
+        cache.save()
+        cached = ManifestCache(cache_file).get_config(plugin_info['plugin_path'])
+        assert cached['menu'][0]['menu_name'] == "菜单"
+        with pytest.raises(TypeError):
+            cached['plugin']['plugin_name'] = "Changed"
@@ -0,0 +1,112 @@
+"""进程外插件宿主的批量执行、卡死重启和启动期间的调用"""
+import time
+
+from src.PluginHost import PluginHostClient, PluginHostServer
+
+HANG_SOURCE = '''
+import time
+
+from src.Plugin.PluginBase import LastingPlugin
+
+
+class HangPlugin(LastingPlugin):
+    def initialize(self) -> bool:
+        return True
+
+    def update(self, parent, dt=0.0):
+        time.sleep(60)
+'''
+
+OUT_OF_PROCESS = "out_of_process = true\n"
+
+MARKER_SOURCE = '''
+from src.Plugin.PluginBase import MenuPlugin
+
+
+class MarkerPlugin(MenuPlugin):
+    def on_init(self, parent):
+        self.mark("init")
+
+    def click(self, parent, parameter):
+        self.mark(parameter)
+
+    def mark(self, text):
+        with open({marker!r}, "a", encoding="utf-8") as f:
+            f.write(text + "\\n")
+'''
+
+
+class Echo:
+    def update(self, parent, dt):
+        return dt
+
+
+class Broken:
+    def update(self, parent, dt):
+        raise RuntimeError("broken")
+
+
+def wait_until(condition, timeout=10.0):
+    """轮询等待条件成立"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_tick_error_does_not_discard_other_results():
+    server = PluginHostServer()
+    server.instances = {'echo': Echo(), 'broken': Broken()}
+
+    results = server.handle('tick', None, [('broken', 0.1), ('echo', 0.2)])
+
+    assert results[0][:2] == ('broken', False)
+    assert results[1] == ('echo', True, 0.2)
+
+
+def test_hung_host_is_killed_and_restarted(create_plugin):
+    plugin_info = create_plugin("HangPlugin", "lasting", HANG_SOURCE, OUT_OF_PROCESS)
+
+    host = PluginHostClient("test", tick_timeout=0.5)
+    try:
+        host.register(plugin_info)
+        assert wait_until(host.is_alive)
+        first = host.process
+
+        host.queue_tick("HangPlugin", 0.0)
+        start = time.perf_counter()
+        host.flush_ticks()
+        # 渲染循环不等待宿主进程
+        assert time.perf_counter() - start < 0.1
+        time.sleep(0.6)
+
+        host.queue_tick("HangPlugin", 0.0)
+        host.flush_ticks()
+        assert wait_until(lambda: host.process is not first and host.is_alive())
+        assert first.poll() is not None
+        assert not host._tick_in_flight
+    finally:
+        host.close()
+
+
+def test_calls_during_startup_are_sent_after_host_starts(tmp_path, create_plugin):
+    marker = tmp_path / "marker.txt"
+    plugin_info = create_plugin("MarkerPlugin", "menu", MARKER_SOURCE.format(marker=str(marker)), OUT_OF_PROCESS)
+
+    host = PluginHostClient("test")
+    try:
+        # register 在后台启动宿主进程，紧接着的调用不能丢失
+        host.register(plugin_info)
+        host.call_async("MarkerPlugin", "on_init")
+        host.call_async("MarkerPlugin", "click", "first")
+        host.call_async("MarkerPlugin", "click", "second")
+
+        def lines():
+            return marker.read_text(encoding="utf-8").split() if marker.exists() else []
+
+        assert wait_until(lambda: len(lines()) == 3)
+        assert lines() == ["init", "first", "second"]
+    finally:
+        host.close()
@@ -0,0 +1,77 @@
+"""插件卸载后模块和实例的释放"""
+import gc
+import types
+import weakref
+
+import pytest
+from PySide6.QtWidgets import QWidget
+
+from src.MyDeskPetCore.Menu import ContextMenuEvent
+from src.PluginManager import PluginManager
+
+PLUGIN_SOURCE = '''
+from qfluentwidgets import Action, RoundMenu
+
+from src.Plugin.PluginBase import MenuPlugin
+
+
+class Toggle(MenuPlugin):
+    toggle_action = None
+
+    def create_custom_menu(self, params, menu):
+        # 菜单项的槽函数和插件实例互相引用，插件被禁用时托盘菜单需要断开它们
+        self.toggle_action = Action('切换', triggered=lambda: self.toggle(params))
+        menu.addAction(self.toggle_action)
+        submenu = RoundMenu('更多')
+        submenu.addAction(Action('再次切换', triggered=lambda: self.toggle(params)))
+        menu.addMenu(submenu)
+        return True
+
+    def toggle(self, params):
+        pass
+'''
+
+PLUGIN_CONFIG = '''
+icon = "HOME"
+custom_menu = true
+'''
+
+
+@pytest.fixture
+def toggle_plugin(create_plugin):
+    return create_plugin("Toggle", "menu", PLUGIN_SOURCE, PLUGIN_CONFIG, plugin_chinese_name="切换")
+
+
+def test_unload_without_loaded_plugin_returns_false(toggle_plugin):
+    manager = PluginManager([toggle_plugin])
+    assert manager.unload_plugin("Toggle") is False
+
+
+def test_disabled_menu_plugin_is_released(toggle_plugin, qapp):
+    plugins = [toggle_plugin]
+    manager = PluginManager(plugins)
+    parent = QWidget()
+    parent.plugin_manager = manager
+    parent.plugins = plugins
+    parent.live2d = types.SimpleNamespace(model=object())
+    tray = ContextMenuEvent(parent)
+    try:
+        tray.load_deferred_menus()
+        references = [weakref.ref(manager.plugin_instances["Toggle"]), weakref.ref(manager.loaded_plugins["Toggle"])]
+        assert len(tray.plugin_menu_items["Toggle"]) == 2
+
+        manager.set_plugin_enabled("Toggle", False)
+        gc.collect()
+
+        assert "Toggle" not in tray.plugin_menu_items
+        assert [ref() for ref in references] == [None, None]
+
+        # 重新启用后插件菜单位于分隔线之前的插件菜单区域
+        manager.set_plugin_enabled("Toggle", True)
+        assert tray.menu.menuActions()[0] is tray.manageAction
+        assert tray.menu.menuActions()[-len(tray.fixed_actions):] == tray.fixed_actions
+    finally:
+        tray.sysTray.hide()
+        manager.shutdown()
+        parent.deleteLater()
+        qapp.processEvents()
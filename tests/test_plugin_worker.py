@@ -0,0 +1,50 @@
+"""后台执行的持续性插件在卸载时的结果处理"""
+import threading
+
+from src.PluginManager import PluginManager
+
+PLUGIN_SOURCE = '''
+import threading
+
+from src.Plugin.PluginBase import LastingPlugin
+
+started = threading.Event()
+release = threading.Event()
+applied = []
+
+
+class SlowWorker(LastingPlugin):
+    run_in_worker = True
+
+    def initialize(self) -> bool:
+        return True
+
+    def update(self, parent, dt: float = 0.0):
+        started.set()
+        release.wait(5)
+        return "result"
+
+    def apply_result(self, parent, result) -> None:
+        applied.append(result)
+'''
+
+
+def test_result_of_job_in_flight_during_unload_is_dropped(create_plugin):
+    manager = PluginManager([create_plugin("SlowWorker", "lasting", PLUGIN_SOURCE)])
+    try:
+        manager.execute_lasting_plugins(None)
+        # 不持有插件模块，以便检查卸载后模块是否被释放
+        module = manager.loaded_plugins["SlowWorker"]
+        started, release, applied = module.started, module.release, module.applied
+        del module
+        assert started.wait(5)
+
+        # 任务在卸载过程中完成并放入结果，卸载后不应再被应用，也不应被误报为未释放
+        threading.Timer(0.1, release.set).start()
+        assert manager.unload_plugin("SlowWorker")
+        manager.apply_worker_results(None)
+
+        assert applied == []
+        assert manager.applied_results == 0
+    finally:
+        manager.shutdown()